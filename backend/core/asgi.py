@@ -2,6 +2,8 @@
 ASGI config for core project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+Lifespan events are handled by events.warmup.WarmupLifespan, which warms
+the worker up on startup.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
@@ -13,4 +15,8 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+from events.warmup import WarmupLifespan  # noqa: E402 -- needs the app registry loaded above
+
+application = WarmupLifespan(django_application)
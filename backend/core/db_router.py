@@ -0,0 +1,79 @@
+"""
+Database routing: reads go to a replica, writes to the primary ('default').
+
+A request is pinned to the primary once it writes, for every unsafe
+method, and - through a short-lived cookie set by ReplicaPinningMiddleware -
+for the same client's requests right after a write (read-your-writes).
+"""
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+class _RoutingState:
+    __slots__ = ('pinned', 'wrote')
+
+    def __init__(self, pinned=False):
+        self.pinned = pinned
+        self.wrote = False
+
+
+_state = ContextVar('liteslido_db_routing', default=None)
+
+
+def replica_aliases():
+    return getattr(settings, 'DATABASE_REPLICAS', ())
+
+
+def begin_routing(pinned=False):
+    """Start routing state for a request; returns (state, token for end_routing)"""
+    state = _RoutingState(pinned)
+    return state, _state.set(state)
+
+
+def end_routing(token):
+    _state.reset(token)
+
+
+def reads_from_primary():
+    """Whether reads of the current request are sent to the primary"""
+    if not replica_aliases():
+        return True
+    state = _state.get()
+    return (state is not None and (state.pinned or state.wrote)) or connections[DEFAULT_DB_ALIAS].in_atomic_block
+
+
+@contextmanager
+def use_primary():
+    """Send every read in this block to the primary"""
+    state, token = begin_routing(pinned=True)
+    try:
+        yield state
+    finally:
+        end_routing(token)
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        replicas = replica_aliases()
+        if not replicas:
+            return None
+        if reads_from_primary():
+            return DEFAULT_DB_ALIAS
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if state is not None:
+            state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db not in replica_aliases()
@@ -0,0 +1,19 @@
+"""
+Settings for the multi-worker integration harness (events/test_multiworker.py).
+Workers share a file-based SQLite database; the cache is shared through
+CACHE_DIR (or REDIS_URL), exactly as in a multi-worker deployment.
+"""
+
+from .settings import *
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.environ['LITESLIDO_INTEGRATION_DB'],
+        'OPTIONS': {'timeout': 20},
+    }
+}
+
+PASSWORD_HASHERS = [
+    'django.contrib.auth.hashers.MD5PasswordHasher',
+]
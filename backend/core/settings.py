@@ -20,6 +20,24 @@ LOGIN_REDIRECT_URL = '/events/'
 
 LOGOUT_REDIRECT_URL = '/events/'
 
+# How long a join token from an event's QR code lets attendees join as guests
+JOIN_TOKEN_MAX_AGE = 12 * 60 * 60
+
+# Guests created per event, client address and window; sized for a venue where everyone shares one NAT address
+PARTICIPANT_JOIN_LIMIT = 300
+PARTICIPANT_JOIN_WINDOW = 10 * 60
+
+# Behind a proxy or CDN, the request header (META name) it puts the client address in, e.g.
+# HTTP_X_FORWARDED_FOR, and how many trusted proxies append to it; unset when clients connect directly
+CLIENT_ADDRESS_HEADER = os.getenv('CLIENT_ADDRESS_HEADER') or None
+TRUSTED_PROXY_COUNT = int(os.getenv('TRUSTED_PROXY_COUNT', '1'))
+
+# Signed cookie that remembers a device's guest, so joining again reuses it
+PARTICIPANT_COOKIE = 'liteslido_guest'
+
+# How long the anonymous question form (which has no CSRF cookie) stays valid
+QUESTION_FORM_TOKEN_MAX_AGE = 12 * 60 * 60
+
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
@@ -30,7 +48,7 @@ MEDIA_ROOT = BASE_DIR / 'media'
 SECRET_KEY = 'django-insecure-your-secret-key-here'
 
 # SECURITY WARNING: don't run with debug turned on in production!
-DEBUG = True
+DEBUG = os.getenv('DJANGO_DEBUG', 'true').lower() in ('1', 'true', 'yes')
 
 ALLOWED_HOSTS = [
     'localhost',
@@ -53,13 +71,22 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'events.middleware.metrics_middleware.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'events.middleware.static_middleware.StaticFilesMiddleware',
+    'events.middleware.compression_middleware.CompressionMiddleware',
+    'django.middleware.http.ConditionalGetMiddleware',
+    'events.middleware.replica_middleware.ReplicaPinningMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
+    'events.middleware.participant_middleware.ParticipantScopeMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'events.middleware.overload_middleware.OverloadMiddleware',
+    'events.middleware.query_audit_middleware.QueryAuditMiddleware',
+    'events.middleware.profiling_middleware.ProfilingMiddleware',
 ]
 
 ROOT_URLCONF = 'core.urls'
@@ -68,13 +95,21 @@ TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [],
-        'APP_DIRS': True,
         'OPTIONS': {
+            # Compiled templates are kept per process (DEBUG reloads them on file changes)
+            'loaders': [
+                ('django.template.loaders.cached.Loader', [
+                    'django.template.loaders.filesystem.Loader',
+                    'django.template.loaders.app_directories.Loader',
+                ]),
+            ],
+            'debug': DEBUG,
             'context_processors': [
                 'django.template.context_processors.debug',
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'events.context_processors.static_assets',
             ],
         },
     },
@@ -82,6 +117,10 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'core.wsgi.application'
 
+# Warm each worker up (URLconf, all templates, DB connections, caches of open events) before
+# it reports ready at /ready; run by core/wsgi.py and the ASGI lifespan startup in core/asgi.py
+WORKER_WARMUP = not DEBUG
+
 
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
@@ -94,9 +133,90 @@ DATABASES = {
         'PASSWORD': os.getenv('POSTGRES_PASSWORD', 'postgres'),
         'HOST': os.getenv('POSTGRES_HOST', 'db'),
         'PORT': os.getenv('POSTGRES_PORT', '5432'),
+        'CONN_HEALTH_CHECKS': True,
     }
 }
 
+# Keep connections open across requests so the ones opened at warm-up are reused. ASGI workers
+# run each request in a new thread and need psycopg's pool (POSTGRES_POOL=1) for that.
+if os.getenv('POSTGRES_POOL'):
+    DATABASES['default']['OPTIONS'] = {'pool': {'min_size': int(os.getenv('POSTGRES_POOL_MIN_SIZE', '2'))}}
+else:
+    DATABASES['default']['CONN_MAX_AGE'] = int(os.getenv('POSTGRES_CONN_MAX_AGE', '60'))
+
+# Read replicas (comma-separated hosts); reads are routed to them by core/db_router.py
+DATABASE_REPLICAS = []
+for _index, _host in enumerate(filter(None, os.getenv('POSTGRES_REPLICA_HOSTS', '').split(','))):
+    _alias = 'replica' if _index == 0 else f'replica_{_index + 1}'
+    DATABASES[_alias] = {**DATABASES['default'], 'HOST': _host.strip()}
+    DATABASE_REPLICAS.append(_alias)
+
+DATABASE_ROUTERS = ['core.db_router.ReplicaRouter']
+
+# After a client writes, its reads stay on the primary for this long (replication lag budget)
+REPLICA_PIN_SECONDS = 5
+REPLICA_PIN_COOKIE = 'liteslido_primary'
+
+
+# Caches
+# Every worker must share one cache: fragment/ETag version counters and
+# cached sessions live there. REDIS_URL is for production; CACHE_DIR
+# (FileBasedCache) shares a cache between workers on a single host.
+# Without either, each process gets its own LocMem cache (development).
+# Rendered question cards and poll blocks ({% cache %}) live in their own cache so
+# a 1,000-question event does not evict everything else (LocMem defaults to 300 entries)
+REDIS_URL = os.getenv('REDIS_URL')
+CACHE_DIR = os.getenv('CACHE_DIR')
+
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+            'KEY_PREFIX': 'liteslido',
+        },
+        'template_fragments': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+            'KEY_PREFIX': 'liteslido-fragments',
+        },
+    }
+elif CACHE_DIR:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.path.join(CACHE_DIR, 'default'),
+        },
+        'template_fragments': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.path.join(CACHE_DIR, 'template_fragments'),
+            'OPTIONS': {'MAX_ENTRIES': 20000},
+        },
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        },
+        'template_fragments': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'template-fragments',
+            'OPTIONS': {'MAX_ENTRIES': 20000},
+        },
+    }
+
+SHARED_CACHE = bool(REDIS_URL or CACHE_DIR)
+
+# Sessions are read from the shared cache and written through to the database;
+# a per-process cache would serve stale sessions, so plain DB sessions are used then
+SESSION_ENGINE = (
+    'django.contrib.sessions.backends.cached_db' if SHARED_CACHE
+    else 'django.contrib.sessions.backends.db'
+)
+
+# Flash messages travel in a cookie, so showing one never touches the session
+MESSAGE_STORAGE = 'django.contrib.messages.storage.cookie.CookieStorage'
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -133,6 +253,87 @@ USE_TZ = True
 # https://docs.djangoproject.com/en/5.2/howto/static-files/
 
 STATIC_URL = 'static/'
+STATIC_ROOT = BASE_DIR / 'staticfiles'
+
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    # Hashed filenames plus .gz/.br copies, written by collectstatic
+    'staticfiles': {
+        'BACKEND': 'core.static_storage.CompressedManifestStaticFilesStorage',
+    },
+}
+
+# gzip/brotli compression of dynamic responses; see events/middleware/compression_middleware.py
+COMPRESSION = {
+    'MIN_SIZE': 860,
+    'BROTLI_QUALITY': 5,
+}
+
+# Part of every event page ETag so a deploy with changed templates invalidates them
+RELEASE_VERSION = os.getenv('RELEASE_VERSION', '')
+
+# Serve STATIC_ROOT from the app with immutable cache headers (runserver serves it in DEBUG)
+SERVE_STATIC = not DEBUG
+
+# Purged Tailwind build (see tailwind.config.js); base.html falls back to the CDN if it is missing
+TAILWIND_STYLESHEET = 'events/css/app.css'
+
+# Static path of a vendored Chart.js 3.x build (e.g. 'events/vendor/chart.min.js').
+# When set, poll result charts are upgraded from the server-rendered SVG to Chart.js.
+POLL_CHARTJS = os.getenv('POLL_CHARTJS') or None
+
+# Addresses allowed to scrape /metrics (comma-separated, '*' for any)
+METRICS_ALLOWED_IPS = os.getenv('METRICS_ALLOWED_IPS', '127.0.0.1,::1').split(',')
+
+# Repeated (N+1) and slow query detection; see events/query_audit.py
+QUERY_AUDIT = {
+    'ENABLED': DEBUG,
+    'MAX_REPEATS': 10,  # same query shape per request/test
+    'SLOW_QUERY_MS': 100,
+    'RAISE': False,  # log warnings instead of failing
+}
+
+# Staff-only request profiling (header/query token from /profiling/); see events/profiling.py
+PROFILING = {
+    'ENABLED': os.getenv('PROFILING_ENABLED', str(DEBUG)).lower() in ('1', 'true', 'yes'),
+    'STORAGE_DIR': BASE_DIR / 'profiles',
+    'SAMPLE_INTERVAL': 0.002,  # seconds between stack samples
+    'MAX_SAMPLES': 5000,  # per profiled request
+    'MAX_PROFILES_PER_MINUTE': 6,  # per worker process
+    'MAX_STORED': 200,
+}
+
+# Overload protection (events/overload.py): while this worker's database or queueing load is over
+# these limits, low-priority views get a 503 with Retry-After and busy pages their last good copy
+OVERLOAD_PROTECTION = {
+    'ENABLED': os.getenv('OVERLOAD_PROTECTION', str(not DEBUG)).lower() in ('1', 'true', 'yes'),
+    'MAX_DB_IN_FLIGHT': 8,  # queries running at once in this worker
+    'MAX_DB_LATENCY': 0.25,  # seconds, moving average of query time
+    'MAX_QUEUE_TIME': 1.0,  # seconds queued before the worker, from the proxy's X-Request-Start
+    'RETRY_AFTER': 5,  # seconds
+    'LOW_PRIORITY_VIEWS': ('export_event', 'event_list', 'profile', 'profile_list', 'download_profile', 'leaderboard'),
+    'STALE_VIEWS': {'anonymous_event_detail': 'shared', 'poll_detail': 'per_user'},
+    'FRESH_DEADLINE': 1.0,  # seconds before a stale-able page falls back to its last good copy
+    'STALE_TTL': 600,  # seconds
+}
+
+# Shared (CDN / reverse proxy) caching of the anonymous event pages; see events/edge_cache.py
+EDGE_CACHE = {
+    'S_MAXAGE': 60,  # seconds
+    'PURGE_URLS': [url for url in os.getenv('EDGE_CACHE_PURGE_URLS', '').split(',') if url],
+    'PURGE_TIMEOUT': 2,  # seconds
+    'PURGE_INTERVAL': 1.0,  # seconds, least time between two purges of one event
+    'NEGATIVE_S_MAXAGE': 10,  # seconds, for error pages such as a closed event's
+}
+
+# Content filter for incoming questions; list files are reloaded when they change
+CONTENT_FILTER = {
+    'WORD_LIST': BASE_DIR / 'events' / 'content_filters' / 'words.txt',
+    'PATTERN_LIST': BASE_DIR / 'events' / 'content_filters' / 'patterns.txt',
+    'RELOAD_INTERVAL': 5,  # seconds between file change checks
+}
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
@@ -0,0 +1,50 @@
+"""
+Static files storage: hashed (manifest) filenames plus precompressed copies
+"""
+import gzip
+import re
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.base import ContentFile
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip copies are always written
+    brotli = None
+
+
+COMPRESSIBLE_RE = re.compile(r'\.(css|js|mjs|map|svg|json|txt|xml|html|ico|ttf|otf|eot)$', re.IGNORECASE)
+MIN_COMPRESS_SIZE = 512  # bytes; smaller files are not worth a second request path
+MAX_COMPRESSED_RATIO = 0.95  # keep a compressed copy only if it saves at least 5%
+
+
+def compressed_variants(content):
+    """Yield (suffix, compressed bytes) for the encodings worth storing"""
+    if len(content) < MIN_COMPRESS_SIZE:
+        return
+    variants = [('.gz', gzip.compress(content, compresslevel=9, mtime=0))]
+    if brotli is not None:
+        variants.append(('.br', brotli.compress(content, quality=11)))
+    for suffix, compressed in variants:
+        if len(compressed) <= len(content) * MAX_COMPRESSED_RATIO:
+            yield suffix, compressed
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """ManifestStaticFilesStorage that also writes .gz (and .br) next to each text asset"""
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run=dry_run, **options)
+        if dry_run:
+            return
+        names = set(paths) | set(self.hashed_files.values())
+        for name in sorted(names):
+            if not COMPRESSIBLE_RE.search(name) or not self.exists(name):
+                continue
+            with self.open(name) as original:
+                content = original.read()
+            for suffix, compressed in compressed_variants(content):
+                if self.exists(name + suffix):
+                    self.delete(name + suffix)
+                self._save(name + suffix, ContentFile(compressed))
+                yield name + suffix, name + suffix, True
@@ -0,0 +1,91 @@
+"""
+Test runner that audits the queries of every test for N+1 patterns
+"""
+import sys
+
+from django.core.cache import caches
+from django.test.runner import DiscoverRunner
+from events.query_audit import QueryAudit, QueryAuditError, audit_config, view_report
+
+
+class _AuditResultMixin:
+    """
+    unittest result hooks that audit the queries of every test. Only the
+    test method is audited: fixtures built in setUp()/setUpTestData() loop
+    on purpose and are not N+1 patterns. Every test starts with empty caches,
+    so version counters and rendered fragments never leak between tests.
+    """
+
+    def startTest(self, test):
+        for cache in caches.all(initialized_only=True):
+            cache.clear()
+        self._query_audit = None
+        call_test_method = test._callTestMethod
+
+        def audited_call(method):
+            audit = self._query_audit = QueryAudit().__enter__()
+            try:
+                return call_test_method(method)
+            finally:
+                audit.__exit__(None, None, None)
+
+        test._callTestMethod = audited_call
+        super().startTest(test)
+
+    def stopTest(self, test):
+        audit, self._query_audit = self._query_audit, None
+        test.__dict__.pop('_callTestMethod', None)
+        if audit is None:  # skipped, or setUp() failed
+            super().stopTest(test)
+            return
+        exempt = getattr(getattr(test, test._testMethodName, None), 'query_audit_exempt', False)
+        violations = [] if exempt else audit.violations()
+        if violations:
+            self.query_audit_violations.append((test.id(), violations))
+            if audit_config()['RAISE']:
+                try:
+                    raise QueryAuditError('\n'.join(violations))
+                except QueryAuditError:
+                    self.addFailure(test, sys.exc_info())
+        super().stopTest(test)
+
+
+class QueryAuditTestRunner(DiscoverRunner):
+    """
+    Test runner that audits every test's queries and prints a report at the
+    end. Benchmarks and multi-process integration tests (wall-clock asserts,
+    output on stdout) only run with --include-slow or an explicit --tag.
+    """
+
+    slow_tags = {'benchmark', 'integration'}
+
+    def __init__(self, *args, include_slow=False, **kwargs):
+        super().__init__(*args, **kwargs)
+        if not include_slow:
+            self.exclude_tags |= self.slow_tags - self.tags
+
+    @classmethod
+    def add_arguments(cls, parser):
+        super().add_arguments(parser)
+        parser.add_argument(
+            '--include-slow', action='store_true',
+            help='Also run the tests tagged benchmark or integration.',
+        )
+
+    def get_resultclass(self):
+        base = super().get_resultclass() or self.test_runner.resultclass
+        violations = self.query_audit_violations = []
+
+        class AuditedResult(_AuditResultMixin, base):
+            query_audit_violations = violations
+
+        return AuditedResult
+
+    def suite_result(self, suite, result, **kwargs):
+        for test_id, violations in self.query_audit_violations:
+            print(f"\nQuery audit: {test_id}", file=sys.stderr)
+            for violation in violations:
+                print(f"    ! {violation}", file=sys.stderr)
+        if view_report.views:
+            print('\n' + view_report.format(), file=sys.stderr)
+        return super().suite_result(suite, result, **kwargs)
@@ -10,7 +10,20 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': ':memory:',  # Use in-memory SQLite database for tests
-    }
+    },
+    # Exercises replica routing; the test runner points it at the default test database
+    'replica': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': ':memory:',
+        'TEST': {'MIRROR': 'default'},
+    },
+}
+DATABASE_REPLICAS = ['replica']
+
+# Tests run without collectstatic, so there is no manifest to look hashed names up in
+STORAGES = {
+    **STORAGES,
+    'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
 }
 
 # Disable password hashing for faster tests
@@ -18,8 +31,9 @@ PASSWORD_HASHERS = [
     'django.contrib.auth.hashers.MD5PasswordHasher',
 ]
 
-# Use faster test runner
-TEST_RUNNER = 'django.test.runner.DiscoverRunner'
+# Audit every test's queries for N+1 patterns and report them per test and view
+TEST_RUNNER = 'core.test_runner.QueryAuditTestRunner'
+QUERY_AUDIT = {**QUERY_AUDIT, 'ENABLED': True}
 
 # Disable logging during tests
 LOGGING = {
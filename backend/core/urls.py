@@ -2,6 +2,9 @@
 from django.contrib import admin
 from django.urls import path, include
 from events.views.auth_views import register, custom_login
+from events.views.metrics_views import metrics
+from events.views.health_views import ready
+from events.views.profiling_views import profile_list, download_profile
 from django.contrib.auth import views as auth_views
 from django.conf.urls.static import static
 from django.conf import settings
@@ -15,6 +18,10 @@ urlpatterns = [
     path('accounts/password_change/', auth_views.PasswordChangeView.as_view(success_url='/accounts/password_change/done/'), name='password_change'),
     path('accounts/password_change/done/', auth_views.PasswordChangeDoneView.as_view(), name='password_change_done'),
     path('events/', include('events.urls')),
+    path('metrics', metrics, name='metrics'),
+    path('ready', ready, name='ready'),
+    path('profiling/', profile_list, name='profile_list'),
+    path('profiling/<str:request_id>.<str:kind>', download_profile, name='download_profile'),
 ]
 
 if settings.DEBUG:
@@ -2,6 +2,9 @@
 WSGI config for core project.
 
 It exposes the WSGI callable as a module-level variable named ``application``.
+Each worker warms up when it loads the application, before it accepts
+requests (so do not load it in a pre-forking master, e.g. gunicorn --preload,
+or the database connections opened here would be shared by the workers).
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/wsgi/
@@ -9,8 +12,13 @@ https://docs.djangoproject.com/en/5.2/howto/deployment/wsgi/
 
 import os
 
+from django.conf import settings
 from django.core.wsgi import get_wsgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
 
 application = get_wsgi_application()
+
+if settings.WORKER_WARMUP:
+    from events.warmup import warm_up_worker
+    warm_up_worker()
@@ -1,18 +1,29 @@
 # backend/events/admin.py
 
 from django.contrib import admin
-from .models import Event, Profile, Question, Poll, PollOption
+from .models import Event, EventArchive, Participant, Profile, Question, Poll, PollOption
 
 @admin.register(Event)
 class EventAdmin(admin.ModelAdmin):
     list_display = ('code', 'title', 'created_at')
     search_fields = ('title', 'code')
 
+@admin.register(EventArchive)
+class EventArchiveAdmin(admin.ModelAdmin):
+    list_display = ('event', 'question_count', 'like_count', 'vote_count', 'archived_at')
+    readonly_fields = ('question_count', 'like_count', 'poll_count', 'vote_count', 'archived_at')
+    exclude = ('data',)
+
+@admin.register(Participant)
+class ParticipantAdmin(admin.ModelAdmin):
+    list_display = ('user', 'event', 'joined_at')
+    list_filter = ('event',)
+
 @admin.register(Question)
 class QuestionAdmin(admin.ModelAdmin):
-    list_display = ('event', 'text', 'author', 'author_name', 'created_at')
+    list_display = ('event', 'text', 'author', 'author_name', 'status', 'is_flagged', 'created_at')
     search_fields = ('text', 'author_name')
-    list_filter = ('event', 'created_at')
+    list_filter = ('status', 'is_flagged', 'event', 'created_at')
 
 @admin.register(Poll)
 class PollAdmin(admin.ModelAdmin):
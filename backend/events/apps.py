@@ -7,3 +7,4 @@ class EventsConfig(AppConfig):
     def ready(self):
         super().ready()
         import events.signals
+        import events.checks
@@ -0,0 +1,29 @@
+"""
+System checks
+"""
+from django.conf import settings
+from django.core.checks import Tags, Warning, register
+
+
+@register(Tags.caches, deploy=True)
+def check_shared_cache(app_configs, **kwargs):
+    """Cache versions and cached sessions are only consistent across workers with a shared cache"""
+    if getattr(settings, 'SHARED_CACHE', False):
+        return []
+    return [Warning(
+        "No shared cache is configured, so every worker keeps its own page and fragment versions.",
+        hint="Set REDIS_URL (or CACHE_DIR for workers on a single host) when running more than one worker.",
+        id='events.W001',
+    )]
+
+
+@register(deploy=True)
+def check_leaderboard_store(app_configs, **kwargs):
+    """Quiz leaderboards are only shared between workers through Redis"""
+    if getattr(settings, 'REDIS_URL', None):
+        return []
+    return [Warning(
+        "Quiz leaderboards are kept in process memory because REDIS_URL is not set.",
+        hint="Set REDIS_URL when running more than one worker, or each worker ranks only the answers it saw.",
+        id='events.W002',
+    )]
@@ -0,0 +1,22 @@
+"""
+Template context processors
+"""
+from functools import cache
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.contrib.staticfiles.storage import staticfiles_storage
+
+
+@cache
+def _built_stylesheet():
+    # Checked once per process: the built file only changes on deploy
+    path = getattr(settings, 'TAILWIND_STYLESHEET', None)
+    if path and (staticfiles_storage.exists(path) or finders.find(path)):
+        return path
+    return None
+
+
+def static_assets(request):
+    """Expose the pre-built Tailwind stylesheet, if one was built"""
+    return {'tailwind_stylesheet': _built_stylesheet()}
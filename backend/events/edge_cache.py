@@ -0,0 +1,162 @@
+"""
+Shared (CDN / reverse proxy) caching of the anonymous event pages
+
+The anonymous event page and its ask-a-question form are rendered without
+touching the session, the flash messages or the CSRF cookie (base.html
+skips them for `public_page`, the form carries a signed token instead), so
+they set no cookie and never vary on Cookie. They are sent with
+Cache-Control: public, s-maxage=EDGE_CACHE['S_MAXAGE'] and a Surrogate-Key
+naming the event.
+
+Every change to an event page already goes through invalidate_event_page();
+after the transaction commits it sends event_page_changed, which
+purge_edge_caches() queues. A background thread turns the queue into HTTP
+PURGEs carrying the Surrogate-Key to each of EDGE_CACHE['PURGE_URLS']
+(Varnish xkey, Fastly and most CDNs purge by that header), at most one per
+event and PURGE_INTERVAL: a burst of likes costs one purge, not one each,
+and never holds up the request. Error pages (a closed event's 404) are
+only kept for NEGATIVE_S_MAXAGE.
+
+The proxy must pass requests carrying the flash messages cookie to the
+origin: right after asking a question the page is rendered privately to
+show the confirmation.
+"""
+import logging
+import threading
+import time
+import urllib.request
+
+from django.conf import settings
+from django.contrib.messages.storage.cookie import CookieStorage
+from django.db import transaction
+from django.dispatch import Signal, receiver
+from django.utils.cache import patch_cache_control
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'S_MAXAGE': 60,  # seconds shared caches may serve a public page without asking
+    'PURGE_URLS': (),  # proxies/CDN endpoints that accept PURGE with a Surrogate-Key header
+    'PURGE_TIMEOUT': 2,  # seconds
+    'PURGE_INTERVAL': 1.0,  # seconds, least time between two purges of the same event
+    'NEGATIVE_S_MAXAGE': 10,  # seconds shared caches may keep an error page
+}
+
+# Sent with event_id after a change to an event page has been committed
+event_page_changed = Signal()
+
+
+def get_config():
+    return {**DEFAULTS, **getattr(settings, 'EDGE_CACHE', {})}
+
+
+def surrogate_key(event_id):
+    return f'liteslido-event-{event_id}'
+
+
+def carries_flash_messages(request):
+    """Whether the request brings flash messages, without touching the session"""
+    return CookieStorage.cookie_name in request.COOKIES
+
+
+def patch_public_cache_headers(response, event_id, s_maxage=None):
+    """Let shared caches keep the page until it is purged or s-maxage runs out; browsers revalidate"""
+    config = get_config()
+    s_maxage = config['S_MAXAGE'] if s_maxage is None else min(s_maxage, config['S_MAXAGE'])
+    if response.status_code >= 400:
+        s_maxage = min(s_maxage, config['NEGATIVE_S_MAXAGE'])
+    patch_cache_control(response, public=True, max_age=0, s_maxage=s_maxage)
+    response['Surrogate-Key'] = surrogate_key(event_id)
+    return response
+
+
+def patch_private_cache_headers(response):
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+def notify_event_page_changed(event_id):
+    """Send event_page_changed once the current transaction (if any) commits"""
+    transaction.on_commit(lambda: event_page_changed.send(sender=None, event_id=event_id))
+
+
+def send_purges(event_id, config):
+    """PURGE an event's pages from every configured shared cache; failures are logged"""
+    for url in config['PURGE_URLS']:
+        request = urllib.request.Request(url, method='PURGE', headers={'Surrogate-Key': surrogate_key(event_id)})
+        try:
+            urllib.request.urlopen(request, timeout=config['PURGE_TIMEOUT']).close()
+        except OSError as exc:
+            logger.warning("Purging event %s from %s failed: %s", event_id, url, exc)
+
+
+class PurgeQueue:
+    """
+    Purges waiting to be sent by a background thread, coalesced per event:
+    an event is purged at most once per PURGE_INTERVAL, and changes made
+    while its purge waits are covered by it
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._due = {}  # event_id -> when its purge may be sent (monotonic)
+        self._sent = {}  # event_id -> when it was last purged
+        self._sending = 0
+        self._thread = None
+
+    def add(self, event_id):
+        interval = get_config()['PURGE_INTERVAL']
+        with self._condition:
+            if event_id not in self._due:
+                self._due[event_id] = max(time.monotonic(), self._sent.get(event_id, float('-inf')) + interval)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='edge-cache-purge', daemon=True)
+                self._thread.start()
+            self._condition.notify_all()
+
+    def _next(self):
+        """Wait for the next due purge and take it off the queue"""
+        with self._condition:
+            while True:
+                now = time.monotonic()
+                event_id = min(self._due, key=self._due.get, default=None)
+                if event_id is not None and self._due[event_id] <= now:
+                    del self._due[event_id]
+                    self._sent[event_id] = now
+                    self._sending += 1
+                    return event_id
+                self._condition.wait(None if event_id is None else self._due[event_id] - now)
+
+    def _run(self):
+        while True:
+            event_id = self._next()
+            try:
+                send_purges(event_id, get_config())
+            finally:
+                with self._condition:
+                    self._sending -= 1
+                    interval = get_config()['PURGE_INTERVAL']
+                    now = time.monotonic()
+                    self._sent = {key: sent for key, sent in self._sent.items() if now - sent < interval}
+                    self._condition.notify_all()
+
+    def join(self, timeout=None):
+        """Wait until every queued purge has been sent (for tests and shutdown)"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            while self._due or self._sending:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._condition.wait(remaining)
+        return True
+
+
+purge_queue = PurgeQueue()
+
+
+@receiver(event_page_changed)
+def purge_edge_caches(sender, event_id, **kwargs):
+    """Queue a purge of the event's pages from the configured shared caches"""
+    if get_config()['PURGE_URLS']:
+        purge_queue.add(event_id)
@@ -1,6 +1,8 @@
 from django import forms
 from django.contrib.auth.forms import UserCreationForm, AuthenticationForm, PasswordChangeForm
 from .models import Event, Question, Poll, PollOption, Profile
+from .services.filter_services import check_question_content, CLEAN
+from .services.question_services import check_question_form_token
 
 class EventForm(forms.ModelForm):
     class Meta:
@@ -26,6 +28,13 @@ class QuestionForm(forms.ModelForm):
             })
         }
 
+    content_flag = CLEAN
+
+    def clean_text(self):
+        text = self.cleaned_data['text']
+        self.content_flag = check_question_content(text)
+        return text
+
 class AnonymousQuestionForm(forms.Form):
     """Form for anonymous users to ask questions"""
     username = forms.CharField(
@@ -44,18 +53,62 @@ class AnonymousQuestionForm(forms.Form):
         })
     )
 
+    content_flag = CLEAN
+
+    def __init__(self, *args, event_code, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.event_code = event_code
+
+    def clean_text(self):
+        text = self.cleaned_data['text']
+        self.content_flag = check_question_content(text)
+        return text
+
+    def clean(self):
+        # Stands in for the CSRF check: the form page is cached publicly and sets no cookie
+        if self.is_bound and not check_question_form_token(self.data.get('form_token'), self.event_code):
+            raise forms.ValidationError("This form has expired. Please submit your question again.")
+        return super().clean()
+
 # Form for creating a poll
 class PollForm(forms.ModelForm):
     class Meta:
         model = Poll
-        fields = ['question']
+        fields = ['question', 'kind', 'time_limit']
+        labels = {'time_limit': 'Quiz time limit (seconds)'}
+        help_texts = {'time_limit': 'Set to run this poll as a timed quiz question; tick the correct options.'}
         widgets = {
             'question': forms.TextInput(attrs={
                 'class': 'w-full border rounded px-3 py-2 focus:outline-none focus:ring',
                 'placeholder': 'Enter poll question...'
-            })
+            }),
+            'kind': forms.Select(attrs={
+                'class': 'w-full border rounded px-3 py-2 focus:outline-none focus:ring'
+            }),
+            'time_limit': forms.NumberInput(attrs={
+                'class': 'w-full border rounded px-3 py-2 focus:outline-none focus:ring',
+                'min': 5,
+                'placeholder': 'Leave empty for a regular poll'
+            }),
         }
 
+    def clean(self):
+        cleaned_data = super().clean()
+        if cleaned_data.get('time_limit') is not None and cleaned_data.get('kind') != Poll.Kind.CHOICE:
+            raise forms.ValidationError("Only multiple-choice polls can be timed quiz questions.")
+        return cleaned_data
+
+# Form for answering an open-text poll
+class PollResponseForm(forms.Form):
+    text = forms.CharField(
+        max_length=200,
+        widget=forms.TextInput(attrs={
+            'class': 'w-full border rounded px-3 py-2 focus:outline-none focus:ring',
+            'placeholder': 'Your answer...',
+            'autocomplete': 'off',
+        })
+    )
+
 # Form for creating poll options
 class PollOptionForm(forms.ModelForm):
     class Meta:
@@ -0,0 +1,275 @@
+"""
+Sorted sets for live leaderboards.
+
+Production uses Redis sorted sets (REDIS_URL). Without Redis, LocalSortedSets
+is an in-process stand-in exposing the subset of the redis-py client API
+the quiz services use, backed by an indexable skip list so score updates,
+rank lookups and top-N ranges are O(log n). Like Redis, members with equal
+scores are ordered lexicographically.
+"""
+import random
+import threading
+import time
+
+from django.conf import settings
+
+MAX_LEVEL = 32
+P = 0.25
+
+
+class _Node:
+    __slots__ = ('member', 'score', 'forward', 'span')
+
+    def __init__(self, level, score=0.0, member=''):
+        self.member = member
+        self.score = score
+        self.forward = [None] * level
+        self.span = [0] * level  # elements skipped by forward[i]
+
+
+class SkipList:
+    """Indexable skip list ordered by (score, member), after Redis' zskiplist"""
+
+    def __init__(self, seed=None):
+        self.head = _Node(MAX_LEVEL)
+        self.level = 1
+        self.length = 0
+        self._random = random.Random(seed)
+
+    def __len__(self):
+        return self.length
+
+    def _random_level(self):
+        level = 1
+        while level < MAX_LEVEL and self._random.random() < P:
+            level += 1
+        return level
+
+    @staticmethod
+    def _before(node, score, member):
+        return node is not None and (node.score, node.member) < (score, member)
+
+    def insert(self, score, member):
+        update = [None] * MAX_LEVEL
+        rank = [0] * MAX_LEVEL
+        node = self.head
+        for i in range(self.level - 1, -1, -1):
+            rank[i] = 0 if i == self.level - 1 else rank[i + 1]
+            while self._before(node.forward[i], score, member):
+                rank[i] += node.span[i]
+                node = node.forward[i]
+            update[i] = node
+
+        level = self._random_level()
+        if level > self.level:
+            for i in range(self.level, level):
+                rank[i] = 0
+                update[i] = self.head
+                update[i].span[i] = self.length
+            self.level = level
+
+        new = _Node(level, score, member)
+        for i in range(level):
+            new.forward[i] = update[i].forward[i]
+            update[i].forward[i] = new
+            new.span[i] = update[i].span[i] - (rank[0] - rank[i])
+            update[i].span[i] = rank[0] - rank[i] + 1
+        for i in range(level, self.level):
+            update[i].span[i] += 1
+        self.length += 1
+
+    def delete(self, score, member):
+        update = [None] * MAX_LEVEL
+        node = self.head
+        for i in range(self.level - 1, -1, -1):
+            while self._before(node.forward[i], score, member):
+                node = node.forward[i]
+            update[i] = node
+        node = node.forward[0]
+        if node is None or (node.score, node.member) != (score, member):
+            return False
+        for i in range(self.level):
+            if update[i].forward[i] is node:
+                update[i].span[i] += node.span[i] - 1
+                update[i].forward[i] = node.forward[i]
+            else:
+                update[i].span[i] -= 1
+        while self.level > 1 and self.head.forward[self.level - 1] is None:
+            self.level -= 1
+        self.length -= 1
+        return True
+
+    def rank(self, score, member):
+        """0-based ascending rank of an element known to be in the list"""
+        rank = 0
+        node = self.head
+        for i in range(self.level - 1, -1, -1):
+            while node.forward[i] is not None and (node.forward[i].score, node.forward[i].member) <= (score, member):
+                rank += node.span[i]
+                node = node.forward[i]
+            if node is not self.head and node.member == member:
+                return rank - 1
+        return None
+
+    def _node_at(self, index):
+        """Node at a 0-based ascending rank"""
+        traversed = 0
+        node = self.head
+        for i in range(self.level - 1, -1, -1):
+            while node.forward[i] is not None and traversed + node.span[i] <= index + 1:
+                traversed += node.span[i]
+                node = node.forward[i]
+            if traversed == index + 1:
+                return node
+        return None
+
+    def range(self, start, stop):
+        """(member, score) pairs with ascending ranks start..stop inclusive"""
+        start, stop = max(start, 0), min(stop, self.length - 1)
+        if start > stop:
+            return []
+        node = self._node_at(start)
+        items = []
+        for _ in range(stop - start + 1):
+            items.append((node.member, node.score))
+            node = node.forward[0]
+        return items
+
+
+class SortedSet:
+    def __init__(self):
+        self.scores = {}
+        self.list = SkipList()
+
+    def set(self, member, score):
+        old = self.scores.get(member)
+        if old is not None:
+            self.list.delete(old, member)
+        self.scores[member] = score
+        self.list.insert(score, member)
+
+
+class LocalSortedSets:
+    """In-process stand-in for the redis-py sorted-set calls used by the quiz leaderboard"""
+
+    def __init__(self):
+        self._sets = {}
+        self._strings = {}
+        self._expires = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _index(length, index):
+        return index + length if index < 0 else index
+
+    def zadd(self, name, mapping):
+        with self._lock:
+            sorted_set = self._sets.setdefault(name, SortedSet())
+            added = sum(1 for member in mapping if member not in sorted_set.scores)
+            for member, score in mapping.items():
+                sorted_set.set(str(member), float(score))
+            return added
+
+    def zincrby(self, name, amount, value):
+        with self._lock:
+            sorted_set = self._sets.setdefault(name, SortedSet())
+            value = str(value)
+            score = sorted_set.scores.get(value, 0.0) + amount
+            sorted_set.set(value, score)
+            return score
+
+    def zscore(self, name, value):
+        sorted_set = self._sets.get(name)
+        return sorted_set.scores.get(str(value)) if sorted_set else None
+
+    def zcard(self, name):
+        sorted_set = self._sets.get(name)
+        return len(sorted_set.scores) if sorted_set else 0
+
+    def zrevrank(self, name, value):
+        with self._lock:
+            sorted_set = self._sets.get(name)
+            value = str(value)
+            if not sorted_set or value not in sorted_set.scores:
+                return None
+            return len(sorted_set.list) - 1 - sorted_set.list.rank(sorted_set.scores[value], value)
+
+    def zrevrange(self, name, start, end, withscores=False):
+        with self._lock:
+            sorted_set = self._sets.get(name)
+            if not sorted_set:
+                return []
+            length = len(sorted_set.list)
+            start, end = self._index(length, start), self._index(length, end)
+            items = sorted_set.list.range(length - 1 - end, length - 1 - start)[::-1]
+        return items if withscores else [member for member, _ in items]
+
+    def _expire_string(self, name):
+        if name in self._expires and self._expires[name] <= time.monotonic():
+            del self._expires[name]
+            self._strings.pop(name, None)
+
+    def exists(self, *names):
+        with self._lock:
+            for name in names:
+                self._expire_string(name)
+            return sum(1 for name in names if name in self._sets or name in self._strings)
+
+    def set(self, name, value, ex=None, nx=False):
+        with self._lock:
+            self._expire_string(name)
+            if nx and name in self._strings:
+                return None
+            self._strings[name] = value
+            self._expires.pop(name, None)
+            if ex is not None:
+                self._expires[name] = time.monotonic() + ex
+            return True
+
+    def rename(self, src, dst):
+        with self._lock:
+            if src not in self._sets:
+                raise KeyError(src)  # Redis answers "no such key"
+            self._sets[dst] = self._sets.pop(src)
+            return True
+
+    def delete(self, *names):
+        with self._lock:
+            for name in names:
+                self._expires.pop(name, None)
+            return sum(
+                1 for name in names
+                if self._sets.pop(name, None) is not None or self._strings.pop(name, None) is not None
+            )
+
+    def flushdb(self):
+        with self._lock:
+            self._sets.clear()
+            self._strings.clear()
+            self._expires.clear()
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_leaderboard_store():
+    """Redis client when REDIS_URL is configured, else the process-wide local stand-in"""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                redis_url = getattr(settings, 'REDIS_URL', None)
+                if redis_url:
+                    import redis
+                    _store = redis.Redis.from_url(redis_url, decode_responses=True)
+                else:
+                    _store = LocalSortedSets()
+    return _store
+
+
+def reset_leaderboard_store():
+    """Forget the store so the next call picks up changed settings (used by tests)"""
+    global _store
+    with _store_lock:
+        _store = None
@@ -0,0 +1,31 @@
+"""
+Archive closed events and purge their questions, likes and votes from the hot tables
+"""
+from django.core.management.base import BaseCommand
+from ...services import (
+    find_archivable_events, archive_event, ARCHIVE_AFTER_DAYS, ARCHIVE_BATCH_SIZE
+)
+
+
+class Command(BaseCommand):
+    help = "Move events closed for more than --days into compressed archives"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=ARCHIVE_AFTER_DAYS)
+        parser.add_argument('--batch-size', type=int, default=ARCHIVE_BATCH_SIZE)
+        parser.add_argument('--dry-run', action='store_true', help="Only list the events that would be archived")
+
+    def handle(self, *args, **options):
+        archived = 0
+        for event in find_archivable_events(days=options['days']):
+            if options['dry_run']:
+                self.stdout.write(f"Would archive {event}")
+                continue
+            archive = archive_event(event, batch_size=options['batch_size'])
+            archived += 1
+            self.stdout.write(
+                f"Archived {event}: {archive.question_count} questions, "
+                f"{archive.like_count} likes, {archive.vote_count} votes"
+            )
+        if not options['dry_run']:
+            self.stdout.write(self.style.SUCCESS(f"Archived {archived} event(s)."))
@@ -0,0 +1,30 @@
+"""
+Export an event's questions, likes and poll results as CSV or JSON Lines
+"""
+from django.core.management.base import BaseCommand, CommandError
+from ...services import find_event_by_code, stream_event_export, EXPORT_FORMATS, EXPORT_CHUNK_SIZE
+
+
+class Command(BaseCommand):
+    help = "Stream an event export (questions, likes, polls, votes) to a file or stdout"
+
+    def add_arguments(self, parser):
+        parser.add_argument('event_code')
+        parser.add_argument('--format', dest='export_format', choices=sorted(EXPORT_FORMATS), default='csv')
+        parser.add_argument('--output', '-o', help="Output file path (defaults to stdout)")
+        parser.add_argument('--chunk-size', type=int, default=EXPORT_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        event = find_event_by_code(options['event_code'])
+        if event is None:
+            raise CommandError(f"Event {options['event_code']!r} does not exist.")
+
+        chunks = stream_event_export(event, options['export_format'], chunk_size=options['chunk_size'])
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8', newline='') as fh:
+                for chunk in chunks:
+                    fh.write(chunk)
+            self.stderr.write(self.style.SUCCESS(f"Exported {event.code} to {options['output']}"))
+        else:
+            for chunk in chunks:
+                self.stdout.write(chunk, ending='')
@@ -0,0 +1,23 @@
+"""
+Rescale the hot question scores of unarchived events to a current epoch; run hourly
+(the scheduler service in docker-compose.yml)
+"""
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from ...services import find_events_to_rescale, rescale_hot_scores, HOT_RESCALE_AFTER
+
+
+class Command(BaseCommand):
+    help = "Keep hot question scores in float range by moving old event epochs forward"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hours', type=float, default=HOT_RESCALE_AFTER.total_seconds() / 3600,
+                            help="Rescale events whose epoch is older than this")
+
+    def handle(self, *args, **options):
+        rescaled = 0
+        for event_id in find_events_to_rescale(older_than=timedelta(hours=options['hours'])):
+            rescale_hot_scores(event_id)
+            rescaled += 1
+        self.stdout.write(self.style.SUCCESS(f"Rescaled hot scores of {rescaled} event(s)."))
@@ -0,0 +1,17 @@
+"""
+Compile every template, reporting syntax errors (use as a deploy check)
+"""
+from django.core.management.base import BaseCommand, CommandError
+from ...template_warmup import warm_templates
+
+
+class Command(BaseCommand):
+    help = "Precompile all templates and fail on template syntax errors"
+
+    def handle(self, *args, **options):
+        compiled, seconds, errors = warm_templates()
+        for name, error in errors.items():
+            self.stderr.write(f"{name}: {error}")
+        if errors:
+            raise CommandError(f"{len(errors)} template(s) failed to compile.")
+        self.stdout.write(self.style.SUCCESS(f"Compiled {compiled} templates in {seconds * 1000:.0f} ms."))
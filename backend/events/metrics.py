@@ -0,0 +1,145 @@
+"""
+In-process request metrics with Prometheus text exposition
+
+Each thread records into its own shard, so the request path never takes a
+lock; shards are only merged when /metrics is scraped. Metrics are per
+worker process: scrape every worker (or aggregate in Prometheus) to get the
+whole deployment.
+"""
+import bisect
+import threading
+from collections import defaultdict
+
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+SIZE_BUCKETS = (1_000, 5_000, 10_000, 50_000, 100_000, 500_000, 1_000_000, 5_000_000)
+
+HISTOGRAMS = {
+    'liteslido_request_duration_seconds': ('Request latency by view', LATENCY_BUCKETS),
+    'liteslido_db_queries_per_request': ('Database queries per request by view', COUNT_BUCKETS),
+    'liteslido_db_duration_seconds': ('Time spent in database queries per request by view', LATENCY_BUCKETS),
+    'liteslido_template_render_seconds': ('Template render time per request by view', LATENCY_BUCKETS),
+    'liteslido_response_size_bytes': ('Response body size by view', SIZE_BUCKETS),
+}
+COUNTERS = {
+    'liteslido_requests_total': 'Requests by view and status code',
+    'liteslido_shed_requests_total': 'Requests answered with a 503 while overloaded, by view and reason',
+    'liteslido_stale_responses_total': 'Stale page copies served, by view and reason',
+}
+
+
+class _Histogram:
+    __slots__ = ('buckets', 'counts', 'sum', 'count')
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class _Shard:
+    """Metrics written by a single thread"""
+
+    def __init__(self):
+        self.histograms = {}
+        self.counters = defaultdict(int)
+
+
+_local = threading.local()
+_shards = []
+_shards_lock = threading.Lock()
+
+
+def _shard():
+    shard = getattr(_local, 'shard', None)
+    if shard is None:
+        shard = _local.shard = _Shard()
+        with _shards_lock:
+            _shards.append(shard)
+    return shard
+
+
+def observe(name, labels, value):
+    """Record a histogram observation; labels is a tuple of (key, value) pairs"""
+    histograms = _shard().histograms
+    histogram = histograms.get((name, labels))
+    if histogram is None:
+        histogram = histograms[(name, labels)] = _Histogram(HISTOGRAMS[name][1])
+    histogram.observe(value)
+
+
+def increment(name, labels, amount=1):
+    """Increment a counter; labels is a tuple of (key, value) pairs"""
+    _shard().counters[(name, labels)] += amount
+
+
+def reset():
+    """Drop all recorded metrics"""
+    with _shards_lock:
+        for shard in _shards:
+            shard.histograms.clear()
+            shard.counters.clear()
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{key}="{_escape(value)}"' for key, value in pairs) + '}'
+
+
+def _format_bound(bound):
+    return repr(float(bound)) if isinstance(bound, float) else str(bound)
+
+
+def render_prometheus():
+    """Merge all shards and render them in the Prometheus text format"""
+    with _shards_lock:
+        shards = list(_shards)
+
+    merged_histograms = {}
+    merged_counters = defaultdict(int)
+    for shard in shards:
+        for key, histogram in list(shard.histograms.items()):
+            merged = merged_histograms.get(key)
+            if merged is None:
+                merged = merged_histograms[key] = _Histogram(histogram.buckets)
+            merged.counts = [a + b for a, b in zip(merged.counts, histogram.counts)]
+            merged.sum += histogram.sum
+            merged.count += histogram.count
+        for key, value in list(shard.counters.items()):
+            merged_counters[key] += value
+
+    lines = []
+    for name, help_text in COUNTERS.items():
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} counter')
+        for (metric, labels), value in sorted(merged_counters.items()):
+            if metric == name:
+                lines.append(f'{name}{_format_labels(labels)} {value}')
+
+    for name, (help_text, buckets) in HISTOGRAMS.items():
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} histogram')
+        for (metric, labels), histogram in sorted(merged_histograms.items(), key=lambda item: item[0]):
+            if metric != name:
+                continue
+            cumulative = 0
+            for bound, count in zip(buckets, histogram.counts):
+                cumulative += count
+                lines.append(f'{name}_bucket{_format_labels(labels, [("le", _format_bound(bound))])} {cumulative}')
+            lines.append(f'{name}_bucket{_format_labels(labels, [("le", "+Inf")])} {histogram.count}')
+            lines.append(f'{name}_sum{_format_labels(labels)} {histogram.sum}')
+            lines.append(f'{name}_count{_format_labels(labels)} {histogram.count}')
+    return '\n'.join(lines) + '\n'
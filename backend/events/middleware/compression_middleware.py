@@ -0,0 +1,75 @@
+"""
+Response compression: brotli when available and accepted, gzip otherwise
+"""
+from django.conf import settings
+from django.middleware.gzip import GZipMiddleware
+from django.utils.cache import patch_vary_headers
+from django.utils.regex_helper import _lazy_re_compile
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+re_accepts_brotli = _lazy_re_compile(r'\bbr\b')
+
+DEFAULTS = {
+    'MIN_SIZE': 860,  # bytes; below this the headers cost more than compression saves
+    'BROTLI_QUALITY': 5,  # 11 is for static assets built ahead of time, not per request
+    'CONTENT_TYPES': (
+        'text/', 'application/json', 'application/javascript', 'application/xml', 'image/svg+xml',
+    ),
+}
+
+
+def compression_config():
+    return {**DEFAULTS, **getattr(settings, 'COMPRESSION', {})}
+
+
+def brotli_sequence(sequence, quality):
+    """Compress an iterable of byte chunks as one brotli stream"""
+    compressor = brotli.Compressor(quality=quality)
+    for chunk in sequence:
+        data = compressor.process(chunk)
+        if data:
+            yield data
+    yield compressor.finish()
+
+
+class CompressionMiddleware(GZipMiddleware):
+    """
+    GZipMiddleware with a size threshold, a text content-type allowlist
+    (images and archives are already compressed) and brotli support.
+    Streaming responses (e.g. exports) are compressed chunk by chunk.
+    """
+
+    def process_response(self, request, response):
+        if response.has_header('Content-Encoding') or response.status_code in (204, 304):
+            return response
+        config = compression_config()
+        content_type = response.get('Content-Type', '').split(';')[0].strip().lower()
+        if not content_type.startswith(tuple(config['CONTENT_TYPES'])):
+            return response
+        if not response.streaming and len(response.content) < config['MIN_SIZE']:
+            return response
+
+        accepted = request.META.get('HTTP_ACCEPT_ENCODING', '')
+        if brotli is None or response.is_async or not re_accepts_brotli.search(accepted):
+            return super().process_response(request, response)
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        if response.streaming:
+            response.streaming_content = brotli_sequence(response.streaming_content, config['BROTLI_QUALITY'])
+            del response.headers['Content-Length']
+        else:
+            compressed = brotli.compress(response.content, quality=config['BROTLI_QUALITY'])
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response.headers['Content-Length'] = str(len(compressed))
+
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        response.headers['Content-Encoding'] = 'br'
+        return response
@@ -0,0 +1,90 @@
+"""
+Per-view latency, database and template instrumentation
+"""
+import time
+from contextlib import ExitStack
+from contextvars import ContextVar
+
+from django.db import connections
+from django.template.backends.django import Template as DjangoBackendTemplate
+from .. import metrics
+
+
+_current_stats = ContextVar('liteslido_request_stats', default=None)
+
+
+class RequestStats:
+    """Timings collected while a single request is handled"""
+    __slots__ = ('db_queries', 'db_time', 'template_time')
+
+    def __init__(self):
+        self.db_queries = 0
+        self.db_time = 0.0
+        self.template_time = 0.0
+
+    def db_wrapper(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += time.perf_counter() - start
+            self.db_queries += 1
+
+
+def _install_template_timer():
+    """Wrap the Django template backend's render() once to time top-level renders"""
+    if getattr(DjangoBackendTemplate.render, '_liteslido_timed', False):
+        return
+    original_render = DjangoBackendTemplate.render
+
+    def render(self, context=None, request=None):
+        stats = _current_stats.get()
+        if stats is None:
+            return original_render(self, context, request)
+        start = time.perf_counter()
+        try:
+            return original_render(self, context, request)
+        finally:
+            stats.template_time += time.perf_counter() - start
+
+    render._liteslido_timed = True
+    DjangoBackendTemplate.render = render
+
+
+def view_label(request):
+    """URL name of the resolved view, used as the metrics label"""
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return '<unresolved>'
+    return match.view_name or match._func_path
+
+
+class MetricsMiddleware:
+    """Record latency, query count/time, template time and response size per view"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        _install_template_timer()
+
+    def __call__(self, request):
+        stats = RequestStats()
+        token = _current_stats.set(stats)
+        start = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for alias in connections:
+                    stack.enter_context(connections[alias].execute_wrapper(stats.db_wrapper))
+                response = self.get_response(request)
+        finally:
+            _current_stats.reset(token)
+        elapsed = time.perf_counter() - start
+
+        labels = (('view', view_label(request)),)
+        metrics.increment('liteslido_requests_total', labels + (('status', response.status_code),))
+        metrics.observe('liteslido_request_duration_seconds', labels, elapsed)
+        metrics.observe('liteslido_db_queries_per_request', labels, stats.db_queries)
+        metrics.observe('liteslido_db_duration_seconds', labels, stats.db_time)
+        metrics.observe('liteslido_template_render_seconds', labels, stats.template_time)
+        if not response.streaming:
+            metrics.observe('liteslido_response_size_bytes', labels, len(response.content))
+        return response
@@ -0,0 +1,113 @@
+"""
+Load shedding and stale page serving while the worker is overloaded
+"""
+import time
+from contextlib import ExitStack
+
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import DatabaseError, connections
+from django.http import HttpResponse
+from django.utils.cache import add_never_cache_headers
+from .. import metrics
+from ..overload import (
+    DeadlineExceeded, claim_revalidation, get_config, get_stale_copy, is_shared_rendering, monitor,
+    parse_request_start, save_stale_copy, stale_key,
+)
+from .metrics_middleware import view_label
+
+
+class _RequestDeadline:
+    """Fails the request's next query once a stale view has used up its time"""
+    __slots__ = ('started', 'expires_at')
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.expires_at = None
+
+    def db_wrapper(self, execute, sql, params, many, context):
+        if self.expires_at is not None and time.perf_counter() > self.expires_at:
+            raise DeadlineExceeded(f"no fresh page after {self.expires_at - self.started:.2f}s")
+        return execute(sql, params, many, context)
+
+
+def stale_response(copy, view, reason):
+    response = HttpResponse(copy['content'], content_type=copy['content_type'])
+    response['Age'] = str(int(max(time.time() - copy['stored_at'], 0)))
+    response['Warning'] = '110 - "Response is Stale"'
+    add_never_cache_headers(response)
+    metrics.increment('liteslido_stale_responses_total', (('view', view), ('reason', reason)))
+    return response
+
+
+def shed_response(view, reason, retry_after):
+    response = HttpResponse('The server is busy, please retry shortly.', status=503, content_type='text/plain')
+    response['Retry-After'] = str(retry_after)
+    add_never_cache_headers(response)
+    metrics.increment('liteslido_shed_requests_total', (('view', view), ('reason', reason)))
+    return response
+
+
+class OverloadMiddleware:
+    """
+    Measure database and queueing load; while overloaded, answer low-priority
+    views with a 503 and serve the last good copy of stale-able pages (one
+    request per page and interval still renders fresh). A stale-able page
+    that misses its deadline or hits a database error is served stale too.
+    """
+
+    def __init__(self, get_response):
+        if not get_config()['ENABLED']:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request_start = parse_request_start(request.META.get('HTTP_X_REQUEST_START'))
+        if request_start is not None:
+            monitor.observe_queue_time(time.time() - request_start)
+
+        deadline = request._overload_deadline = _RequestDeadline()
+        request._stale_key = None
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(connections[alias].execute_wrapper(monitor.db_wrapper))
+                stack.enter_context(connections[alias].execute_wrapper(deadline.db_wrapper))
+            response = self.get_response(request)
+
+        if (
+            request._stale_key and response.status_code == 200 and not response.streaming
+            and not response.has_header('Warning')
+            # A shared copy is only taken from a rendering meant for everyone
+            and (request._stale_scope != 'shared' or is_shared_rendering(request, response))
+        ):
+            save_stale_copy(request._stale_key, response, get_config()['STALE_TTL'])
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        config = get_config()
+        view = view_label(request)
+        reason = monitor.overload_reason(config)
+        if reason and view in config['LOW_PRIORITY_VIEWS']:
+            return shed_response(view, reason, config['RETRY_AFTER'])
+        if view not in config['STALE_VIEWS'] or request.method not in ('GET', 'HEAD'):
+            return None
+
+        request._stale_scope = config['STALE_VIEWS'][view]
+        key = stale_key(request, view, request._stale_scope)
+        if request.method == 'GET':
+            request._stale_key = key
+        copy = get_stale_copy(key)
+        if copy is None:
+            return None
+        if reason and not claim_revalidation(key, config['REVALIDATE_INTERVAL']):
+            return stale_response(copy, view, reason)
+        request._stale_copy = copy
+        request._overload_deadline.expires_at = request._overload_deadline.started + config['FRESH_DEADLINE']
+        return None
+
+    def process_exception(self, request, exception):
+        copy = getattr(request, '_stale_copy', None)
+        if copy is None or not isinstance(exception, (DeadlineExceeded, DatabaseError)):
+            return None
+        request._stale_key = None
+        reason = 'deadline' if isinstance(exception, DeadlineExceeded) else 'db_error'
+        return stale_response(copy, view_label(request), reason)
@@ -0,0 +1,46 @@
+"""
+Confine guests who joined with a join token to their own event
+"""
+from django.conf import settings
+from django.http import HttpResponseForbidden
+from django.shortcuts import redirect
+from ..services import get_participant_event_code, is_question_in_event
+
+# Views a guest may use anywhere: signing out, and the public pages that are the same
+# for everyone (they must not load the session, or shared caches could not keep them)
+PARTICIPANT_ALLOWED_VIEWS = {'logout', 'anonymous_event_detail', 'anonymous_add_question'}
+
+
+class ParticipantScopeMiddleware:
+    """
+    A guest may only use the views of the event it joined: pages of other
+    events are forbidden, likes on their questions too, and views that are
+    not about an event (event list and creation, profile, password change)
+    send the guest back to its event.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        return self.get_response(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        # Without a session cookie nobody is signed in
+        if (
+            settings.SESSION_COOKIE_NAME not in request.COOKIES
+            or request.resolver_match.url_name in PARTICIPANT_ALLOWED_VIEWS
+        ):
+            return None
+        event_code = get_participant_event_code(request.user, request.session)
+        if event_code is None:
+            return None
+        if 'event_code' in view_kwargs:
+            if view_kwargs['event_code'] != event_code:
+                return HttpResponseForbidden("Guests can only take part in the event they joined.")
+            return None
+        if 'question_id' in view_kwargs:
+            if not is_question_in_event(view_kwargs['question_id'], event_code):
+                return HttpResponseForbidden("Guests can only take part in the event they joined.")
+            return None
+        return redirect('event_detail', event_code=event_code)
@@ -0,0 +1,56 @@
+"""
+Opt-in per-request profiling for staff (see events/profiling.py)
+"""
+import logging
+import time
+import uuid
+from django.core.exceptions import MiddlewareNotUsed
+from ..profiling import RateLimiter, check_profiling_token, profile_call, profiling_config, save_profile
+from .metrics_middleware import view_label
+
+logger = logging.getLogger('events.profiling')
+
+PROFILE_HEADER = 'HTTP_X_LITESLIDO_PROFILE'
+PROFILE_PARAM = '_profile'
+
+
+class ProfilingMiddleware:
+    """
+    Profile the view when a staff user sends their signed token in the
+    X-LiteSlido-Profile header or the ?_profile= parameter. Other requests
+    only pay for a dict lookup; profiled ones are capped per minute.
+    """
+
+    def __init__(self, get_response):
+        if not profiling_config()['ENABLED']:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.limiter = RateLimiter()
+
+    def __call__(self, request):
+        return self.get_response(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        token = request.META.get(PROFILE_HEADER) or request.GET.get(PROFILE_PARAM)
+        if not token or not check_profiling_token(token, request.user):
+            return None
+        if not self.limiter.allow(profiling_config()['MAX_PROFILES_PER_MINUTE']):
+            logger.info("Profiling rate limit reached, serving %s unprofiled", request.path)
+            return None
+
+        request_id = uuid.uuid4().hex
+        started_at = time.time()
+        response, profiler, sampler = profile_call(view_func, request, *view_args, **view_kwargs)
+        if hasattr(response, 'render') and callable(response.render):
+            response = response.render()
+        save_profile(request_id, profiler, sampler, {
+            'method': request.method,
+            'path': request.get_full_path(),
+            'view': view_label(request),
+            'user': request.user.get_username(),
+            'status': response.status_code,
+            'started_at': started_at,
+            'duration_ms': round((time.time() - started_at) * 1000, 2),
+        })
+        response['X-Profile-Id'] = request_id
+        return response
@@ -0,0 +1,29 @@
+"""
+Repeated/slow query detection per request (development and tests)
+"""
+from django.core.exceptions import MiddlewareNotUsed
+from ..query_audit import QueryAudit, QueryAuditError, audit_config, logger, view_report
+from .metrics_middleware import view_label
+
+
+class QueryAuditMiddleware:
+    """Warn (or fail with QUERY_AUDIT['RAISE']) when a view repeats a query shape or runs a slow query"""
+
+    def __init__(self, get_response):
+        if not audit_config()['ENABLED']:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with QueryAudit() as audit:
+            response = self.get_response(request)
+
+        view = view_label(request)
+        view_report.add(view, audit)
+        violations = audit.violations()
+        if violations:
+            for violation in violations:
+                logger.warning("%s %s: %s", request.method, view, violation)
+            if audit_config()['RAISE']:
+                raise QueryAuditError(f"{view}: " + '; '.join(violations))
+        return response
@@ -0,0 +1,36 @@
+"""
+Read-your-writes stickiness for replica routing (see core/db_router.py)
+"""
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from core.db_router import begin_routing, end_routing, replica_aliases
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+class ReplicaPinningMiddleware:
+    """
+    Route unsafe requests to the primary and, after a request writes, keep
+    the same client on the primary for REPLICA_PIN_SECONDS so it never
+    reads a replica that has not caught up with its own question or vote.
+    """
+
+    def __init__(self, get_response):
+        if not replica_aliases():
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.cookie_name = settings.REPLICA_PIN_COOKIE
+        self.pin_seconds = settings.REPLICA_PIN_SECONDS
+
+    def __call__(self, request):
+        pinned = request.method not in SAFE_METHODS or self.cookie_name in request.COOKIES
+        state, token = begin_routing(pinned=pinned)
+        try:
+            response = self.get_response(request)
+        finally:
+            end_routing(token)
+        if state.wrote:
+            response.set_cookie(
+                self.cookie_name, '1', max_age=self.pin_seconds, httponly=True, samesite='Lax',
+            )
+        return response
@@ -0,0 +1,77 @@
+"""
+Serve collected static files with far-future caching (production)
+"""
+import mimetypes
+import os
+import re
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import FileResponse, HttpResponseNotModified
+from django.utils._os import safe_join
+from django.utils.cache import patch_vary_headers
+from django.utils.http import http_date
+
+# ManifestStaticFilesStorage inserts a 12-character md5 prefix before the extension
+HASHED_NAME_RE = re.compile(r'\.[0-9a-f]{12}\.[^/.]+$')
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+# Unhashed names (e.g. direct links to favicon.ico) may change on deploy
+DEFAULT_CACHE_CONTROL = 'public, max-age=300'
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+
+class StaticFilesMiddleware:
+    """
+    Serve files from STATIC_ROOT under STATIC_URL. Hashed filenames are
+    marked immutable so repeat visits fetch no static bytes; precompressed
+    .br/.gz copies written by the static storage are sent when accepted.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'SERVE_STATIC', False) or not settings.STATIC_ROOT:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.prefix = '/' + settings.STATIC_URL.strip('/') + '/'
+        self.root = str(settings.STATIC_ROOT)
+
+    def __call__(self, request):
+        if request.method in ('GET', 'HEAD') and request.path_info.startswith(self.prefix):
+            response = self.serve(request, request.path_info[len(self.prefix):])
+            if response is not None:
+                return response
+        return self.get_response(request)
+
+    def serve(self, request, name):
+        try:
+            path = safe_join(self.root, name)
+            stat = os.stat(path)
+        except (ValueError, OSError):
+            return None
+        if not os.path.isfile(path):
+            return None
+
+        cache_control = IMMUTABLE_CACHE_CONTROL if HASHED_NAME_RE.search(name) else DEFAULT_CACHE_CONTROL
+        etag = f'"{stat.st_size:x}-{stat.st_mtime_ns:x}"'
+        if etag in request.headers.get('If-None-Match', ''):
+            response = HttpResponseNotModified()
+            response['ETag'] = etag
+            response['Cache-Control'] = cache_control
+            return response
+
+        content_type, _ = mimetypes.guess_type(path)
+        encoding = None
+        accepted = request.headers.get('Accept-Encoding', '')
+        for candidate, suffix in ENCODINGS:
+            if candidate in accepted and os.path.isfile(path + suffix):
+                path, encoding = path + suffix, candidate
+                break
+
+        response = FileResponse(open(path, 'rb'), content_type=content_type or 'application/octet-stream')
+        if encoding:
+            response['Content-Encoding'] = encoding
+        response['Content-Length'] = os.path.getsize(path)
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(stat.st_mtime)
+        response['Cache-Control'] = cache_control
+        patch_vary_headers(response, ('Accept-Encoding',))
+        return response
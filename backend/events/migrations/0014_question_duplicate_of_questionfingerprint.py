@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-19 13:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0013_event_closed_at_eventarchive'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='question',
+            name='duplicate_of',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='suggested_duplicates', to='events.question'),
+        ),
+        migrations.CreateModel(
+            name='QuestionFingerprint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bucket', models.BigIntegerField()),
+                ('event', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='events.event')),
+                ('question', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='fingerprints', to='events.question')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['event', 'bucket'], name='events_qfp_event_bucket')],
+            },
+        ),
+    ]
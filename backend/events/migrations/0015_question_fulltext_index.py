@@ -0,0 +1,13 @@
+from django.db import migrations
+from events.search_index import create_fulltext_index, drop_fulltext_index
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0014_question_duplicate_of_questionfingerprint'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_fulltext_index, drop_fulltext_index),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-19 13:13
+
+from django.conf import settings
+from django.db import migrations, models
+from events.search_index import create_fulltext_index
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0015_question_fulltext_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='moderation_enabled',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='question',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('approved', 'Approved'), ('rejected', 'Rejected')], default='approved', max_length=10),
+        ),
+        migrations.AddIndex(
+            model_name='question',
+            index=models.Index(fields=['event', 'status', 'id'], name='events_q_event_status_id'),
+        ),
+        # Adding status rebuilds events_question on SQLite, which drops the FTS triggers
+        migrations.RunPython(create_fulltext_index, migrations.RunPython.noop),
+    ]
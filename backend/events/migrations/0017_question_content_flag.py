@@ -0,0 +1,26 @@
+# Generated by Django 5.2.18 on 2026-10-19 13:14
+
+from django.db import migrations, models
+from events.search_index import create_fulltext_index
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0016_event_moderation_enabled_question_status_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='question',
+            name='flag_reason',
+            field=models.CharField(blank=True, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='question',
+            name='is_flagged',
+            field=models.BooleanField(default=False),
+        ),
+        # Adding is_flagged rebuilds events_question on SQLite, which drops the FTS triggers
+        migrations.RunPython(create_fulltext_index, migrations.RunPython.noop),
+    ]
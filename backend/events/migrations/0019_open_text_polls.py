@@ -0,0 +1,48 @@
+# Generated by Django 5.2.18 on 2026-10-19 13:41
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0018_participant'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='poll',
+            name='kind',
+            field=models.CharField(choices=[('choice', 'Multiple choice'), ('open_text', 'Open text (word cloud)')], default='choice', max_length=10),
+        ),
+        migrations.CreateModel(
+            name='PollTerm',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('term', models.CharField(max_length=64)),
+                ('label', models.CharField(max_length=64)),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('poll', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='terms', to='events.poll')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['poll', '-count', 'term'], name='events_pollterm_top')],
+                'constraints': [models.UniqueConstraint(fields=('poll', 'term'), name='events_pollterm_poll_term')],
+            },
+        ),
+        migrations.CreateModel(
+            name='PollTextResponse',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('text', models.CharField(max_length=200)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('poll', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='text_responses', to='events.poll')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('poll', 'user'), name='events_pollresponse_one_per_user')],
+            },
+        ),
+    ]
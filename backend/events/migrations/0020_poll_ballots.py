@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-19 13:44
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0019_open_text_polls'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='poll',
+            name='kind',
+            field=models.CharField(choices=[('choice', 'Multiple choice'), ('multi', 'Multi-select'), ('ranked', 'Ranked choice'), ('open_text', 'Open text (word cloud)')], default='choice', max_length=10),
+        ),
+        migrations.CreateModel(
+            name='PollBallot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('selection', models.BigIntegerField(default=0)),
+                ('ranking', models.BinaryField(default=b'', max_length=64)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('poll', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ballots', to='events.poll')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('poll', 'user'), name='events_pollballot_one_per_user')],
+            },
+        ),
+    ]
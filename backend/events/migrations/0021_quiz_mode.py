@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-19 13:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0020_poll_ballots'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='poll',
+            name='time_limit',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='polloption',
+            name='is_correct',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='pollvote',
+            name='score',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,81 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:05
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+from events.search_index import create_fulltext_index
+
+HOT_HALF_LIFE_SECONDS = 30 * 60  # ranking_services.HOT_HALF_LIFE_SECONDS when this migration was written
+
+
+def backfill_hot_scores(apps, schema_editor):
+    Question = apps.get_model('events', 'Question')
+    QuestionLike = apps.get_model('events', 'QuestionLike')
+
+    def weight(moment, epoch):
+        return 2.0 ** ((moment - epoch).total_seconds() / HOT_HALF_LIFE_SECONDS)
+
+    liked_at = {}
+    for question_id, moment in QuestionLike.objects.values_list('question_id', 'liked_at').iterator():
+        liked_at.setdefault(question_id, []).append(moment)
+    questions = Question.objects.select_related('event').only('created_at', 'event__hot_epoch')
+    for question in questions.iterator():
+        epoch = question.event.hot_epoch
+        score = weight(question.created_at, epoch) + sum(weight(moment, epoch) for moment in liked_at.get(question.pk, ()))
+        Question.objects.filter(pk=question.pk).update(hot_score=score)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0021_quiz_mode'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        # Give the existing likes table an explicit through model, then timestamp the likes
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.CreateModel(
+                    name='QuestionLike',
+                    fields=[
+                        ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                        ('question', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='events.question')),
+                        ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+                    ],
+                    options={
+                        'db_table': 'events_question_likes',
+                        'unique_together': {('question', 'user')},
+                    },
+                ),
+                migrations.AlterField(
+                    model_name='question',
+                    name='likes',
+                    field=models.ManyToManyField(blank=True, related_name='liked_questions', through='events.QuestionLike', to=settings.AUTH_USER_MODEL),
+                ),
+            ],
+        ),
+        migrations.AddField(
+            model_name='questionlike',
+            name='liked_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='hot_epoch',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AddField(
+            model_name='question',
+            name='hot_score',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='question',
+            index=models.Index(fields=['event', 'status', '-hot_score', '-id'], name='events_q_event_status_hot'),
+        ),
+        migrations.RunPython(backfill_hot_scores, migrations.RunPython.noop),
+        # Adding hot_score rebuilds events_question on SQLite, which drops the FTS triggers
+        migrations.RunPython(create_fulltext_index, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-19 15:02
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def backfill_event_ids(apps, schema_editor):
+    Question = apps.get_model('events', 'Question')
+    QuestionLike = apps.get_model('events', 'QuestionLike')
+    PollOption = apps.get_model('events', 'PollOption')
+    PollVote = apps.get_model('events', 'PollVote')
+    QuestionLike.objects.update(
+        event_id=Subquery(Question.objects.filter(pk=OuterRef('question_id')).values('event_id'))
+    )
+    PollVote.objects.update(
+        event_id=Subquery(PollOption.objects.filter(pk=OuterRef('poll_option_id')).values('poll__event_id'))
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0022_question_hot_score'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='questionlike',
+            name='event',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='events.event'),
+        ),
+        migrations.AddField(
+            model_name='pollvote',
+            name='event',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='events.event'),
+        ),
+        migrations.RunPython(backfill_event_ids, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-19 15:02
+
+import django.db.models.deletion
+from django.db import migrations, models
+from events.partitioning import partition_tables, unpartition_tables
+
+
+class Migration(migrations.Migration):
+    # Separate from 0023 so the backfill's deferred foreign key checks have run before these ALTER TABLEs
+
+    dependencies = [
+        ('events', '0023_event_on_likes_and_votes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='questionlike',
+            name='event',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='events.event'),
+        ),
+        migrations.AlterField(
+            model_name='pollvote',
+            name='event',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='events.event'),
+        ),
+        # PostgreSQL only: HASH-partition both tables by event_id (see events/partitioning.py)
+        migrations.RunPython(partition_tables, unpartition_tables),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:47
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0024_partition_likes_and_votes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='questionlike',
+            name='question',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.DO_NOTHING, to='events.question'),
+        ),
+    ]
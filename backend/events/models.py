@@ -1,7 +1,7 @@
 from django.db import models
 import uuid
 from django.contrib.auth.models import User
-from PIL import Image
+from django.utils import timezone
 
 
 def generate_event_code():
@@ -14,11 +14,28 @@ class Event(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     creator = models.ForeignKey(User, on_delete=models.CASCADE, related_name='created_events')
     is_closed = models.BooleanField(default=False)   # ← New field
+    closed_at = models.DateTimeField(null=True, blank=True)
+    moderation_enabled = models.BooleanField(default=False)  # Hold new questions for review
+    hot_epoch = models.DateTimeField(default=timezone.now)  # Reference time of its questions' hot scores
 
     def __str__(self):
         return f"{self.title} ({self.code})"
     
 
+class EventArchive(models.Model):
+    """Compressed read-only snapshot of a closed event whose hot rows were purged"""
+    event = models.OneToOneField(Event, on_delete=models.CASCADE, related_name='archive')
+    data = models.BinaryField()  # zlib-compressed JSON snapshot
+    question_count = models.PositiveIntegerField(default=0)
+    like_count = models.PositiveIntegerField(default=0)
+    poll_count = models.PositiveIntegerField(default=0)
+    vote_count = models.PositiveIntegerField(default=0)
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"Archive of {self.event.code}"
+
+
 class Profile(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='profile')
     full_name = models.CharField(max_length=100, blank=True)
@@ -31,19 +48,53 @@ class Profile(models.Model):
         super().save(*args, **kwargs)
         # Resize avatar to 300x300 max
         if self.avatar:
+            from PIL import Image  # imported here so only saves with an avatar load Pillow
             img = Image.open(self.avatar.path)
             img.thumbnail((300, 300))
             img.save(self.avatar.path)
 
 
+class Participant(models.Model):
+    """
+    Guest identity of an attendee who joined through an event's join token.
+    Backed by a User with an unusable password so likes and votes work as
+    for any account, without hashing a password to get there.
+    """
+    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='participant')
+    event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name='participants')
+    joined_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.user.username} @ {self.event.code}"
+
+
 
 class Question(models.Model):
+    class Status(models.TextChoices):
+        PENDING = 'pending', 'Pending'
+        APPROVED = 'approved', 'Approved'
+        REJECTED = 'rejected', 'Rejected'
+
     event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name='questions')
     author = models.ForeignKey(User, on_delete=models.CASCADE, related_name='questions', null=True, blank=True)
     author_name = models.CharField(max_length=150, blank=True, null=True)  # For anonymous questions
     text = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
-    likes = models.ManyToManyField(User, related_name='liked_questions', blank=True)
+    likes = models.ManyToManyField(User, through='QuestionLike', related_name='liked_questions', blank=True)
+    duplicate_of = models.ForeignKey(
+        'self', on_delete=models.SET_NULL, null=True, blank=True,
+        related_name='suggested_duplicates'
+    )  # Near-duplicate suggested at creation time
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.APPROVED)
+    is_flagged = models.BooleanField(default=False)  # Matched the content filter
+    flag_reason = models.CharField(max_length=255, blank=True)
+    hot_score = models.FloatField(default=0)  # Time-decayed likes, relative to event.hot_epoch
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['event', 'status', 'id'], name='events_q_event_status_id'),
+            models.Index(fields=['event', 'status', '-hot_score', '-id'], name='events_q_event_status_hot'),
+        ]
 
     def like_count(self):
         return self.likes.count()
@@ -63,11 +114,78 @@ class Question(models.Model):
         return f"{author_display} @ {self.event.code}: {self.text[:20]}"
 
 
+class QuestionLikeQuerySet(models.QuerySet):
+    def bulk_create(self, objs, *args, **kwargs):
+        # Question.likes.add() creates likes through here: fill in their partition key
+        objs = list(objs)
+        missing = {like.question_id for like in objs if like.event_id is None}
+        if missing:
+            event_ids = dict(Question.objects.filter(pk__in=missing).values_list('pk', 'event_id'))
+            for like in objs:
+                if like.event_id is None:
+                    like.event_id = event_ids[like.question_id]
+        return super().bulk_create(objs, *args, **kwargs)
+
+
+class QuestionLike(models.Model):
+    # The question's event, denormalized as the partition key (see events/partitioning.py)
+    event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name='+')
+    # Deleted by event and question, in delete_questions() or on the question's
+    # pre_delete signal, rather than by question_id alone
+    question = models.ForeignKey(Question, on_delete=models.DO_NOTHING)
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    liked_at = models.DateTimeField(default=timezone.now)
+
+    objects = QuestionLikeQuerySet.as_manager()
+
+    class Meta:
+        db_table = 'events_question_likes'  # the table of the former auto-created through model
+        unique_together = [('question', 'user')]
+
+    def save(self, *args, **kwargs):
+        if self.event_id is None:
+            self.event_id = Question.objects.values_list('event_id', flat=True).get(pk=self.question_id)
+        super().save(*args, **kwargs)
+
+
+class QuestionFingerprint(models.Model):
+    """MinHash LSH band bucket of a question, used to find near-duplicates per event"""
+    event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name='+')
+    question = models.ForeignKey(Question, on_delete=models.CASCADE, related_name='fingerprints')
+    bucket = models.BigIntegerField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['event', 'bucket'], name='events_qfp_event_bucket'),
+        ]
+
+
 class Poll(models.Model):
+    class Kind(models.TextChoices):
+        CHOICE = 'choice', 'Multiple choice'
+        MULTI_SELECT = 'multi', 'Multi-select'
+        RANKED = 'ranked', 'Ranked choice'
+        OPEN_TEXT = 'open_text', 'Open text (word cloud)'
+
     event = models.ForeignKey(Event, related_name='polls', on_delete=models.CASCADE)
     question = models.CharField(max_length=255)
+    kind = models.CharField(max_length=10, choices=Kind.choices, default=Kind.CHOICE)
+    time_limit = models.PositiveIntegerField(null=True, blank=True)  # Seconds to answer; set on quiz questions
     created_at = models.DateTimeField(auto_now_add=True)
 
+    @property
+    def is_quiz(self):
+        return self.time_limit is not None
+
+    @property
+    def is_open_text(self):
+        return self.kind == self.Kind.OPEN_TEXT
+
+    @property
+    def uses_ballots(self):
+        """Multi-select and ranked-choice votes are stored as one PollBallot per voter"""
+        return self.kind in (self.Kind.MULTI_SELECT, self.Kind.RANKED)
+
     def __str__(self):
         return f"Poll: {self.question}"
 
@@ -75,14 +193,84 @@ class Poll(models.Model):
 class PollOption(models.Model):
     poll = models.ForeignKey(Poll, related_name='options', on_delete=models.CASCADE)
     text = models.CharField(max_length=255)
+    is_correct = models.BooleanField(default=False)  # Quiz answer key
 
     def __str__(self):
         return f"Option: {self.text}"
 
 class PollVote(models.Model):
+    # The poll's event, denormalized as the partition key (see events/partitioning.py)
+    event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name='+')
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     poll_option = models.ForeignKey(PollOption, on_delete=models.CASCADE)
+    score = models.PositiveIntegerField(default=0)  # Quiz points earned by this answer
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def save(self, *args, **kwargs):
+        if self.event_id is None:
+            self.event_id = Poll.objects.values_list('event_id', flat=True).get(options=self.poll_option_id)
+        super().save(*args, **kwargs)
+
+    def __str__(self):
+        return f"{self.user.username} voted for {self.poll_option.text}"
+
+
+class PollBallot(models.Model):
+    """
+    One voter's ballot in a multi-select or ranked-choice poll. Options are
+    referred to by position (index in the poll's options ordered by id):
+    multi-select ballots set bit i of `selection` for each chosen option,
+    ranked ballots store positions in preference order, one byte each.
+    """
+    poll = models.ForeignKey(Poll, on_delete=models.CASCADE, related_name='ballots')
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    selection = models.BigIntegerField(default=0)
+    ranking = models.BinaryField(max_length=64, default=b'')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['poll', 'user'], name='events_pollballot_one_per_user'),
+        ]
+
+    def __str__(self):
+        return f"{self.user.username} ballot in poll {self.poll_id}"
+
+
+class PollTextResponse(models.Model):
+    """A free-text answer to an open-text poll"""
+    poll = models.ForeignKey(Poll, on_delete=models.CASCADE, related_name='text_responses')
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    text = models.CharField(max_length=200)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['poll', 'user'], name='events_pollresponse_one_per_user'),
+        ]
+
+    def __str__(self):
+        return f"{self.user.username} answered {self.text[:20]}"
+
+
+class PollTerm(models.Model):
+    """
+    Running term frequency of an open-text poll, updated as responses
+    arrive so the word cloud is read from here instead of re-tokenizing
+    every response
+    """
+    poll = models.ForeignKey(Poll, on_delete=models.CASCADE, related_name='terms')
+    term = models.CharField(max_length=64)  # normalized (stemmed) form
+    label = models.CharField(max_length=64)  # first spelling seen, for display
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['poll', 'term'], name='events_pollterm_poll_term'),
+        ]
+        indexes = [
+            models.Index(fields=['poll', '-count', 'term'], name='events_pollterm_top'),
+        ]
+
     def __str__(self):
-        return f"{self.user.username} voted for {self.poll_option.text}"
\ No newline at end of file
+        return f"{self.label}: {self.count}"
@@ -0,0 +1,163 @@
+"""
+Overload protection: load signals of this worker and the last good copies
+of pages that may be served stale
+
+LoadMonitor measures database pressure as the worker sees it: queries in
+flight, a moving average of query latency, and how long requests queued
+in front of the worker (from the proxy's X-Request-Start header). When any
+of them crosses its OVERLOAD_PROTECTION limit the worker is overloaded and
+OverloadMiddleware starts shedding low-priority views and serving stale
+pages. Like the metrics, the signals are per worker process.
+"""
+import hashlib
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.cache import has_vary_header
+
+DEFAULTS = {
+    'ENABLED': False,
+    'MAX_DB_IN_FLIGHT': 8,  # queries running at once in this worker
+    'MAX_DB_LATENCY': 0.25,  # seconds, moving average of query time
+    'MAX_QUEUE_TIME': 1.0,  # seconds, moving average of time spent queued before the worker
+    'SIGNAL_TTL': 5.0,  # seconds after which a latency average without new samples is ignored
+    'RETRY_AFTER': 5,  # seconds, sent with shed requests
+    'LOW_PRIORITY_VIEWS': (),  # shed with a 503 while overloaded
+    'STALE_VIEWS': {},  # view name -> 'shared' or 'per_user': GET responses kept and served stale while overloaded or too slow
+    'FRESH_DEADLINE': 1.0,  # seconds a stale view may spend before its stale copy is served instead
+    'STALE_TTL': 600,  # seconds a stale copy is kept
+    'REVALIDATE_INTERVAL': 2,  # seconds between fresh renders of a page served stale
+}
+EWMA_WEIGHT = 0.2
+
+
+def get_config():
+    return {**DEFAULTS, **getattr(settings, 'OVERLOAD_PROTECTION', {})}
+
+
+class _MovingAverage:
+    __slots__ = ('value', 'updated_at')
+
+    def __init__(self):
+        self.value = 0.0
+        self.updated_at = 0.0
+
+    def add(self, sample, now):
+        self.value += EWMA_WEIGHT * (sample - self.value)
+        self.updated_at = now
+
+    def current(self, now, ttl):
+        return self.value if now - self.updated_at <= ttl else 0.0
+
+
+class LoadMonitor:
+    """Database and queueing load of this worker process"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.db_in_flight = 0
+        self.db_latency = _MovingAverage()
+        self.queue_time = _MovingAverage()
+
+    def db_wrapper(self, execute, sql, params, many, context):
+        with self._lock:
+            self.db_in_flight += 1
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            now = time.perf_counter()
+            with self._lock:
+                self.db_in_flight -= 1
+                self.db_latency.add(now - start, now)
+
+    def observe_queue_time(self, seconds):
+        with self._lock:
+            self.queue_time.add(max(seconds, 0.0), time.perf_counter())
+
+    def overload_reason(self, config):
+        """Why the worker is overloaded, or None if it is not"""
+        now = time.perf_counter()
+        if self.db_in_flight >= config['MAX_DB_IN_FLIGHT']:
+            return 'db_in_flight'
+        if self.db_latency.current(now, config['SIGNAL_TTL']) >= config['MAX_DB_LATENCY']:
+            return 'db_latency'
+        if self.queue_time.current(now, config['SIGNAL_TTL']) >= config['MAX_QUEUE_TIME']:
+            return 'queue_time'
+        return None
+
+    def reset(self):
+        with self._lock:
+            self.db_in_flight = 0
+            self.db_latency = _MovingAverage()
+            self.queue_time = _MovingAverage()
+
+
+monitor = LoadMonitor()
+
+
+def parse_request_start(value):
+    """
+    Epoch seconds from an X-Request-Start header ("t=1700000000.123" or a bare
+    number in seconds, milliseconds or microseconds, as proxies differ)
+    """
+    try:
+        start = float(value.strip().removeprefix('t='))
+    except (AttributeError, ValueError):
+        return None
+    if start > 1e14:
+        return start / 1e6
+    if start > 1e11:
+        return start / 1e3
+    return start
+
+
+class DeadlineExceeded(Exception):
+    """A stale view ran past its deadline while a stale copy of its page exists"""
+
+
+def stale_key(request, view_name, scope):
+    """
+    Cache key of a page's stale copy: one copy for everyone when the view's
+    scope is 'shared', else one per signed-in user
+    """
+    user_id = ''
+    # Without a session cookie the visitor is anonymous, and shared pages must not load the
+    # session: that would make them vary on Cookie
+    if scope != 'shared' and settings.SESSION_COOKIE_NAME in request.COOKIES and hasattr(request, 'user'):
+        user_id = request.user.pk or ''
+    digest = hashlib.blake2b(f'{request.get_full_path()}|{user_id}'.encode(), digest_size=12).hexdigest()
+    return f'liteslido:stale:{view_name}:{digest}'
+
+
+def is_shared_rendering(request, response):
+    """
+    Whether a response may be kept as the one stale copy for everyone: it
+    must not carry the visitor's CSRF token or flash messages, nor depend
+    on the session
+    """
+    storage = getattr(request, '_messages', None)
+    return not (
+        request.META.get('CSRF_COOKIE_NEEDS_UPDATE')
+        or (storage is not None and storage.used)
+        or has_vary_header(response, 'Cookie')
+    )
+
+
+def save_stale_copy(key, response, ttl):
+    cache.set(key, {
+        'content': response.content,
+        'content_type': response['Content-Type'],
+        'stored_at': time.time(),
+    }, ttl)
+
+
+def get_stale_copy(key):
+    return cache.get(key)
+
+
+def claim_revalidation(key, interval):
+    """True for one caller per interval: that request renders the page fresh"""
+    return cache.add(f'{key}:revalidating', 1, interval)
@@ -0,0 +1,141 @@
+"""
+PostgreSQL HASH partitioning of the fastest-growing tables by event
+
+Likes and poll votes are always read per event, so on PostgreSQL
+events_question_likes and events_pollvote are partitioned by the hash of
+their (denormalized) event_id into a fixed set of PARTITION_COUNT
+partitions, created once by the migration. Queries that filter on event_id
+touch a single partition, and neither creating nor archiving an event runs
+DDL: archiving deletes the event's rows, which also only touches one
+partition per table.
+
+Every query and delete on these tables should filter on event_id, or
+PostgreSQL has to look into all partitions. That is why deleting a question
+does not cascade to its likes by question_id alone (QuestionLike.question
+is DO_NOTHING in Django, deferred in the database): delete_questions()
+deletes the likes by event and question first, and the question's pre_delete
+signal does the same for other deletes (its author's account, the admin,
+events/signals.py). Other databases keep plain
+tables and every function here is a no-op for them.
+
+PostgreSQL requires the partition key in every unique constraint, so the
+primary key is (id, event_id) and the likes' uniqueness is enforced as
+(event_id, question_id, user_id), which is equivalent as a question belongs
+to one event. Migrations that alter these tables' constraints must use SQL.
+Questions are not partitioned: PostgreSQL would need every foreign key to
+them to include event_id, which Django's foreign keys cannot express.
+"""
+from django.db import connections, router
+
+PARTITION_COUNT = 16  # fixed modulus: changing it means rebuilding the tables
+
+PARTITIONED_TABLES = {
+    'events_question_likes': {
+        'foreign_keys': {
+            'event_id': 'events_event',
+            'question_id': 'events_question',
+            'user_id': 'auth_user',
+        },
+        'unique': ('event_id', 'question_id', 'user_id'),
+        'indexes': (('question_id',), ('user_id',)),
+    },
+    'events_pollvote': {
+        'foreign_keys': {
+            'event_id': 'events_event',
+            'poll_option_id': 'events_polloption',
+            'user_id': 'auth_user',
+        },
+        'unique': None,
+        'indexes': (('poll_option_id',), ('user_id',)),
+    },
+}
+
+
+def partition_name(table, remainder):
+    return f'{table}_p{int(remainder)}'
+
+
+def _connection(using=None):
+    from .models import Event
+    return connections[using or router.db_for_write(Event)]
+
+
+def _is_partitioned(cursor, table):
+    cursor.execute(
+        "SELECT 1 FROM pg_partitioned_table p JOIN pg_class c ON c.oid = p.partrelid "
+        "WHERE c.relname = %s AND c.relnamespace = current_schema()::regnamespace",
+        [table],
+    )
+    return cursor.fetchone() is not None
+
+
+def partitioned_tables(using=None):
+    """Names of the tables that are partitioned by event in this database"""
+    connection = _connection(using)
+    if connection.vendor != 'postgresql':
+        return []
+    with connection.cursor() as cursor:
+        return [table for table in PARTITIONED_TABLES if _is_partitioned(cursor, table)]
+
+
+def _constraint_sql(table, spec, partitioned):
+    key = ('id', 'event_id') if partitioned else ('id',)
+    statements = [f'ALTER TABLE "{table}" ADD CONSTRAINT "{table}_pkey" PRIMARY KEY ({", ".join(key)})']
+    for column, target in spec['foreign_keys'].items():
+        statements.append(
+            f'ALTER TABLE "{table}" ADD CONSTRAINT "{table}_{column}_fk" FOREIGN KEY ("{column}") '
+            f'REFERENCES "{target}" (id) DEFERRABLE INITIALLY DEFERRED'
+        )
+    if spec['unique']:
+        columns = ', '.join(f'"{column}"' for column in spec['unique'] if partitioned or column != 'event_id')
+        statements.append(f'ALTER TABLE "{table}" ADD CONSTRAINT "{table}_event_uniq" UNIQUE ({columns})')
+    for columns in spec['indexes']:
+        statements.append(
+            f'CREATE INDEX "{table}_{"_".join(columns)}_idx" ON "{table}" ({", ".join(columns)})'
+        )
+    return statements
+
+
+def _rebuild_table(schema_editor, table, spec, partitioned):
+    """Replace a table by a (non-)partitioned copy with the same rows and id sequence"""
+    old = f'{table}_old'
+    sequence = f'{table}_id_seq'
+    execute = schema_editor.execute
+    execute(f'ALTER TABLE "{table}" RENAME TO "{old}"')
+    # Identity columns cannot be partitioned (before PostgreSQL 17): ids come from a plain
+    # sequence, reused when rebuilding a table that already has one
+    execute(f'ALTER TABLE "{old}" ALTER COLUMN id DROP IDENTITY IF EXISTS')
+    execute(f'CREATE SEQUENCE IF NOT EXISTS "{sequence}"')
+    execute(
+        f'CREATE TABLE "{table}" (LIKE "{old}")'
+        + (' PARTITION BY HASH (event_id)' if partitioned else '')
+    )
+    execute(f'ALTER TABLE "{table}" ALTER COLUMN id SET DEFAULT nextval(\'"{sequence}"\')')
+    execute(f'ALTER SEQUENCE "{sequence}" OWNED BY "{table}".id')
+    if partitioned:
+        for remainder in range(PARTITION_COUNT):
+            execute(
+                f'CREATE TABLE "{partition_name(table, remainder)}" PARTITION OF "{table}" '
+                f'FOR VALUES WITH (MODULUS {PARTITION_COUNT}, REMAINDER {remainder})'
+            )
+    execute(f'INSERT INTO "{table}" SELECT * FROM "{old}"')
+    execute(f'SELECT setval(\'"{sequence}"\', COALESCE((SELECT MAX(id) FROM "{table}"), 0) + 1, false)')
+    execute(f'DROP TABLE "{old}" CASCADE')
+    for statement in _constraint_sql(table, spec, partitioned):
+        execute(statement)
+
+
+def partition_tables(apps, schema_editor):
+    """Migration step: convert the tables into ones hash-partitioned by event"""
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for table, spec in PARTITIONED_TABLES.items():
+        _rebuild_table(schema_editor, table, spec, partitioned=True)
+
+
+def unpartition_tables(apps, schema_editor):
+    """Reverse migration step: turn the partitioned tables back into plain ones"""
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for table, spec in PARTITIONED_TABLES.items():
+        _rebuild_table(schema_editor, table, spec, partitioned=False)
@@ -0,0 +1,174 @@
+"""
+On-demand request profiling: a sampling profiler plus cProfile
+
+Profiles are written to PROFILING['STORAGE_DIR'] as <request_id>.pstats
+(cProfile stats, open with pstats/snakeviz), <request_id>.folded (collapsed
+stacks for flamegraph.pl/speedscope) and <request_id>.json (metadata).
+"""
+import cProfile
+import json
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+
+from django.conf import settings
+from django.core import signing
+
+
+TOKEN_SALT = 'events.profiling'
+PROFILE_KINDS = {
+    'pstats': 'application/octet-stream',
+    'folded': 'text/plain; charset=utf-8',
+}
+DEFAULTS = {
+    'ENABLED': False,
+    'STORAGE_DIR': None,
+    'TOKEN_MAX_AGE': 3600,  # seconds a signed profiling token stays valid
+    'SAMPLE_INTERVAL': 0.002,  # seconds between stack samples
+    'MAX_SAMPLES': 5000,  # per request
+    'MAX_PROFILES_PER_MINUTE': 6,  # per worker process
+    'MAX_STORED': 200,  # oldest profiles are deleted beyond this
+}
+
+_REQUEST_ID_RE = re.compile(r'^[0-9a-f]{32}$')
+
+
+def profiling_config():
+    """PROFILING settings merged over the defaults"""
+    return {**DEFAULTS, **getattr(settings, 'PROFILING', {})}
+
+
+def storage_dir():
+    path = profiling_config()['STORAGE_DIR'] or Path(settings.BASE_DIR) / 'profiles'
+    return Path(path)
+
+
+def make_profiling_token(user):
+    """Signed token that lets this staff user profile their own requests"""
+    return signing.dumps({'u': user.pk}, salt=TOKEN_SALT)
+
+
+def check_profiling_token(token, user):
+    """Check a profiling token was issued to this (staff) user and has not expired"""
+    if not token or not user.is_authenticated or not user.is_staff:
+        return False
+    try:
+        data = signing.loads(token, salt=TOKEN_SALT, max_age=profiling_config()['TOKEN_MAX_AGE'])
+    except signing.BadSignature:
+        return False
+    return data.get('u') == user.pk
+
+
+class RateLimiter:
+    """Allow at most `limit` events per rolling minute"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._times = []
+
+    def allow(self, limit):
+        now = time.monotonic()
+        with self._lock:
+            self._times = [t for t in self._times if now - t < 60]
+            if len(self._times) >= limit:
+                return False
+            self._times.append(now)
+            return True
+
+
+class StackSampler:
+    """Sample one thread's Python stack at a fixed interval from a background thread"""
+
+    def __init__(self, thread_id, interval, max_samples):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.max_samples = max_samples
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='liteslido-sampler', daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval) and self.samples < self.max_samples:
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            self.stacks[';'.join(reversed(stack))] += 1
+            self.samples += 1
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+
+    def folded(self):
+        """Collapsed stacks in the flamegraph.pl input format"""
+        return ''.join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+def profile_call(func, *args, **kwargs):
+    """Run func under cProfile and the stack sampler; returns (result, profiler, sampler)"""
+    config = profiling_config()
+    profiler = cProfile.Profile()
+    sampler = StackSampler(threading.get_ident(), config['SAMPLE_INTERVAL'], config['MAX_SAMPLES'])
+    with sampler:
+        profiler.enable()
+        try:
+            result = func(*args, **kwargs)
+        finally:
+            profiler.disable()
+    return result, profiler, sampler
+
+
+def save_profile(request_id, profiler, sampler, metadata):
+    """Write the pstats, folded stacks and metadata of a profiled request"""
+    directory = storage_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    profiler.dump_stats(directory / f'{request_id}.pstats')
+    (directory / f'{request_id}.folded').write_text(sampler.folded(), encoding='utf-8')
+    (directory / f'{request_id}.json').write_text(
+        json.dumps({**metadata, 'request_id': request_id, 'samples': sampler.samples}),
+        encoding='utf-8',
+    )
+    _prune(directory, profiling_config()['MAX_STORED'])
+
+
+def _prune(directory, keep):
+    metas = sorted(directory.glob('*.json'), key=lambda path: path.stat().st_mtime, reverse=True)
+    for meta in metas[keep:]:
+        for suffix in ('.json', '.pstats', '.folded'):
+            meta.with_suffix(suffix).unlink(missing_ok=True)
+
+
+def list_profiles():
+    """Metadata of stored profiles, newest first"""
+    directory = storage_dir()
+    if not directory.exists():
+        return []
+    profiles = []
+    for meta in directory.glob('*.json'):
+        try:
+            profiles.append(json.loads(meta.read_text(encoding='utf-8')))
+        except (OSError, ValueError):
+            continue
+    return sorted(profiles, key=lambda profile: profile.get('started_at', 0), reverse=True)
+
+
+def profile_path(request_id, kind):
+    """Path of a stored profile file, or None if the id/kind is invalid or missing"""
+    if kind not in PROFILE_KINDS or not _REQUEST_ID_RE.match(request_id):
+        return None
+    path = storage_dir() / f'{request_id}.{kind}'
+    return path if path.exists() else None
@@ -0,0 +1,132 @@
+"""
+Repeated-query (N+1) and slow-query detection for development and tests
+
+Executed SELECTs are grouped by their normalized shape (literals and IN-lists
+replaced by placeholders). A shape executed more than MAX_REPEATS times in
+one request or test, or a single query slower than SLOW_QUERY_MS, is reported
+as a violation. Violations are logged, collected into a per-view report and,
+with RAISE enabled, turned into errors/test failures.
+"""
+import logging
+import re
+import time
+from collections import defaultdict
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+
+logger = logging.getLogger('events.query_audit')
+
+DEFAULTS = {
+    'ENABLED': False,
+    'MAX_REPEATS': 10,
+    'SLOW_QUERY_MS': 100,
+    'RAISE': False,
+}
+
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r'\b\d+(?:\.\d+)?\b')
+_IN_LIST_RE = re.compile(r'\bIN\s*\((?:\s*(?:%s|\?)\s*,?)+\)', re.IGNORECASE)
+_SPACE_RE = re.compile(r'\s+')
+
+
+def audit_config():
+    """QUERY_AUDIT settings merged over the defaults"""
+    return {**DEFAULTS, **getattr(settings, 'QUERY_AUDIT', {})}
+
+
+def normalize_sql(sql):
+    """Reduce a SQL statement to its shape so repeated queries group together"""
+    shape = _STRING_RE.sub('?', sql)
+    shape = _NUMBER_RE.sub('?', shape)
+    shape = shape.replace('%s', '?')
+    shape = _IN_LIST_RE.sub('IN (...)', shape)
+    return _SPACE_RE.sub(' ', shape).strip()
+
+
+def query_audit_exempt(test_func):
+    """Mark a test whose repeated queries are intentional"""
+    test_func.query_audit_exempt = True
+    return test_func
+
+
+class QueryAuditError(AssertionError):
+    """Raised when QUERY_AUDIT['RAISE'] is set and a budget is exceeded"""
+
+
+class QueryAudit:
+    """Context manager grouping the queries executed inside it by shape"""
+
+    def __init__(self, max_repeats=None, slow_query_ms=None):
+        config = audit_config()
+        self.max_repeats = config['MAX_REPEATS'] if max_repeats is None else max_repeats
+        self.slow_query_ms = config['SLOW_QUERY_MS'] if slow_query_ms is None else slow_query_ms
+        self.shapes = defaultdict(lambda: [0, 0.0])  # shape -> [count, total seconds]
+        self.slow_queries = []
+        self._stack = None
+
+    def _wrapper(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - start
+            if sql.lstrip()[:6].upper() == 'SELECT':
+                entry = self.shapes[normalize_sql(sql)]
+                entry[0] += 1
+                entry[1] += elapsed
+            if elapsed * 1000 > self.slow_query_ms:
+                self.slow_queries.append((sql, elapsed))
+
+    def __enter__(self):
+        self._stack = ExitStack()
+        for alias in connections:
+            self._stack.enter_context(connections[alias].execute_wrapper(self._wrapper))
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stack.close()
+        self._stack = None
+
+    @property
+    def query_count(self):
+        """Number of SELECT statements executed"""
+        return sum(count for count, _ in self.shapes.values())
+
+    def violations(self):
+        """Human-readable descriptions of every exceeded budget"""
+        found = []
+        for shape, (count, total) in self.shapes.items():
+            if count > self.max_repeats:
+                found.append(f"{count}x repeated query ({total * 1000:.1f} ms total): {shape[:300]}")
+        for sql, elapsed in self.slow_queries:
+            found.append(f"slow query ({elapsed * 1000:.1f} ms): {normalize_sql(sql)[:300]}")
+        return found
+
+
+class ViewReport:
+    """Worst repeat count and query totals per view across audited requests"""
+
+    def __init__(self):
+        self.views = defaultdict(lambda: {'requests': 0, 'queries': 0, 'worst_repeat': 0, 'violations': set()})
+
+    def add(self, view, audit):
+        entry = self.views[view]
+        entry['requests'] += 1
+        entry['queries'] += audit.query_count
+        entry['worst_repeat'] = max([entry['worst_repeat']] + [count for count, _ in audit.shapes.values()])
+        entry['violations'].update(audit.violations())
+
+    def format(self):
+        lines = ['Query audit report', f"{'view':40} {'requests':>8} {'avg selects':>11} {'max repeat':>10}"]
+        for view, entry in sorted(self.views.items()):
+            avg = entry['queries'] / entry['requests']
+            lines.append(f"{view:40} {entry['requests']:>8} {avg:>11.1f} {entry['worst_repeat']:>10}")
+            for violation in sorted(entry['violations']):
+                lines.append(f"    ! {violation}")
+        return '\n'.join(lines)
+
+
+view_report = ViewReport()
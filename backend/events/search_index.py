@@ -0,0 +1,67 @@
+"""
+Database-specific full-text index over Question.text
+
+PostgreSQL gets a GIN expression index matching the SearchVector used by
+search_event_questions; SQLite gets an FTS5 table kept in sync by triggers.
+SQLite drops the triggers whenever a migration rebuilds events_question, so
+such migrations should call create_fulltext_index again afterwards.
+"""
+
+POSTGRES_CREATE = """
+CREATE INDEX IF NOT EXISTS events_question_text_fts
+    ON events_question
+    USING GIN (to_tsvector('simple'::regconfig, COALESCE(text, '')))
+"""
+POSTGRES_DROP = "DROP INDEX IF EXISTS events_question_text_fts"
+
+# External-content FTS5 table kept in sync with events_question by triggers
+SQLITE_CREATE = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS events_question_fts USING fts5(
+        text, event_id UNINDEXED, content='events_question', content_rowid='id'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS events_question_fts_ai AFTER INSERT ON events_question BEGIN
+        INSERT INTO events_question_fts(rowid, text, event_id) VALUES (new.id, new.text, new.event_id);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS events_question_fts_ad AFTER DELETE ON events_question BEGIN
+        INSERT INTO events_question_fts(events_question_fts, rowid, text, event_id)
+            VALUES ('delete', old.id, old.text, old.event_id);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS events_question_fts_au AFTER UPDATE OF text, event_id ON events_question BEGIN
+        INSERT INTO events_question_fts(events_question_fts, rowid, text, event_id)
+            VALUES ('delete', old.id, old.text, old.event_id);
+        INSERT INTO events_question_fts(rowid, text, event_id) VALUES (new.id, new.text, new.event_id);
+    END
+    """,
+    "INSERT INTO events_question_fts(events_question_fts) VALUES ('rebuild')",
+]
+SQLITE_DROP = [
+    "DROP TRIGGER IF EXISTS events_question_fts_ai",
+    "DROP TRIGGER IF EXISTS events_question_fts_ad",
+    "DROP TRIGGER IF EXISTS events_question_fts_au",
+    "DROP TABLE IF EXISTS events_question_fts",
+]
+
+
+def create_fulltext_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute(POSTGRES_CREATE)
+    elif vendor == 'sqlite':
+        for statement in SQLITE_CREATE:
+            schema_editor.execute(statement)
+
+
+def drop_fulltext_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute(POSTGRES_DROP)
+    elif vendor == 'sqlite':
+        for statement in SQLITE_DROP:
+            schema_editor.execute(statement)
@@ -1,6 +1,17 @@
 # Services package
+from .cache_services import *
 from .event_services import *
+from .ranking_services import *
 from .question_services import *
+from .search_services import *
+from .moderation_services import *
+from .filter_services import *
+from .quiz_services import *
 from .poll_services import *
+from .wordcloud_services import *
+from .ballot_services import *
 from .user_services import *
+from .participant_services import *
 from .profile_services import *
+from .export_services import *
+from .archive_services import *
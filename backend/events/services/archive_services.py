@@ -0,0 +1,155 @@
+"""
+Event archive services
+"""
+import json
+import zlib
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Count, Q
+from django.utils import timezone
+from ..models import (
+    Event, EventArchive, Question, QuestionFingerprint, QuestionLike, Poll, PollOption, PollVote,
+    PollBallot, PollTerm, PollTextResponse
+)
+from .cache_services import invalidate_event_page
+from .wordcloud_services import WORD_CLOUD_SIZE, get_top_terms
+from .ballot_services import compute_poll_tally
+
+
+ARCHIVE_AFTER_DAYS = 30
+ARCHIVE_BATCH_SIZE = 1000
+
+
+def find_archivable_events(days=ARCHIVE_AFTER_DAYS):
+    """Get closed, not yet archived events that were closed more than `days` ago"""
+    cutoff = timezone.now() - timedelta(days=days)
+    return (
+        Event.objects
+             .filter(is_closed=True, archive__isnull=True)
+             .filter(Q(closed_at__lte=cutoff) | Q(closed_at__isnull=True, created_at__lte=cutoff))
+             .order_by('id')
+    )
+
+
+def build_event_snapshot(event):
+    """
+    Build the archived representation of an event.
+    Only approved questions are kept, and individual likes and votes are
+    reduced to per-question/per-option counts.
+    """
+    questions = []
+    like_count = 0
+    rows = (
+        Question.objects.filter(event=event, status=Question.Status.APPROVED)
+        .annotate(num_likes=Count('likes'))
+        .order_by('-num_likes', '-created_at')
+        .values_list('author__username', 'author_name', 'text', 'num_likes', 'created_at')
+    )
+    for username, author_name, text, num_likes, created_at in rows.iterator():
+        questions.append({
+            'author': username or author_name or 'Anonymous',
+            'text': text,
+            'likes': num_likes,
+            'created_at': created_at.isoformat(),
+        })
+        like_count += num_likes
+
+    polls = {}
+    polls_rows = Poll.objects.filter(event=event).order_by('id').values_list('id', 'question', 'kind', 'created_at')
+    for pk, question, kind, created_at in polls_rows:
+        polls[pk] = {'question': question, 'created_at': created_at.isoformat(), 'options': []}
+        if kind == Poll.Kind.OPEN_TEXT:
+            polls[pk]['terms'] = [
+                {'text': label, 'count': count} for label, count in get_top_terms(pk, WORD_CLOUD_SIZE)
+            ]
+
+    vote_count = 0
+    options = (
+        PollOption.objects.filter(poll__event=event)
+        .annotate(num_votes=Count('pollvote'))
+        .order_by('id')
+        .values_list('poll_id', 'text', 'num_votes')
+    )
+    for poll_id, text, num_votes in options.iterator():
+        polls[poll_id]['options'].append({'text': text, 'votes': num_votes})
+        vote_count += num_votes
+
+    for poll in Poll.objects.filter(event=event, kind__in=[Poll.Kind.MULTI_SELECT, Poll.Kind.RANKED]):
+        tally = compute_poll_tally(poll)
+        polls[poll.pk]['options'] = [{'text': option.text, 'votes': votes} for option, votes in tally['option_votes']]
+        if tally['winner'] is not None:
+            polls[poll.pk]['winner'] = tally['winner'].text
+        vote_count += tally['ballots']
+
+    return {
+        'questions': questions,
+        'polls': list(polls.values()),
+        'like_count': like_count,
+        'vote_count': vote_count,
+    }
+
+
+def _delete_in_batches(queryset, batch_size):
+    """Delete rows in primary-key batches so each statement holds locks briefly"""
+    model = queryset.model
+    deleted = 0
+    while True:
+        ids = list(queryset.order_by('pk').values_list('pk', flat=True)[:batch_size])
+        if not ids:
+            return deleted
+        with transaction.atomic():
+            count, _ = model.objects.filter(pk__in=ids).delete()
+        deleted += count
+
+
+def purge_event_hot_rows(event, batch_size=ARCHIVE_BATCH_SIZE):
+    """
+    Delete an event's likes, votes, answers, questions and polls from the hot
+    tables. Likes and votes are deleted by event, so where they are
+    partitioned each batch stays within one partition.
+    """
+    _delete_in_batches(QuestionLike.objects.filter(event=event), batch_size)
+    _delete_in_batches(QuestionFingerprint.objects.filter(event=event), batch_size)
+    _delete_in_batches(PollVote.objects.filter(event=event), batch_size)
+    _delete_in_batches(PollBallot.objects.filter(poll__event=event), batch_size)
+    _delete_in_batches(PollTextResponse.objects.filter(poll__event=event), batch_size)
+    _delete_in_batches(PollTerm.objects.filter(poll__event=event), batch_size)
+    _delete_in_batches(Question.objects.filter(event=event), batch_size)
+    _delete_in_batches(PollOption.objects.filter(poll__event=event), batch_size)
+    _delete_in_batches(Poll.objects.filter(event=event), batch_size)
+
+
+def archive_event(event, batch_size=ARCHIVE_BATCH_SIZE):
+    """
+    Snapshot an event into an EventArchive and purge its hot rows.
+    If the event already has an archive (e.g. an interrupted earlier run),
+    only the purge is resumed so the snapshot is never rebuilt from partial data.
+    """
+    archive = EventArchive.objects.filter(event=event).first()
+    if archive is None:
+        snapshot = build_event_snapshot(event)
+        archive = EventArchive.objects.create(
+            event=event,
+            data=zlib.compress(json.dumps(snapshot, ensure_ascii=False).encode('utf-8')),
+            question_count=len(snapshot['questions']),
+            like_count=snapshot['like_count'],
+            poll_count=len(snapshot['polls']),
+            vote_count=snapshot['vote_count'],
+        )
+    purge_event_hot_rows(event, batch_size=batch_size)
+    invalidate_event_page(event.pk)
+    return archive
+
+
+def is_event_archived(event):
+    """Check if an event has been moved to the archive"""
+    return EventArchive.objects.filter(event=event).exists()
+
+
+def get_event_archive_data(event):
+    """Get the decompressed snapshot of an archived event, or None"""
+    archive = EventArchive.objects.filter(event=event).first()
+    if archive is None:
+        return None
+    return json.loads(zlib.decompress(bytes(archive.data)).decode('utf-8'))
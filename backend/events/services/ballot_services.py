@@ -0,0 +1,169 @@
+"""
+Multi-select and ranked-choice poll services.
+
+Each voter casts one PollBallot: a bitset of option positions for
+multi-select polls, a packed array of positions for ranked-choice polls.
+Tallies group identical ballots in the database and count each distinct
+ballot once, weighted by how many voters cast it.
+"""
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import Count
+from core.db_router import use_primary
+from ..models import Poll, PollBallot
+from .cache_services import invalidate_event_page
+from .poll_services import get_poll_results_version, invalidate_poll_results, render_poll_chart_svg
+
+MAX_BALLOT_OPTIONS = 63  # bits of a signed BigIntegerField
+POLL_TALLY_TIMEOUT = 24 * 60 * 60
+
+
+def get_ballot_options(poll):
+    """Options of a poll in position order"""
+    return list(poll.options.order_by('id'))
+
+
+def pack_selection(positions):
+    """Bitset with bit i set for each chosen option position i"""
+    mask = 0
+    for position in positions:
+        mask |= 1 << position
+    return mask
+
+
+def unpack_selection(mask):
+    return [position for position in range(MAX_BALLOT_OPTIONS) if mask >> position & 1]
+
+
+def pack_ranking(positions):
+    """Option positions in preference order, one byte each"""
+    return bytes(positions)
+
+
+def unpack_ranking(ranking):
+    return list(bytes(ranking))
+
+
+def _option_positions(options, option_ids):
+    positions = {option.id: index for index, option in enumerate(options)}
+    try:
+        return [positions[int(option_id)] for option_id in option_ids]
+    except (KeyError, TypeError, ValueError):
+        raise ValueError("Ballot names an option that is not in this poll.")
+
+
+def cast_ballot(user, poll, option_ids):
+    """
+    Record a voter's ballot: the chosen option ids for a multi-select poll,
+    option ids in preference order for a ranked-choice poll.
+    Raises ValueError for an empty or invalid ballot.
+    """
+    positions = _option_positions(get_ballot_options(poll), option_ids)
+    if not positions:
+        raise ValueError("Choose at least one option.")
+    if len(set(positions)) != len(positions):
+        raise ValueError("Each option can be chosen only once.")
+
+    ballot = PollBallot(poll=poll, user=user)
+    if poll.kind == Poll.Kind.RANKED:
+        ballot.ranking = pack_ranking(positions)
+    else:
+        ballot.selection = pack_selection(positions)
+    try:
+        with transaction.atomic():
+            ballot.save()
+    except IntegrityError:
+        # A double submit lost the race against the one-ballot-per-user constraint
+        return PollBallot.objects.get(poll=poll, user=user)
+    invalidate_poll_results(poll.pk)
+    invalidate_event_page(poll.event_id)
+    return ballot
+
+
+def has_user_cast_ballot(user, poll):
+    """Check if user has already voted in a multi-select or ranked-choice poll"""
+    return PollBallot.objects.filter(user=user, poll=poll).exists()
+
+
+def tally_selections(grouped, option_count):
+    """Votes per option position from (selection mask, number of ballots) groups"""
+    counts = [0] * option_count
+    for mask, weight in grouped:
+        while mask:
+            low_bit = mask & -mask
+            counts[low_bit.bit_length() - 1] += weight
+            mask ^= low_bit
+    return counts
+
+
+def instant_runoff(grouped, option_count):
+    """
+    Instant-runoff count over (packed ranking, number of ballots) groups.
+    Returns (rounds, winner): each round lists the votes of every option
+    position, None once eliminated; winner is a position or None when no
+    ballot ranks any option. The option with the fewest votes is eliminated
+    each round, ties going against fewer first preferences, then the later
+    option.
+    """
+    grouped = [(bytes(ranking), weight) for ranking, weight in grouped]
+    active = set(range(option_count))
+    rounds = []
+    while active:
+        counts = [0] * option_count
+        continuing = 0
+        for ranking, weight in grouped:
+            for position in ranking:
+                if position in active:
+                    counts[position] += weight
+                    continuing += weight
+                    break
+        rounds.append([counts[position] if position in active else None for position in range(option_count)])
+        if not continuing:
+            return rounds, None
+        leader = max(active, key=lambda position: (counts[position], -position))
+        if 2 * counts[leader] > continuing or len(active) == 1:
+            return rounds, leader
+        first_round = rounds[0]
+        active.remove(min(active, key=lambda position: (counts[position], first_round[position], -position)))
+    return rounds, None
+
+
+def compute_poll_tally(poll):
+    """Tally a multi-select or ranked-choice poll from its grouped ballots"""
+    options = get_ballot_options(poll)
+    ballots = PollBallot.objects.filter(poll=poll)
+    field = 'ranking' if poll.kind == Poll.Kind.RANKED else 'selection'
+    grouped = list(ballots.values(field).annotate(weight=Count('id')).order_by().values_list(field, 'weight'))
+    total = sum(weight for _, weight in grouped)
+
+    rounds, winner = [], None
+    if poll.kind == Poll.Kind.RANKED:
+        rounds, winner = instant_runoff(grouped, len(options))
+        counts = [votes or 0 for votes in rounds[-1]] if rounds else [0] * len(options)
+    else:
+        counts = tally_selections(grouped, len(options))
+
+    option_votes = list(zip(options, counts))
+    return {
+        'ballots': total,
+        'option_votes': option_votes,
+        'rounds': list(zip(options, zip(*rounds))),  # (option, its votes in each round)
+        'round_count': len(rounds),
+        'winner': options[winner] if winner is not None else None,
+        'chart': render_poll_chart_svg(option_votes, total=total),
+    }
+
+
+def get_poll_tally(poll):
+    """
+    Tally of a multi-select or ranked-choice poll, cached until its next
+    ballot. Computed from the primary so a lagging replica cannot store an
+    old tally under the new version.
+    """
+    key = f'liteslido:poll_tally:{poll.pk}:{get_poll_results_version(poll)}'
+    tally = cache.get(key)
+    if tally is None:
+        with use_primary():
+            tally = compute_poll_tally(poll)
+        cache.set(key, tally, POLL_TALLY_TIMEOUT)
+    return tally
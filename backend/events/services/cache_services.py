@@ -0,0 +1,92 @@
+"""
+Cache version counters used to key rendered template fragments
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from core.db_router import reads_from_primary
+from ..edge_cache import notify_event_page_changed
+
+VERSION_KEY_PREFIX = 'liteslido:version'
+
+
+def _version_key(namespace, obj_id):
+    return f'{VERSION_KEY_PREFIX}:{namespace}:{obj_id}'
+
+
+def _initial_version():
+    # A counter that was evicted restarts above any value it held before,
+    # so fragments rendered under the old value are never served again
+    return time.time_ns() // 1000
+
+
+def get_cache_version(namespace, obj_id):
+    """Current version of an object's cached fragments"""
+    return get_cache_versions(namespace, [obj_id])[obj_id]
+
+
+def get_cache_versions(namespace, obj_ids):
+    """Current versions of many objects in one cache round-trip"""
+    keys = {_version_key(namespace, obj_id): obj_id for obj_id in obj_ids}
+    found = cache.get_many(keys)
+    for key in keys.keys() - found.keys():
+        cache.add(key, _initial_version(), timeout=None)
+        found[key] = cache.get(key)
+    return {obj_id: found[key] for key, obj_id in keys.items()}
+
+
+def bump_cache_version(namespace, obj_id):
+    """Invalidate every fragment keyed by this object's version"""
+    key = _version_key(namespace, obj_id)
+    cache.add(key, _initial_version(), timeout=None)
+    try:
+        return cache.incr(key)
+    except ValueError:  # evicted between add() and incr()
+        version = _initial_version()
+        cache.set(key, version, timeout=None)
+        return version
+
+
+def get_question_cards_version(event_id):
+    """Version of an event's cached question cards"""
+    return get_cache_version('question_cards', event_id)
+
+
+def invalidate_question_cards(event_id):
+    """
+    Drop an event's cached question cards. Likes need no invalidation since
+    the like count and viewer flag are part of each card's key; this is for
+    deletions and merges, which change other cards' duplicate notices.
+    """
+    bump_cache_version('question_cards', event_id)
+
+
+def get_event_page_version(event_id):
+    """
+    Version of everything shown on an event page, read before the page is
+    rendered and used for its ETag, as (version, settled). A request reading
+    from a replica while a change may not have reached it yet gets an
+    unsettled version: its page is tagged apart from the same version once
+    settled, so a copy rendered from a lagging replica is refetched once
+    instead of being revalidated forever.
+    """
+    version_key = _version_key('event_page', event_id)
+    changed_key = _version_key('event_page_changed', event_id)
+    found = cache.get_many([version_key, changed_key])
+    version = found[version_key] if version_key in found else get_cache_version('event_page', event_id)
+    lag = replica_lag_seconds()
+    settled = not lag or reads_from_primary() or time.time() - found.get(changed_key, 0) >= lag
+    return version, settled
+
+
+def replica_lag_seconds():
+    """How long a change may take to reach the read replicas (0 without replicas)"""
+    return getattr(settings, 'REPLICA_PIN_SECONDS', 0) if getattr(settings, 'DATABASE_REPLICAS', ()) else 0
+
+
+def invalidate_event_page(event_id):
+    """Mark an event page as changed so clients holding its ETag refetch it and shared caches drop it"""
+    bump_cache_version('event_page', event_id)
+    cache.set(_version_key('event_page_changed', event_id), time.time(), timeout=60)
+    notify_event_page_changed(event_id)
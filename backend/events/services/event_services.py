@@ -2,7 +2,9 @@
 Event-related business logic services
 """
 from django.shortcuts import get_object_or_404
+from django.utils import timezone
 from ..models import Event
+from .cache_services import invalidate_event_page
 
 
 def get_user_events(user):
@@ -39,7 +41,9 @@ def can_user_close_event(user, event):
 def toggle_event_close_status(event):
     """Toggle event close status"""
     event.is_closed = not event.is_closed
+    event.closed_at = timezone.now() if event.is_closed else None
     event.save()
+    invalidate_event_page(event.pk)
     return event.is_closed
 
 
@@ -0,0 +1,152 @@
+"""
+Event export services
+"""
+import csv
+import io
+import json
+
+from django.db.models import Count
+from ..models import Question, QuestionLike, Poll, PollBallot, PollOption, PollVote, PollTextResponse
+from .ballot_services import unpack_ranking, unpack_selection
+
+
+EXPORT_CHUNK_SIZE = 2000
+EXPORT_FLUSH_BYTES = 64 * 1024
+EXPORT_COLUMNS = ['record', 'id', 'parent_id', 'user_id', 'author', 'text', 'count', 'created_at']
+EXPORT_FORMATS = {
+    'csv': 'text/csv',
+    'jsonl': 'application/x-ndjson',
+}
+
+
+def _export_record(record, id, parent_id=None, user_id=None, author=None,
+                   text=None, count=None, created_at=None):
+    """Build a flat export record with the shared export columns"""
+    return {
+        'record': record,
+        'id': id,
+        'parent_id': parent_id,
+        'user_id': user_id,
+        'author': author,
+        'text': text,
+        'count': count,
+        'created_at': created_at.isoformat() if created_at else None,
+    }
+
+
+def iter_event_export_records(event, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Yield flat export records for an event's questions, likes, polls,
+    poll options, poll votes, multi-select/ranked ballots and open-text
+    poll responses. A ballot's text is its option ids, in preference order
+    for ranked polls.
+    Every query is consumed with .iterator() so rows are fetched in chunks
+    (server-side cursors on PostgreSQL) instead of being loaded at once.
+    """
+    questions = (
+        Question.objects.filter(event=event)
+        .annotate(num_likes=Count('likes'))
+        .order_by('id')
+        .values_list('id', 'author_id', 'author__username', 'author_name',
+                     'text', 'num_likes', 'created_at')
+    )
+    for pk, author_id, username, author_name, text, num_likes, created_at in questions.iterator(chunk_size=chunk_size):
+        yield _export_record('question', pk, user_id=author_id, author=username or author_name,
+                             text=text, count=num_likes, created_at=created_at)
+
+    likes = (
+        QuestionLike.objects.filter(event=event)
+        .order_by('id')
+        .values_list('id', 'question_id', 'user_id')
+    )
+    for pk, question_id, user_id in likes.iterator(chunk_size=chunk_size):
+        yield _export_record('like', pk, parent_id=question_id, user_id=user_id)
+
+    polls = Poll.objects.filter(event=event).order_by('id').values_list('id', 'question', 'created_at')
+    for pk, question, created_at in polls.iterator(chunk_size=chunk_size):
+        yield _export_record('poll', pk, text=question, created_at=created_at)
+
+    options = (
+        PollOption.objects.filter(poll__event=event)
+        .annotate(num_votes=Count('pollvote'))
+        .order_by('id')
+        .values_list('id', 'poll_id', 'text', 'num_votes')
+    )
+    for pk, poll_id, text, num_votes in options.iterator(chunk_size=chunk_size):
+        yield _export_record('poll_option', pk, parent_id=poll_id, text=text, count=num_votes)
+
+    votes = (
+        PollVote.objects.filter(event=event)
+        .order_by('id')
+        .values_list('id', 'poll_option_id', 'user_id', 'created_at')
+    )
+    for pk, option_id, user_id, created_at in votes.iterator(chunk_size=chunk_size):
+        yield _export_record('poll_vote', pk, parent_id=option_id, user_id=user_id, created_at=created_at)
+
+    option_ids = {}
+    for poll_id, option_id in PollOption.objects.filter(poll__event=event).order_by('poll_id', 'id').values_list('poll_id', 'id'):
+        option_ids.setdefault(poll_id, []).append(option_id)
+    ballots = (
+        PollBallot.objects.filter(poll__event=event)
+        .order_by('id')
+        .values_list('id', 'poll_id', 'user_id', 'selection', 'ranking', 'created_at')
+    )
+    for pk, poll_id, user_id, selection, ranking, created_at in ballots.iterator(chunk_size=chunk_size):
+        positions = unpack_ranking(ranking) if ranking else unpack_selection(selection)
+        choices = ','.join(str(option_ids[poll_id][position]) for position in positions)
+        yield _export_record('poll_ballot', pk, parent_id=poll_id, user_id=user_id, text=choices, created_at=created_at)
+
+    responses = (
+        PollTextResponse.objects.filter(poll__event=event)
+        .order_by('id')
+        .values_list('id', 'poll_id', 'user_id', 'text', 'created_at')
+    )
+    for pk, poll_id, user_id, text, created_at in responses.iterator(chunk_size=chunk_size):
+        yield _export_record('poll_response', pk, parent_id=poll_id, user_id=user_id, text=text, created_at=created_at)
+
+
+def _buffered(lines, flush_bytes=EXPORT_FLUSH_BYTES):
+    """Group small encoded lines into larger chunks for the response writer"""
+    buffer = io.StringIO()
+    for line in lines:
+        buffer.write(line)
+        if buffer.tell() >= flush_bytes:
+            yield buffer.getvalue()
+            buffer = io.StringIO()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+class _Echo:
+    """File-like object that returns what is written instead of storing it"""
+    def write(self, value):
+        return value
+
+
+def _iter_csv_lines(records):
+    writer = csv.DictWriter(_Echo(), fieldnames=EXPORT_COLUMNS)
+    yield writer.writeheader()
+    for record in records:
+        yield writer.writerow(record)
+
+
+def _iter_jsonl_lines(records):
+    for record in records:
+        yield json.dumps(record, ensure_ascii=False) + '\n'
+
+
+def stream_event_export(event, export_format='csv', chunk_size=EXPORT_CHUNK_SIZE):
+    """Return an iterator of text chunks exporting the event in the given format"""
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format: {export_format}")
+    records = iter_event_export_records(event, chunk_size=chunk_size)
+    if export_format == 'csv':
+        lines = _iter_csv_lines(records)
+    else:
+        lines = _iter_jsonl_lines(records)
+    return _buffered(lines)
+
+
+def can_user_export_event(user, event):
+    """Check if user can export event data"""
+    return user == event.creator
@@ -0,0 +1,169 @@
+"""
+Content filtering services for incoming questions
+"""
+import logging
+import os
+import re
+import threading
+import time
+from collections import namedtuple
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+FilterResult = namedtuple('FilterResult', ['flagged', 'reason'])
+CLEAN = FilterResult(False, '')
+
+_TOKEN_RE = re.compile(r'\w+')
+# Backreferences (numbered per pattern) and global inline flags (only valid at the start)
+_OWN_REGEX_RE = re.compile(r'\\[1-9]|\(\?P=|\(\?[aiLmsux]+\)')
+
+
+def _read_list(path):
+    """Read a filter list file, skipping blank lines and # comments"""
+    if not path or not os.path.exists(path):
+        return []
+    with open(path, encoding='utf-8') as fh:
+        return [line.strip() for line in fh if line.strip() and not line.lstrip().startswith('#')]
+
+
+class ContentFilter:
+    """
+    Word/phrase and regex matcher compiled once per list version.
+    Words are matched by hashing each token of the text (plus phrase lookups
+    keyed by their first token), so the cost depends on the text length and
+    not on the number of listed words. Regexes are combined into one pattern,
+    except those using backreferences or global inline flags, which are
+    matched on their own. Invalid regexes are logged and skipped.
+    """
+
+    def __init__(self, words=(), patterns=()):
+        self.words = set()
+        self.phrases = {}
+        for entry in words:
+            tokens = tuple(_TOKEN_RE.findall(entry.lower()))
+            if len(tokens) == 1:
+                self.words.add(tokens[0])
+            elif tokens:
+                self.phrases.setdefault(tokens[0], []).append(tokens)
+
+        compiled = []
+        for pattern in patterns:
+            try:
+                compiled.append((pattern, re.compile(pattern, re.IGNORECASE)))
+            except re.error as exc:
+                logger.error("Content filter pattern %r skipped: %s", pattern, exc)
+        self.patterns = [pattern for pattern, _ in compiled if not _OWN_REGEX_RE.search(pattern)]
+        self.own_regexes = [regex for pattern, regex in compiled if _OWN_REGEX_RE.search(pattern)]
+        self.regex = None
+        if self.patterns:
+            try:
+                self.regex = re.compile(
+                    '|'.join(f'(?P<p{i}>{pattern})' for i, pattern in enumerate(self.patterns)),
+                    re.IGNORECASE,
+                )
+            except re.error:  # e.g. the same group name in two patterns
+                self.own_regexes += [re.compile(pattern, re.IGNORECASE) for pattern in self.patterns]
+                self.patterns = []
+
+    def check(self, text):
+        """Return a FilterResult for the given text"""
+        tokens = _TOKEN_RE.findall(text.lower())
+        words, phrases = self.words, self.phrases
+        for i, token in enumerate(tokens):
+            if token in words:
+                return FilterResult(True, f'word: {token}')
+            for phrase in phrases.get(token, ()):
+                if tuple(tokens[i:i + len(phrase)]) == phrase:
+                    return FilterResult(True, f"phrase: {' '.join(phrase)}")
+
+        if self.regex is not None:
+            match = self.regex.search(text)
+            if match:
+                pattern = self.patterns[int(match.lastgroup[1:])]
+                return FilterResult(True, f'pattern: {pattern}'[:255])
+        for regex in self.own_regexes:
+            if regex.search(text):
+                return FilterResult(True, f'pattern: {regex.pattern}'[:255])
+        return CLEAN
+
+
+class _FilterLoader:
+    """Rebuilds the ContentFilter when the configured list files change"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._filter = None
+        self._signature = None
+        self._failed_signature = None
+        self._checked_at = 0.0
+
+    def _config(self):
+        config = getattr(settings, 'CONTENT_FILTER', {})
+        return (
+            config.get('WORD_LIST'),
+            config.get('PATTERN_LIST'),
+            config.get('RELOAD_INTERVAL', 5),
+        )
+
+    def _file_signature(self, paths):
+        signature = []
+        for path in paths:
+            try:
+                stat = os.stat(path) if path else None
+            except OSError:
+                stat = None
+            signature.append((str(path), stat.st_mtime_ns if stat else None, stat.st_size if stat else None))
+        return tuple(signature)
+
+    def get(self):
+        word_list, pattern_list, interval = self._config()
+        now = time.monotonic()
+        if self._filter is not None and now - self._checked_at < interval:
+            return self._filter
+
+        with self._lock:
+            signature = self._file_signature([word_list, pattern_list])
+            if self._filter is None or signature != self._signature:
+                self._reload(word_list, pattern_list, signature)
+            self._checked_at = now
+        return self._filter
+
+    def _reload(self, word_list, pattern_list, signature):
+        try:
+            self._filter = ContentFilter(_read_list(word_list), _read_list(pattern_list))
+        except (OSError, UnicodeDecodeError) as exc:
+            # Keep the previous lists (or none at all) until the files are fixed
+            if signature != self._failed_signature:
+                logger.error("Content filter lists not reloaded: %s", exc)
+                self._failed_signature = signature
+            if self._filter is None:
+                self._filter = ContentFilter()
+            return
+        self._signature = signature
+        self._failed_signature = None
+
+    def reset(self):
+        with self._lock:
+            self._filter = None
+            self._signature = None
+            self._failed_signature = None
+
+
+_loader = _FilterLoader()
+
+
+def get_content_filter():
+    """Get the compiled content filter, reloading it if the lists changed"""
+    return _loader.get()
+
+
+def reset_content_filter():
+    """Drop the compiled filter so the next check rebuilds it"""
+    _loader.reset()
+
+
+def check_question_content(text):
+    """Check question text against the configured word lists and patterns"""
+    return get_content_filter().check(text)
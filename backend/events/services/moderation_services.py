@@ -0,0 +1,100 @@
+"""
+Question moderation services
+"""
+from contextvars import ContextVar
+from django.db import transaction
+from ..models import Question, QuestionLike
+from .cache_services import invalidate_event_page, invalidate_question_cards
+
+
+MODERATION_PAGE_SIZE = 50
+MODERATION_ACTIONS = ('approve', 'reject', 'delete')
+
+# Questions whose likes delete_questions() has already deleted in one statement
+_likes_deleted = ContextVar('liteslido_likes_deleted', default=frozenset())
+
+
+def can_user_moderate_event(user, event):
+    """Check if user can moderate questions of an event"""
+    return user == event.creator
+
+
+def initial_question_status(event, flagged=False):
+    """Status given to a newly submitted question"""
+    if event.moderation_enabled or flagged:
+        return Question.Status.PENDING
+    return Question.Status.APPROVED
+
+
+def toggle_event_moderation(event):
+    """Toggle pre-moderation of new questions for an event"""
+    event.moderation_enabled = not event.moderation_enabled
+    event.save(update_fields=['moderation_enabled'])
+    invalidate_event_page(event.pk)
+    return event.moderation_enabled
+
+
+def count_pending_questions(event):
+    """Count questions waiting for review"""
+    return Question.objects.filter(event=event, status=Question.Status.PENDING).count()
+
+
+def get_moderation_queue(event, status=Question.Status.PENDING, after_id=None, limit=MODERATION_PAGE_SIZE):
+    """
+    Get one page of the moderation queue using keyset pagination on id.
+    Returns (questions, next_after_id); next_after_id is None on the last page.
+    """
+    questions = (
+        Question.objects.filter(event=event, status=status)
+                        .select_related('author')
+                        .order_by('id')
+    )
+    if after_id is not None:
+        questions = questions.filter(id__gt=after_id)
+    page = list(questions[:limit + 1])
+    if len(page) > limit:
+        page = page[:limit]
+        return page, page[-1].id
+    return page, None
+
+
+def delete_questions(event_id, question_ids):
+    """
+    Delete questions of an event with their likes, which are deleted by event
+    (the partition key, see events/partitioning.py) and question first.
+    Returns the number of questions deleted.
+    """
+    token = _likes_deleted.set(frozenset(question_ids))
+    try:
+        with transaction.atomic():
+            QuestionLike.objects.filter(event_id=event_id, question_id__in=question_ids).delete()
+            _, deleted = Question.objects.filter(event_id=event_id, pk__in=question_ids).delete()
+    finally:
+        _likes_deleted.reset(token)
+    return deleted.get(Question._meta.label, 0)
+
+
+def delete_question_likes(question):
+    """
+    Delete the likes of a question deleted some other way than delete_questions()
+    (its author's account, the admin): QuestionLike.question does not cascade.
+    """
+    if question.pk not in _likes_deleted.get():
+        QuestionLike.objects.filter(event_id=question.event_id, question_id=question.pk).delete()
+
+
+def bulk_moderate_questions(event, question_ids, action):
+    """Approve, reject or delete many questions of an event in one transaction"""
+    if action not in MODERATION_ACTIONS:
+        raise ValueError(f"Unknown moderation action: {action}")
+
+    questions = Question.objects.filter(event=event, id__in=question_ids)
+    with transaction.atomic():
+        if action == 'delete':
+            count = delete_questions(event.pk, question_ids)
+            invalidate_question_cards(event.pk)
+        else:
+            status = Question.Status.APPROVED if action == 'approve' else Question.Status.REJECTED
+            count = questions.update(status=status)
+    invalidate_event_page(event.pk)
+    return count
@@ -0,0 +1,98 @@
+"""
+Passwordless attendee join services.
+
+The QR code and join link of an event carry a signed, event-scoped join
+token. Presenting it creates a Participant backed by a User with an
+unusable password, so joining costs a signature check and two inserts
+instead of the PBKDF2 runs of a register-and-login. A device joining again
+gets its guest back (PARTICIPANT_COOKIE), guest creation is rate limited
+per client address, and a guest only ever acts within its own event.
+"""
+import uuid
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core import signing
+from django.core.cache import cache
+from django.db import transaction
+from ..models import Event, Participant, Question
+
+JOIN_TOKEN_SALT = 'events.join'
+PARTICIPANT_COOKIE_SALT = 'events.participant'
+PARTICIPANT_EVENT_SESSION_KEY = '_participant_event'
+PARTICIPANT_USERNAME_PREFIX = 'guest-'
+
+
+def make_join_token(event_code):
+    """Signed token that lets its holder join the event as a participant"""
+    return signing.dumps({'e': event_code}, salt=JOIN_TOKEN_SALT)
+
+
+def get_event_for_join_token(token, event_code):
+    """
+    Return the open event a join token was issued for, or None when the
+    token is forged, expired or belongs to another event.
+    """
+    try:
+        data = signing.loads(token or '', salt=JOIN_TOKEN_SALT, max_age=settings.JOIN_TOKEN_MAX_AGE)
+    except signing.BadSignature:
+        return None
+    if data.get('e') != event_code:
+        return None
+    return Event.objects.filter(code=event_code, is_closed=False).first()
+
+
+def get_event_participant(user_id, event):
+    """The guest user_id stands for if it joined this event, else None"""
+    if user_id is None:
+        return None
+    return User.objects.filter(pk=user_id, is_active=True, participant__event=event).first()
+
+
+def claim_participant_join(event, client_address):
+    """
+    Count a guest creation for an event from a client address; False once
+    the address created PARTICIPANT_JOIN_LIMIT guests of the event within
+    PARTICIPANT_JOIN_WINDOW
+    """
+    key = f'liteslido:participant-joins:{event.pk}:{client_address}'
+    cache.add(key, 0, settings.PARTICIPANT_JOIN_WINDOW)
+    try:
+        joins = cache.incr(key)
+    except ValueError:  # the window ran out in between
+        joins = 1
+        cache.set(key, joins, settings.PARTICIPANT_JOIN_WINDOW)
+    return joins <= settings.PARTICIPANT_JOIN_LIMIT
+
+
+@transaction.atomic
+def create_participant(event):
+    """Create a guest user for the event; no password is hashed"""
+    user = User(username=f'{PARTICIPANT_USERNAME_PREFIX}{uuid.uuid4().hex[:12]}')
+    user.set_unusable_password()
+    user.save()
+    Participant.objects.create(user=user, event=event)
+    return user
+
+
+def is_participant(user):
+    """Whether the user is a guest created from a join token"""
+    return hasattr(user, 'participant')
+
+
+def get_participant_event_code(user, session):
+    """
+    Code of the event a guest is confined to, or None for regular users.
+    Kept in the session so a guest's requests look it up only once.
+    """
+    if not user.is_authenticated or not user.username.startswith(PARTICIPANT_USERNAME_PREFIX):
+        return None
+    if PARTICIPANT_EVENT_SESSION_KEY not in session:
+        session[PARTICIPANT_EVENT_SESSION_KEY] = (
+            Participant.objects.filter(user=user).values_list('event__code', flat=True).first()
+        )
+    return session[PARTICIPANT_EVENT_SESSION_KEY]
+
+
+def is_question_in_event(question_id, event_code):
+    return Question.objects.filter(pk=question_id, event__code=event_code).exists()
@@ -1,7 +1,15 @@
 """
 Poll-related business logic services
 """
+from django.core.cache import cache
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils.html import escape
+from django.utils import timezone
+from django.utils.text import Truncator
 from ..models import Poll, PollOption, PollVote
+from .cache_services import bump_cache_version, get_cache_version, get_cache_versions, invalidate_event_page
+from .quiz_services import record_quiz_score, score_quiz_answer
 
 
 def get_event_polls(event):
@@ -9,17 +17,28 @@ def get_event_polls(event):
     return event.polls.all()
 
 
-def create_poll(event, question, options_text):
-    """Create a poll with options"""
+def create_poll(event, question, options_text, kind=Poll.Kind.CHOICE, time_limit=None, correct_options=()):
+    """
+    Create a poll with options; open-text polls take free answers instead.
+    A time limit makes it a quiz question whose correct answers are the
+    options whose text is in correct_options.
+    """
     poll = Poll.objects.create(
         event=event,
-        question=question
+        question=question,
+        kind=kind,
+        time_limit=time_limit
     )
     
-    for option_text in options_text:
-        if option_text.strip():
-            PollOption.objects.create(poll=poll, text=option_text.strip())
+    correct_options = {text.strip() for text in correct_options}
+    if kind != Poll.Kind.OPEN_TEXT:
+        for option_text in options_text:
+            if option_text.strip():
+                PollOption.objects.create(
+                    poll=poll, text=option_text.strip(), is_correct=option_text.strip() in correct_options
+                )
     
+    invalidate_event_page(event.pk)
     return poll
 
 
@@ -35,19 +54,98 @@ def get_poll_options(poll):
 
 def has_user_voted_in_poll(user, poll):
     """Check if user has already voted in poll"""
-    return PollVote.objects.filter(user=user, poll_option__poll=poll).exists()
+    return PollVote.objects.filter(event_id=poll.event_id, user=user, poll_option__poll=poll).exists()
 
 
 def vote_in_poll(user, poll_option):
-    """Record a vote for a poll option"""
-    return PollVote.objects.create(user=user, poll_option=poll_option)
+    """Record a vote for a poll option; quiz answers are scored onto the leaderboard"""
+    poll = poll_option.poll
+    score = score_quiz_answer(poll, poll_option, timezone.now()) if poll.is_quiz else 0
+    vote = PollVote.objects.create(event_id=poll.event_id, user=user, poll_option=poll_option, score=score)
+    invalidate_poll_results(poll.pk)
+    invalidate_event_page(poll.event_id)
+    if poll.is_quiz:
+        record_quiz_score(poll.event_id, user.pk, score)
+    return vote
+
+
+def get_poll_results_version(poll):
+    """Version of a poll's results, bumped on every vote"""
+    return get_cache_version('poll_results', poll.pk)
+
+
+def with_poll_results_versions(polls):
+    """Evaluate polls and set results_version on each, for keying cached poll blocks"""
+    polls = list(polls)
+    versions = get_cache_versions('poll_results', [poll.pk for poll in polls])
+    for poll in polls:
+        poll.results_version = versions[poll.pk]
+    return polls
+
+
+def invalidate_poll_results(poll_id):
+    """Drop cached fragments that show a poll's results"""
+    bump_cache_version('poll_results', poll_id)
 
 
 def get_poll_vote_counts(poll):
     """Get vote counts for each option in a poll"""
-    options = poll.options.all()
-    option_votes_list = []
-    for option in options:
-        count = PollVote.objects.filter(poll_option=option).count()
-        option_votes_list.append((option, count))
-    return option_votes_list
+    # Filtered on the event so only the event's votes partition is read
+    num_votes = Subquery(
+        PollVote.objects.filter(event_id=poll.event_id, poll_option=OuterRef('pk'))
+                        .order_by().values('poll_option').annotate(count=Count('*')).values('count'),
+        output_field=IntegerField(),
+    )
+    options = poll.options.annotate(num_votes=Coalesce(num_votes, 0)).order_by('id')
+    return [(option, option.num_votes) for option in options]
+
+
+POLL_CHART_TIMEOUT = 24 * 60 * 60
+POLL_CHART_COLORS = ('#3B82F6', '#10B981', '#F59E0B', '#EF4444', '#8B5CF6', '#EC4899')
+POLL_CHART_WIDTH = 600
+POLL_CHART_ROW_HEIGHT = 44
+
+
+def render_poll_chart_svg(option_votes, total=None):
+    """
+    Render (option, votes) pairs as a horizontal SVG bar chart.
+    Percentages are of `total`, which defaults to the sum of the votes
+    (multi-select polls pass the number of ballots instead).
+    """
+    if total is None:
+        total = sum(votes for _, votes in option_votes)
+    most = max((votes for _, votes in option_votes), default=0) or 1
+    bar_width = POLL_CHART_WIDTH - 120
+    height = max(len(option_votes), 1) * POLL_CHART_ROW_HEIGHT
+    rows = []
+    for index, (option, votes) in enumerate(option_votes):
+        y = index * POLL_CHART_ROW_HEIGHT
+        width = round(bar_width * votes / most, 1)
+        percent = round(100 * votes / total) if total else 0
+        rows.append(
+            f'<text x="0" y="{y + 14}" font-size="13" fill="#374151">'
+            f'{escape(Truncator(option.text).chars(70))}</text>'
+            f'<rect x="0" y="{y + 20}" width="{bar_width}" height="16" rx="4" fill="#F3F4F6"/>'
+            f'<rect x="0" y="{y + 20}" width="{width}" height="16" rx="4" '
+            f'fill="{POLL_CHART_COLORS[index % len(POLL_CHART_COLORS)]}"/>'
+            f'<text x="{bar_width + 8}" y="{y + 33}" font-size="13" fill="#6B7280">{votes} ({percent}%)</text>'
+        )
+    return (
+        f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {POLL_CHART_WIDTH} {height}" '
+        f'width="100%" role="img" aria-label="Poll results: {total} vote{"" if total == 1 else "s"}" '
+        f'font-family="ui-sans-serif, system-ui, sans-serif">{"".join(rows)}</svg>'
+    )
+
+
+def get_poll_chart_svg(poll, option_votes):
+    """SVG results chart of a poll, cached until its next vote"""
+    # The vote total is part of the key because counts read from a lagging
+    # replica may predate the version bump; votes are never withdrawn, so the
+    # total identifies the results
+    total = sum(votes for _, votes in option_votes)
+    key = f'liteslido:poll_chart:{poll.pk}:{get_poll_results_version(poll)}:{total}'
+    svg = cache.get(key)
+    if svg is None:
+        svg = render_poll_chart_svg(option_votes)
+        cache.set(key, svg, POLL_CHART_TIMEOUT)
+    return svg
@@ -1,20 +1,24 @@
 """
 QR Code generation services
 """
-import qrcode
 import io
 import base64
+from urllib.parse import urlencode
+from .participant_services import make_join_token
 
 
 def generate_qr_code(event_code):
     """
     Generate a QR code for the event invitation.
     Returns a base64 encoded image string and the event URL.
+    The URL carries a join token so attendees can join without an account.
     """
     # Build the full URL for the smart redirect (works for both logged-in and anonymous users)
-    event_url = f"http://37.32.13.114:8000/events/join/{event_code}/"
+    query = urlencode({'t': make_join_token(event_code)})
+    event_url = f"http://37.32.13.114:8000/events/join/{event_code}/?{query}"
     
-    # Create QR code
+    # Create QR code; qrcode (and Pillow under it) is only loaded once a page needs one
+    import qrcode
     qr = qrcode.QRCode(
         version=1,
         error_correction=qrcode.constants.ERROR_CORRECT_L,
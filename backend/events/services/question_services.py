@@ -1,47 +1,131 @@
 """
 Question-related business logic services
 """
-from django.db.models import Count
-from ..models import Event, Question
+from django.conf import settings
+from django.core import signing
+from django.db import transaction
+from django.db.models import BooleanField, Count, Exists, F, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from ..models import Event, Question, QuestionLike
+from .search_services import index_question_fingerprint
+from .moderation_services import delete_questions, initial_question_status
+from .cache_services import invalidate_event_page, invalidate_question_cards
+from .ranking_services import DEFAULT_QUESTION_SORT, QUESTION_SORTS, hot_weight, update_hot_score
 
+QUESTION_FORM_TOKEN_SALT = 'events.anonymous_question'
 
-def get_event_questions(event):
-    """Get questions for an event ordered by likes and creation time"""
+
+def get_event_questions(event, viewer=None, sort=DEFAULT_QUESTION_SORT):
+    """
+    Get approved questions for an event, by default ordered by likes and
+    creation time; sort='hot' orders by time-decayed likes instead.
+    Each question is annotated with num_likes and viewer_liked (whether
+    `viewer` liked it) so templates never query likes per question.
+    """
+    if viewer is not None and viewer.is_authenticated:
+        viewer_liked = Exists(
+            QuestionLike.objects.filter(event=event, question=OuterRef('pk'), user=viewer)
+        )
+    else:
+        viewer_liked = Value(False, output_field=BooleanField())
+    # A per-row count rather than a GROUP BY, so the hot order can be read off its index;
+    # filtering on the event lets PostgreSQL read only the event's likes partition
+    num_likes = Subquery(
+        QuestionLike.objects.filter(event=event, question=OuterRef('pk'))
+                            .order_by().values('question').annotate(count=Count('*')).values('count'),
+        output_field=IntegerField(),
+    )
     return (
         event.questions
-             .annotate(num_likes=Count('likes'))
-             .order_by('-num_likes', '-created_at')
+             .filter(status=Question.Status.APPROVED)
+             .select_related('author', 'duplicate_of')
+             .annotate(num_likes=Coalesce(num_likes, 0), viewer_liked=viewer_liked)
+             .order_by(*QUESTION_SORTS[sort])
     )
 
 
-def add_question_to_event(event, text, author=None, author_name=None):
-    """Add a question to an event"""
-    return Question.objects.create(
-        event=event,
-        text=text,
-        author=author,
-        author_name=author_name
-    )
+def add_question_to_event(event, text, author=None, author_name=None, flag_reason=''):
+    """
+    Add a question to an event and flag it if a near-duplicate exists.
+    Questions flagged by the content filter are held for moderation.
+    """
+    with transaction.atomic():
+        question = Question.objects.create(
+            event=event,
+            text=text,
+            author=author,
+            author_name=author_name,
+            status=initial_question_status(event, flagged=bool(flag_reason)),
+            is_flagged=bool(flag_reason),
+            flag_reason=flag_reason,
+        )
+        epoch = update_hot_score(question.pk, event.pk, lambda epoch: hot_weight(question.created_at, epoch))
+        question.hot_score = hot_weight(question.created_at, epoch)
+    index_question_fingerprint(question)
+    invalidate_event_page(event.pk)
+    return question
 
 
-def add_anonymous_question(event, author_name, text):
-    """Add an anonymous question to an event"""
-    return Question.objects.create(
-        event=event,
-        author=None,  # Anonymous user
-        author_name=author_name,
-        text=text
-    )
+def add_anonymous_question(event, author_name, text, flag_reason=''):
+    """
+    Add an anonymous question to an event and flag it if a near-duplicate exists.
+    Questions flagged by the content filter are held for moderation.
+    """
+    with transaction.atomic():
+        question = Question.objects.create(
+            event=event,
+            author=None,  # Anonymous user
+            author_name=author_name,
+            text=text,
+            status=initial_question_status(event, flagged=bool(flag_reason)),
+            is_flagged=bool(flag_reason),
+            flag_reason=flag_reason,
+        )
+        epoch = update_hot_score(question.pk, event.pk, lambda epoch: hot_weight(question.created_at, epoch))
+        question.hot_score = hot_weight(question.created_at, epoch)
+    index_question_fingerprint(question)
+    invalidate_event_page(event.pk)
+    return question
+
+
+def make_question_form_token(event_code):
+    """
+    Signed token the anonymous question form carries instead of a CSRF
+    token, so the form page sets no cookie and can be cached publicly
+    """
+    return signing.dumps({'e': event_code}, salt=QUESTION_FORM_TOKEN_SALT)
+
+
+def check_question_form_token(token, event_code):
+    """Whether a question form token is genuine, unexpired and issued for this event"""
+    try:
+        data = signing.loads(token or '', salt=QUESTION_FORM_TOKEN_SALT, max_age=settings.QUESTION_FORM_TOKEN_MAX_AGE)
+    except signing.BadSignature:
+        return False
+    return data.get('e') == event_code
 
 
 def toggle_question_like(user, question):
-    """Toggle like status for a question"""
-    if user in question.likes.all():
-        question.likes.remove(user)
-        return False  # Unliked
-    else:
-        question.likes.add(user)
-        return True  # Liked
+    """
+    Toggle like status for a question, adding or taking back the like's
+    weight in the question's hot score
+    """
+    with transaction.atomic():
+        like = QuestionLike.objects.filter(event_id=question.event_id, question=question, user=user).first()
+        if like is not None:
+            QuestionLike.objects.filter(event_id=question.event_id, pk=like.pk).delete()
+            sign, liked = -1, False
+        else:
+            like = QuestionLike.objects.create(
+                event_id=question.event_id, question=question, user=user, liked_at=timezone.now()
+            )
+            sign, liked = 1, True
+        update_hot_score(
+            question.pk, question.event_id, lambda epoch: F('hot_score') + sign * hot_weight(like.liked_at, epoch)
+        )
+    invalidate_event_page(question.event_id)
+    return liked
 
 
 def can_user_delete_question(user, event):
@@ -51,4 +135,6 @@ def can_user_delete_question(user, event):
 
 def delete_question(question):
     """Delete a question"""
-    question.delete()
+    delete_questions(question.event_id, [question.pk])
+    invalidate_question_cards(question.event_id)
+    invalidate_event_page(question.event_id)
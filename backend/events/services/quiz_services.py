@@ -0,0 +1,150 @@
+"""
+Quiz services: timed poll questions with an answer key, scored by
+correctness and speed, ranked on a live per-event leaderboard.
+
+The leaderboard is a sorted set (see events/leaderboard.py) updated on each
+quiz answer, so top-N and rank-of-me lookups are O(log n). PollVote.score
+keeps the points durable; a leaderboard missing from the store (e.g. after
+a restart of the in-process stand-in) is rebuilt from it once.
+"""
+import time
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.db.models import Sum
+from django.utils import timezone
+from ..leaderboard import get_leaderboard_store
+from ..models import PollVote
+
+QUIZ_BASE_POINTS = 500  # for a correct answer
+QUIZ_SPEED_POINTS = 500  # extra for answering instantly, falling linearly to 0 at the deadline
+LEADERBOARD_SIZE = 10
+LEADERBOARD_REBUILD_TIMEOUT = 30  # seconds a rebuild may hold its lock
+
+
+def _leaderboard_key(event_id):
+    return f'liteslido:leaderboard:{event_id}'
+
+
+def _loaded_key(event_id):
+    return f'liteslido:leaderboard:{event_id}:loaded'
+
+
+def _rebuild_lock_key(event_id):
+    return f'liteslido:leaderboard:{event_id}:rebuilding'
+
+
+def get_quiz_deadline(poll):
+    """When a quiz question stops accepting answers, counted from its creation"""
+    return poll.created_at + timedelta(seconds=poll.time_limit)
+
+
+def is_quiz_open(poll, now=None):
+    return (now or timezone.now()) < get_quiz_deadline(poll)
+
+
+def score_quiz_answer(poll, poll_option, answered_at):
+    """Points for an answer: nothing if wrong or late, more the faster a correct one came"""
+    if not poll_option.is_correct or not is_quiz_open(poll, answered_at):
+        return 0
+    elapsed = (answered_at - poll.created_at).total_seconds()
+    remaining = max(0.0, 1 - elapsed / poll.time_limit)
+    return QUIZ_BASE_POINTS + round(QUIZ_SPEED_POINTS * remaining)
+
+
+def get_quiz_answer(user, poll):
+    """The vote the user answered a quiz question with (its option selected), or None"""
+    return (
+        PollVote.objects.filter(event_id=poll.event_id, user=user, poll_option__poll=poll)
+        .select_related('poll_option').first()
+    )
+
+
+def _quiz_votes(event_id):
+    return PollVote.objects.filter(event_id=event_id, poll_option__poll__time_limit__isnull=False)
+
+
+def rebuild_leaderboard(event_id):
+    """
+    Load an event's leaderboard into the store from the recorded quiz answers.
+    One rebuild runs at a time: it fills a temporary key and renames it over
+    the leaderboard, so nobody sees it half-built. Returns False if it waited
+    for another worker's rebuild instead, whose totals may predate answers
+    saved meanwhile.
+    """
+    store = get_leaderboard_store()
+    lock_key = _rebuild_lock_key(event_id)
+    if not store.set(lock_key, 1, ex=LEADERBOARD_REBUILD_TIMEOUT, nx=True):
+        deadline = time.monotonic() + LEADERBOARD_REBUILD_TIMEOUT
+        while store.exists(lock_key) and time.monotonic() < deadline:
+            time.sleep(0.05)
+        return False
+    try:
+        totals = (
+            _quiz_votes(event_id)
+            .values('user_id')
+            .annotate(total=Sum('score'))
+            .order_by()
+            .values_list('user_id', 'total')
+        )
+        key = _leaderboard_key(event_id)
+        mapping = {str(user_id): total for user_id, total in totals}
+        if mapping:
+            building = f'{key}:building'
+            store.delete(building)
+            store.zadd(building, mapping)
+            store.rename(building, key)
+        else:
+            store.delete(key)
+        store.set(_loaded_key(event_id), 1)
+    finally:
+        store.delete(lock_key)
+    return True
+
+
+def _ensure_leaderboard(event_id):
+    """The store, and None if the leaderboard was loaded, else what rebuild_leaderboard() returned"""
+    store = get_leaderboard_store()
+    if store.exists(_loaded_key(event_id)):
+        return store, None
+    return store, rebuild_leaderboard(event_id)
+
+
+def record_quiz_score(event_id, user_id, points):
+    """Add an answer's points to the leaderboard; call after its PollVote is saved"""
+    store, rebuilt = _ensure_leaderboard(event_id)
+    key = _leaderboard_key(event_id)
+    if rebuilt is None:
+        store.zincrby(key, points, str(user_id))
+    elif not rebuilt:  # another worker's rebuild may not have counted the saved answer
+        total = _quiz_votes(event_id).filter(user_id=user_id).aggregate(total=Sum('score'))['total'] or 0
+        store.zadd(key, {str(user_id): total})
+
+
+def get_leaderboard(event, limit=LEADERBOARD_SIZE):
+    """Top players as dicts with rank, user and score"""
+    store, _ = _ensure_leaderboard(event.pk)
+    entries = store.zrevrange(_leaderboard_key(event.pk), 0, limit - 1, withscores=True)
+    users = User.objects.in_bulk([int(member) for member, _ in entries])
+    return [
+        {'rank': rank, 'user': users.get(int(member)), 'score': int(score)}
+        for rank, (member, score) in enumerate(entries, start=1)
+    ]
+
+
+def get_leaderboard_position(event, user):
+    """The user's rank, score and the number of players, or None if they have not played"""
+    store, _ = _ensure_leaderboard(event.pk)
+    key = _leaderboard_key(event.pk)
+    rank = store.zrevrank(key, str(user.pk))
+    if rank is None:
+        return None
+    return {
+        'rank': rank + 1,
+        'score': int(store.zscore(key, str(user.pk))),
+        'players': store.zcard(key),
+    }
+
+
+def event_has_quiz(polls):
+    return any(poll.is_quiz for poll in polls)
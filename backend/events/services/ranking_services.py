@@ -0,0 +1,102 @@
+"""
+"Hot" question ranking: likes decayed exponentially with age.
+
+Rather than decaying every like on every page view, each like adds a weight
+that grows exponentially with time, 2 ** ((liked_at - epoch) / half-life).
+Relative to each other the same likes decay, so ordering by the stored
+Question.hot_score gives the hot order and the per-event index keeps top-N
+an index range scan. The weights outgrow a float over days, so an event's
+scores are periodically multiplied down in one bulk UPDATE while its epoch
+moves forward (see the rescale_hot_scores command).
+
+Writes do not lock the event: they read its epoch once and make their
+UPDATE conditional on the event still having that epoch
+(update_hot_score()). If a rescale committed in between, the UPDATE matches
+no row and the write computes its score again for the new epoch. Once the
+write holds the question's row lock, a rescale that has not reached the row
+waits for it. An epoch so old that a like's weight would overflow a float
+(an event reopened weeks later) is moved forward by the write itself.
+"""
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from ..models import Event, Question, QuestionLike
+
+HOT_HALF_LIFE_SECONDS = 30 * 60  # a like counts half as much after this long
+HOT_RESCALE_AFTER = timedelta(hours=6)  # how stale an epoch the periodic rescale leaves alone
+HOT_MAX_EXPONENT = 256  # half-lives after which a write rescales first (2.0 ** 1024 overflows)
+
+QUESTION_SORTS = {
+    'top': ('-num_likes', '-created_at'),
+    'hot': ('-hot_score', '-id'),
+}
+DEFAULT_QUESTION_SORT = 'top'
+
+
+def hot_weight(moment, epoch):
+    """Weight of a like (or a new question) at `moment` relative to an event's epoch"""
+    return 2.0 ** ((moment - epoch).total_seconds() / HOT_HALF_LIFE_SECONDS)
+
+
+def _rescale(event_id, epoch, now):
+    factor = hot_weight(epoch, now)
+    Question.objects.filter(event_id=event_id).update(hot_score=F('hot_score') * factor)
+    Event.objects.filter(pk=event_id).update(hot_epoch=now)
+    return now
+
+
+def get_hot_epoch(event_id):
+    """
+    An event's hot epoch, read without locking the event. An epoch too old
+    for the weight of a like to fit in a float is rescaled to now first.
+    """
+    epoch = Event.objects.values_list('hot_epoch', flat=True).get(pk=event_id)
+    if (timezone.now() - epoch).total_seconds() / HOT_HALF_LIFE_SECONDS > HOT_MAX_EXPONENT:
+        epoch = rescale_hot_scores(event_id)
+    return epoch
+
+
+def update_hot_score(question_id, event_id, hot_score):
+    """
+    Set a question's hot score to hot_score(epoch), a value or expression
+    relative to the event's epoch. The UPDATE only applies while the event
+    still has that epoch: if a rescale moved it in between, the score is
+    computed again for the new one. Returns the epoch the score applied to.
+    """
+    epoch = get_hot_epoch(event_id)
+    while not Question.objects.filter(pk=question_id, event__hot_epoch=epoch).update(hot_score=hot_score(epoch)):
+        current = get_hot_epoch(event_id)
+        if current == epoch:
+            break  # the question is gone
+        epoch = current
+    return epoch
+
+
+def rescale_hot_scores(event_id):
+    """Scale an event's hot scores down to a current epoch; the order is unchanged"""
+    with transaction.atomic():
+        # FOR UPDATE (not NO KEY UPDATE) also waits for transactions inserting the event's questions
+        epoch = Event.objects.select_for_update().values_list('hot_epoch', flat=True).get(pk=event_id)
+        return _rescale(event_id, epoch, timezone.now())
+
+
+def find_events_to_rescale(older_than=HOT_RESCALE_AFTER):
+    """Unarchived events, closed ones too as they may reopen, whose hot epoch is older than `older_than`"""
+    return Event.objects.filter(archive__isnull=True, hot_epoch__lt=timezone.now() - older_than).values_list('pk', flat=True)
+
+
+def recompute_hot_score(question):
+    """Recompute a question's hot score from its creation and like times"""
+    liked_at = list(
+        QuestionLike.objects.filter(event_id=question.event_id, question=question)
+        .values_list('liked_at', flat=True)
+    )
+
+    def score(epoch):
+        return hot_weight(question.created_at, epoch) + sum(hot_weight(moment, epoch) for moment in liked_at)
+
+    epoch = update_hot_score(question.pk, question.event_id, score)
+    question.hot_score = score(epoch)
+    return question.hot_score
@@ -0,0 +1,186 @@
+"""
+Question search and near-duplicate detection services
+"""
+import hashlib
+import random
+import re
+
+from django.db import connection, transaction
+from django.db.models import Count
+from ..models import Question, QuestionFingerprint, QuestionLike
+from .cache_services import invalidate_event_page, invalidate_question_cards
+from .moderation_services import delete_questions
+from .ranking_services import recompute_hot_score
+
+
+SEARCH_RESULT_LIMIT = 50
+
+# MinHash / LSH parameters: 16 bands of 4 rows flag pairs above ~0.5 Jaccard
+MINHASH_BANDS = 16
+MINHASH_ROWS = 4
+SHINGLE_SIZE = 4
+DUPLICATE_THRESHOLD = 0.6
+DUPLICATE_CANDIDATES = 10
+MINHASH_SEED = 1404
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_rng = random.Random(MINHASH_SEED)
+_HASH_PARAMS = [
+    (_rng.randrange(1, _MERSENNE_PRIME), _rng.randrange(0, _MERSENNE_PRIME))
+    for _ in range(MINHASH_BANDS * MINHASH_ROWS)
+]
+_WORD_RE = re.compile(r'\w+')
+
+
+def _search_terms(query):
+    return _WORD_RE.findall(query.lower())
+
+
+def search_event_questions(event, query, questions=None, limit=SEARCH_RESULT_LIMIT):
+    """
+    Full-text search over an event's questions.
+    Matches are applied as a filter on `questions` (default: all of the event's
+    questions) so callers keep their own annotations and ordering.
+    Uses the GIN index on PostgreSQL and the FTS5 table on SQLite.
+    """
+    terms = _search_terms(query)
+    if questions is None:
+        questions = event.questions.all()
+    if not terms:
+        return questions.none()
+
+    if connection.vendor == 'postgresql':
+        from django.contrib.postgres.search import SearchQuery, SearchVector
+        matching = (
+            Question.objects.filter(event=event)
+                    .annotate(search=SearchVector('text', config='simple'))
+                    .filter(search=SearchQuery(' & '.join(terms), config='simple', search_type='raw'))
+                    .values('id')[:limit]
+        )
+        return questions.filter(id__in=matching)
+
+    if connection.vendor == 'sqlite':
+        match = ' '.join('"%s"' % term.replace('"', '""') for term in terms)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT rowid FROM events_question_fts "
+                "WHERE events_question_fts MATCH %s AND event_id = %s "
+                "ORDER BY rank LIMIT %s",
+                [match, event.id, limit],
+            )
+            ids = [row[0] for row in cursor.fetchall()]
+        return questions.filter(id__in=ids)
+
+    matching = Question.objects.filter(event=event)
+    for term in terms:
+        matching = matching.filter(text__icontains=term)
+    return questions.filter(id__in=matching.values('id')[:limit])
+
+
+def question_shingles(text):
+    """Character shingles of the normalized question text"""
+    normalized = ' '.join(_WORD_RE.findall(text.lower()))
+    if len(normalized) <= SHINGLE_SIZE:
+        return {normalized} if normalized else set()
+    return {normalized[i:i + SHINGLE_SIZE] for i in range(len(normalized) - SHINGLE_SIZE + 1)}
+
+
+def _shingle_hash(shingle):
+    return int.from_bytes(hashlib.blake2b(shingle.encode('utf-8'), digest_size=8).digest(), 'big')
+
+
+def minhash_signature(shingles):
+    """MinHash signature of a shingle set"""
+    hashes = [_shingle_hash(shingle) for shingle in shingles]
+    return [
+        min((a * h + b) % _MERSENNE_PRIME for h in hashes)
+        for a, b in _HASH_PARAMS
+    ]
+
+
+def lsh_buckets(signature):
+    """Hash each band of a MinHash signature into a signed 64-bit bucket id"""
+    buckets = []
+    for band in range(MINHASH_BANDS):
+        rows = signature[band * MINHASH_ROWS:(band + 1) * MINHASH_ROWS]
+        digest = hashlib.blake2b(repr((band, rows)).encode('ascii'), digest_size=8).digest()
+        buckets.append(int.from_bytes(digest, 'big', signed=True))
+    return buckets
+
+
+def _jaccard(a, b):
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def _similar_questions(event, shingles, buckets, exclude_id, threshold):
+    candidates = QuestionFingerprint.objects.filter(event=event, bucket__in=buckets)
+    if exclude_id is not None:
+        candidates = candidates.exclude(question_id=exclude_id)
+    candidate_ids = list(
+        candidates.values('question_id')
+                  .annotate(hits=Count('id'))
+                  .order_by('-hits')
+                  .values_list('question_id', flat=True)[:DUPLICATE_CANDIDATES]
+    )
+
+    similar = []
+    # Only approved questions are suggested: pending or rejected text must not reach other askers
+    for question in Question.objects.filter(id__in=candidate_ids, status=Question.Status.APPROVED):
+        score = _jaccard(shingles, question_shingles(question.text))
+        if score >= threshold:
+            similar.append((question, score))
+    similar.sort(key=lambda pair: pair[1], reverse=True)
+    return similar
+
+
+def find_similar_questions(event, text, exclude_id=None, threshold=DUPLICATE_THRESHOLD):
+    """
+    Find questions in an event similar to the given text.
+    Only questions sharing an LSH bucket are compared, so the cost does not
+    grow with the number of questions in the event.
+    Returns (question, similarity) pairs, most similar first.
+    """
+    shingles = question_shingles(text)
+    if not shingles:
+        return []
+    buckets = lsh_buckets(minhash_signature(shingles))
+    return _similar_questions(event, shingles, buckets, exclude_id, threshold)
+
+
+def index_question_fingerprint(question):
+    """Store the LSH buckets of a question and flag its closest earlier duplicate"""
+    shingles = question_shingles(question.text)
+    if not shingles:
+        return None
+    buckets = lsh_buckets(minhash_signature(shingles))
+
+    similar = _similar_questions(question.event, shingles, buckets, question.id, DUPLICATE_THRESHOLD)
+    with transaction.atomic():
+        QuestionFingerprint.objects.bulk_create([
+            QuestionFingerprint(event_id=question.event_id, question=question, bucket=bucket)
+            for bucket in set(buckets)
+        ])
+        if similar:
+            question.duplicate_of = similar[0][0]
+            question.save(update_fields=['duplicate_of'])
+    return question.duplicate_of
+
+
+def merge_questions(duplicate, target):
+    """
+    Merge a duplicate question into target: move its likes, then delete it.
+    The target must be an approved question.
+    """
+    if target.status != Question.Status.APPROVED:
+        raise ValueError("Questions can only be merged into an approved question.")
+    with transaction.atomic():
+        (QuestionLike.objects.filter(event_id=target.event_id, question=duplicate)
+            .exclude(user__in=QuestionLike.objects.filter(event_id=target.event_id, question=target).values('user'))
+            .update(question=target))  # keeps liked_at for the hot score
+        delete_questions(duplicate.event_id, [duplicate.pk])
+        recompute_hot_score(target)
+    invalidate_question_cards(target.event_id)
+    invalidate_event_page(target.event_id)
+    return target
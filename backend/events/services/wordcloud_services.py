@@ -0,0 +1,125 @@
+"""
+Open-text poll services: responses are normalized into terms as they
+arrive and counted in PollTerm, so the word cloud is a top-k read.
+"""
+import re
+
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from ..models import PollTerm, PollTextResponse
+from .cache_services import invalidate_event_page
+from .poll_services import invalidate_poll_results
+
+WORD_CLOUD_SIZE = 50
+MAX_TERMS_PER_RESPONSE = 20
+MAX_TERM_LENGTH = 64
+WORD_CLOUD_MIN_SIZE = 0.875  # rem
+WORD_CLOUD_MAX_SIZE = 3.0  # rem
+
+_WORD_RE = re.compile(r"\w+(?:'\w+)?")
+
+STOP_WORDS = frozenset("""
+a about above after again against all am an and any are as at be because been before being
+below between both but by can could did do does doing down during each few for from further
+had has have having he her here hers herself him himself his how i if in into is it its itself
+just me more most my myself no nor not now of off on once only or other our ours ourselves out
+over own really same she should so some such than that the their theirs them themselves then
+there these they this those through to too under until up us very was we were what when where
+which while who whom why will with would you your yours yourself yourselves
+i'm it's don't can't isn't that's
+""".split())
+
+
+def stem_term(word):
+    """
+    Light suffix stripping so that plural and inflected forms share a term
+    ("teams"/"team", "learning"/"learned"/"learn"); not a full Porter stemmer
+    """
+    if len(word) <= 3:
+        return word
+    if word.endswith("'s"):
+        word = word[:-2]
+    if word.endswith('ies') and len(word) > 4:
+        return word[:-3] + 'y'
+    if word.endswith('sses'):
+        return word[:-2]
+    if word.endswith('s') and not word.endswith(('ss', 'us', 'is')):
+        return word[:-1]
+    for suffix in ('ing', 'ed'):
+        stem = word[:-len(suffix)]
+        if word.endswith(suffix) and len(stem) >= 3:
+            if len(stem) > 3 and stem[-1] == stem[-2] and stem[-1] not in 'lsz':
+                stem = stem[:-1]  # running -> run
+            return stem
+    return word
+
+
+def normalize_response(text):
+    """
+    Map each distinct term of a response to the spelling it was written in.
+    Case-folded, stop words dropped, stemmed; a term counts once per response.
+    """
+    terms = {}
+    for word in _WORD_RE.findall(text.casefold()):
+        if word in STOP_WORDS or len(word) < 2:
+            continue
+        word = word[:MAX_TERM_LENGTH]
+        terms.setdefault(stem_term(word), word)
+        if len(terms) >= MAX_TERMS_PER_RESPONSE:
+            break
+    return terms
+
+
+def has_user_responded_to_poll(user, poll):
+    """Check if user has already answered an open-text poll"""
+    return PollTextResponse.objects.filter(user=user, poll=poll).exists()
+
+
+def submit_poll_response(user, poll, text):
+    """Store a response and add its terms to the poll's term frequencies"""
+    terms = normalize_response(text)
+    try:
+        with transaction.atomic():
+            response = PollTextResponse.objects.create(poll=poll, user=user, text=text)
+            if terms:
+                # Create missing terms at zero, then increment all in one statement,
+                # which stays correct when responses race on a new term
+                PollTerm.objects.bulk_create(
+                    [PollTerm(poll=poll, term=term, label=label) for term, label in terms.items()],
+                    ignore_conflicts=True,
+                )
+                PollTerm.objects.filter(poll=poll, term__in=terms).update(count=F('count') + 1)
+    except IntegrityError:
+        # A double submit lost the race against the one-response-per-user constraint
+        return PollTextResponse.objects.get(poll=poll, user=user)
+    invalidate_poll_results(poll.pk)
+    invalidate_event_page(poll.event_id)
+    return response
+
+
+def get_top_terms(poll, limit=WORD_CLOUD_SIZE):
+    """(label, count) of the poll's most frequent terms, read through the top-terms index"""
+    return list(
+        PollTerm.objects.filter(poll=poll)
+        .order_by('-count', 'term')
+        .values_list('label', 'count')[:limit]
+    )
+
+
+def get_word_cloud(poll, limit=WORD_CLOUD_SIZE):
+    """Top terms sized by frequency, in alphabetical order for display"""
+    top_terms = get_top_terms(poll, limit)
+    if not top_terms:
+        return []
+    most = top_terms[0][1]
+    least = top_terms[-1][1]
+    spread = (most - least) or 1
+    words = [
+        {
+            'text': label,
+            'count': count,
+            'size': round(WORD_CLOUD_MIN_SIZE + (WORD_CLOUD_MAX_SIZE - WORD_CLOUD_MIN_SIZE) * (count - least) / spread, 3),
+        }
+        for label, count in top_terms
+    ]
+    return sorted(words, key=lambda word: word['text'])
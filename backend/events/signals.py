@@ -1,8 +1,9 @@
 # events/signals.py
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, pre_delete
 from django.dispatch import receiver
 from django.contrib.auth.models import User
-from .models import Profile
+from .models import Event, Profile, Question
+from .services import delete_question_likes
 
 @receiver(post_save, sender=User)
 def create_or_update_profile(sender, instance, created, **kwargs):
@@ -10,3 +11,11 @@ def create_or_update_profile(sender, instance, created, **kwargs):
         Profile.objects.create(user=instance)
     else:
         instance.profile.save()
+
+
+@receiver(pre_delete, sender=Question)
+def delete_likes_of_question(sender, instance, origin=None, **kwargs):
+    # Deleting the event deletes its likes through QuestionLike.event already
+    if isinstance(origin, Event) or getattr(origin, 'model', None) is Event:
+        return
+    delete_question_likes(instance)
@@ -0,0 +1,73 @@
+// Progressive enhancement for poll results: the page already shows a
+// server-rendered SVG chart; once the browser is idle this loads the
+// locally served Chart.js build and swaps in an interactive chart.
+(function () {
+  const script = document.currentScript;
+  const container = document.getElementById('resultsChart');
+  const dataElement = document.getElementById('poll-results');
+  if (!script || !container || !dataElement) {
+    return;
+  }
+  const results = JSON.parse(dataElement.textContent);
+  const colors = ['#3B82F6', '#10B981', '#F59E0B', '#EF4444', '#8B5CF6', '#EC4899'];
+
+  function loadChartJS(src) {
+    return new Promise((resolve, reject) => {
+      if (typeof Chart !== 'undefined') {
+        resolve();
+        return;
+      }
+      const tag = document.createElement('script');
+      tag.src = src;
+      tag.onload = resolve;
+      tag.onerror = reject;
+      document.head.appendChild(tag);
+    });
+  }
+
+  function render() {
+    const canvas = document.createElement('canvas');
+    const svg = container.querySelector('svg');
+    container.style.height = Math.max(240, results.labels.length * 48) + 'px';
+    new Chart(canvas.getContext('2d'), {
+      type: 'bar',
+      data: {
+        labels: results.labels,
+        datasets: [{
+          label: 'Votes',
+          data: results.votes,
+          backgroundColor: results.labels.map((_, i) => colors[i % colors.length]),
+          borderRadius: 6,
+        }]
+      },
+      options: {
+        indexAxis: 'y',
+        responsive: true,
+        maintainAspectRatio: false,
+        plugins: {
+          legend: { display: false },
+          tooltip: {
+            callbacks: {
+              label: function (context) {
+                const total = results.votes.reduce((a, b) => a + b, 0);
+                const percentage = total > 0 ? Math.round((context.parsed.x / total) * 100) : 0;
+                return `${context.parsed.x} vote${context.parsed.x !== 1 ? 's' : ''} (${percentage}%)`;
+              }
+            }
+          }
+        },
+        scales: { x: { beginAtZero: true, ticks: { precision: 0 } } }
+      }
+    });
+    if (svg) {
+      svg.remove();
+    }
+    container.appendChild(canvas);
+  }
+
+  const idle = window.requestIdleCallback || ((callback) => setTimeout(callback, 200));
+  idle(() => {
+    // Keep the SVG chart if Chart.js cannot be loaded (e.g. offline venue networks)
+    loadChartJS(script.dataset.chartjs).then(render).catch(() => {});
+  });
+})();
@@ -0,0 +1,66 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+from .models import Event, EventArchive, Question, Poll, PollOption, PollVote
+from . import services
+
+
+class ArchiveServicesTestCase(TestCase):
+    def setUp(self):
+        self.creator = User.objects.create_user(username='creator', password='testpass123')
+        self.attendee = User.objects.create_user(username='attendee', password='testpass123')
+        self.event = Event.objects.create(
+            title='Old Event', creator=self.creator,
+            is_closed=True, closed_at=timezone.now() - timedelta(days=60),
+        )
+        for i in range(5):
+            question = Question.objects.create(event=self.event, author=self.attendee, text=f'Question {i}')
+            question.likes.add(self.creator)
+        poll = Poll.objects.create(event=self.event, question='Best?')
+        option = PollOption.objects.create(poll=poll, text='A')
+        PollVote.objects.create(user=self.attendee, poll_option=option)
+
+    def test_find_archivable_events_respects_age_and_state(self):
+        recent = Event.objects.create(title='Recent', creator=self.creator,
+                                      is_closed=True, closed_at=timezone.now())
+        open_event = Event.objects.create(title='Open', creator=self.creator)
+
+        archivable = list(services.find_archivable_events(days=30))
+        self.assertIn(self.event, archivable)
+        self.assertNotIn(recent, archivable)
+        self.assertNotIn(open_event, archivable)
+
+    def test_archive_event_snapshots_and_purges_in_batches(self):
+        archive = services.archive_event(self.event, batch_size=2)
+
+        self.assertEqual(archive.question_count, 5)
+        self.assertEqual(archive.like_count, 5)
+        self.assertEqual(archive.vote_count, 1)
+        self.assertFalse(Question.objects.filter(event=self.event).exists())
+        self.assertFalse(Question.likes.through.objects.exists())
+        self.assertFalse(PollVote.objects.exists())
+        self.assertFalse(Poll.objects.filter(event=self.event).exists())
+
+        data = services.get_event_archive_data(self.event)
+        self.assertEqual(len(data['questions']), 5)
+        self.assertEqual(data['polls'][0]['options'], [{'text': 'A', 'votes': 1}])
+
+    def test_rearchiving_keeps_original_snapshot(self):
+        services.archive_event(self.event)
+        services.archive_event(self.event)
+        self.assertEqual(EventArchive.objects.get(event=self.event).question_count, 5)
+
+    def test_archived_event_page_renders_from_snapshot(self):
+        call_command('archive_closed_events', '--days', '30', stdout=StringIO())
+        self.client.force_login(self.creator)
+
+        response = self.client.get(f'/events/{self.event.code}/')
+        self.assertTemplateUsed(response, 'events/event_archived.html')
+        self.assertContains(response, 'Question 3')
+
+        response = self.client.post(f'/events/{self.event.code}/toggle_close/')
+        self.assertEqual(response.status_code, 403)
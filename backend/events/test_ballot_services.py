@@ -0,0 +1,136 @@
+from unittest import mock
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase
+from .models import Event, Poll, PollBallot
+from .services import ballot_services
+from . import services
+
+
+class BallotPackingTestCase(SimpleTestCase):
+    def test_selection_round_trips_through_a_bitset(self):
+        mask = services.pack_selection([0, 3, 62])
+        self.assertEqual(mask, 1 | 8 | 1 << 62)
+        self.assertEqual(services.unpack_selection(mask), [0, 3, 62])
+
+    def test_ranking_is_one_byte_per_choice(self):
+        ranking = services.pack_ranking([2, 0, 1])
+        self.assertEqual(len(ranking), 3)
+        self.assertEqual(services.unpack_ranking(memoryview(ranking)), [2, 0, 1])
+
+    def test_selection_tally_counts_weighted_groups(self):
+        grouped = [(0b011, 5), (0b110, 2), (0b001, 1)]
+        self.assertEqual(services.tally_selections(grouped, 3), [6, 7, 2])
+
+
+class InstantRunoffTestCase(SimpleTestCase):
+    def test_majority_in_first_round(self):
+        rounds, winner = services.instant_runoff([(b'\x00\x01', 3), (b'\x01', 2)], 2)
+        self.assertEqual(rounds, [[3, 2]])
+        self.assertEqual(winner, 0)
+
+    def test_transfers_until_a_majority(self):
+        # A leads on first preferences, but C's voters prefer B
+        grouped = [(b'\x00', 8), (b'\x01\x00', 5), (b'\x02\x01', 4)]
+        rounds, winner = services.instant_runoff(grouped, 3)
+        self.assertEqual(rounds, [[8, 5, 4], [8, 9, None]])
+        self.assertEqual(winner, 1)
+
+    def test_exhausted_ballots_leave_the_count(self):
+        grouped = [(b'\x00', 4), (b'\x01', 3), (b'\x02', 2)]
+        rounds, winner = services.instant_runoff(grouped, 3)
+        self.assertEqual(rounds, [[4, 3, 2], [4, 3, None]])
+        self.assertEqual(winner, 0)
+
+    def test_no_ballots_has_no_winner(self):
+        self.assertEqual(services.instant_runoff([], 3), ([[0, 0, 0]], None))
+
+
+class BallotPollTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.creator = User.objects.create_user(username='creator', password='testpass123')
+        self.event = Event.objects.create(title='Planning', creator=self.creator)
+        self.voters = [User.objects.create_user(username=f'voter{i}', password='testpass123') for i in range(3)]
+
+    def make_poll(self, kind):
+        poll = services.create_poll(self.event, 'Which topics?', ['Caching', 'Indexes', 'Queues'], kind=kind)
+        return poll, services.get_ballot_options(poll)
+
+    def test_multi_select_ballot_is_one_row(self):
+        poll, (caching, indexes, queues) = self.make_poll(Poll.Kind.MULTI_SELECT)
+        services.cast_ballot(self.voters[0], poll, [caching.id, queues.id])
+        services.cast_ballot(self.voters[1], poll, [queues.id])
+        self.assertEqual(PollBallot.objects.count(), 2)
+        self.assertEqual(PollBallot.objects.get(user=self.voters[0]).selection, 0b101)
+
+        tally = services.get_poll_tally(poll)
+        self.assertEqual(tally['ballots'], 2)
+        self.assertEqual([votes for _, votes in tally['option_votes']], [1, 0, 2])
+        self.assertIn('aria-label="Poll results: 2 votes"', tally['chart'])
+
+    def test_invalid_ballots_are_rejected(self):
+        poll, (caching, indexes, queues) = self.make_poll(Poll.Kind.RANKED)
+        other, other_options = self.make_poll(Poll.Kind.RANKED)
+        for option_ids in ([], [caching.id, caching.id], [other_options[0].id]):
+            with self.assertRaises(ValueError):
+                services.cast_ballot(self.voters[0], poll, option_ids)
+        self.assertFalse(PollBallot.objects.exists())
+
+    def test_double_submit_keeps_the_first_ballot(self):
+        poll, (caching, indexes, queues) = self.make_poll(Poll.Kind.MULTI_SELECT)
+        services.cast_ballot(self.voters[0], poll, [caching.id])
+        services.cast_ballot(self.voters[0], poll, [indexes.id])
+        self.assertEqual(PollBallot.objects.get().selection, 0b001)
+
+    def test_tally_is_cached_until_the_next_ballot(self):
+        poll, (caching, indexes, queues) = self.make_poll(Poll.Kind.RANKED)
+        services.cast_ballot(self.voters[0], poll, [indexes.id, caching.id])
+        with mock.patch.object(ballot_services, 'compute_poll_tally', wraps=ballot_services.compute_poll_tally) as compute:
+            self.assertEqual(services.get_poll_tally(poll)['winner'], indexes)
+            services.get_poll_tally(poll)
+            self.assertEqual(compute.call_count, 1)
+            services.cast_ballot(self.voters[1], poll, [caching.id])
+            services.get_poll_tally(poll)
+            self.assertEqual(compute.call_count, 2)
+
+    def test_ranked_poll_detail_flow(self):
+        poll, (caching, indexes, queues) = self.make_poll(Poll.Kind.RANKED)
+        url = f'/events/{self.event.code}/poll/{poll.id}/'
+        self.client.force_login(self.voters[0])
+        self.assertContains(self.client.get(url), f'name="rank_{caching.id}"')
+
+        response = self.client.post(url, {f'rank_{caching.id}': '1', f'rank_{queues.id}': '1'})
+        self.assertContains(response, 'Give each option a different rank.')
+
+        response = self.client.post(url, {f'rank_{caching.id}': '2', f'rank_{queues.id}': '1'})
+        self.assertRedirects(response, url)
+        self.assertEqual(services.unpack_ranking(PollBallot.objects.get().ranking), [2, 0])
+        response = self.client.get(url)
+        self.assertContains(response, 'Instant-Runoff Rounds')
+        self.assertContains(response, 'Winner: <span class="font-semibold">Queues</span>')
+
+    def test_multi_select_poll_detail_flow(self):
+        poll, (caching, indexes, queues) = self.make_poll(Poll.Kind.MULTI_SELECT)
+        url = f'/events/{self.event.code}/poll/{poll.id}/'
+        self.client.force_login(self.voters[0])
+        response = self.client.post(url, {'poll_option': [caching.id, indexes.id]})
+        self.assertRedirects(response, url)
+        self.assertContains(self.client.get(url), 'aria-label="Poll results: 1 vote"')
+
+    def test_export_lists_ballot_choices(self):
+        poll, (caching, indexes, queues) = self.make_poll(Poll.Kind.RANKED)
+        services.cast_ballot(self.voters[0], poll, [queues.id, caching.id])
+        records = [r for r in services.iter_event_export_records(self.event) if r['record'] == 'poll_ballot']
+        self.assertEqual(records[0]['text'], f'{queues.id},{caching.id}')
+
+    def test_archive_keeps_the_tally(self):
+        poll, (caching, indexes, queues) = self.make_poll(Poll.Kind.RANKED)
+        services.cast_ballot(self.voters[0], poll, [queues.id])
+        self.event.is_closed = True
+        self.event.save()
+        services.archive_event(self.event)
+        archived = services.get_event_archive_data(self.event)['polls'][0]
+        self.assertEqual(archived['winner'], 'Queues')
+        self.assertEqual(archived['options'][2], {'text': 'Queues', 'votes': 1})
+        self.assertFalse(PollBallot.objects.exists())
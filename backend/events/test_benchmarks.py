@@ -0,0 +1,226 @@
+"""
+Micro-benchmarks for hot paths.
+Run on their own with: python manage.py test events --tag=benchmark
+"""
+import gzip
+import random
+import string
+import time
+from unittest import mock
+
+from django.contrib.auth import authenticate
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.template import Engine, engines
+from django.test import Client, SimpleTestCase, TestCase, override_settings, tag
+from .models import Event, Poll, PollBallot, PollTextResponse, Question
+from .query_audit import query_audit_exempt
+from .services.filter_services import ContentFilter
+from . import services
+
+
+def _timed(func, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat
+
+
+@tag('benchmark')
+class ContentFilterBenchmark(SimpleTestCase):
+    def test_per_question_cost_with_10k_patterns(self):
+        rng = random.Random(42)
+        words = {''.join(rng.choices(string.ascii_lowercase, k=rng.randint(5, 10))) for _ in range(10_000)}
+        phrases = [f'{a} {b}' for a, b in zip(list(words)[:500], list(words)[500:1000])]
+        content_filter = ContentFilter(words=list(words) + phrases, patterns=[r'https?://\S+', r'(.)\1{9,}'])
+
+        question = (
+            "Could you share more details about how the caching layer behaves "
+            "when the primary database fails over during a busy keynote session?"
+        )
+        per_question = _timed(lambda: content_filter.check(question), repeat=2000)
+        print(f"\ncontent filter: {per_question * 1e6:.1f} us/question with {len(words) + len(phrases)} entries")
+
+        self.assertFalse(content_filter.check(question).flagged)
+        self.assertLess(per_question, 500e-6)
+
+
+@tag('benchmark')
+class EventDetailRenderBenchmark(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.creator = User.objects.create_user(username='creator', password='testpass123')
+        cls.event = Event.objects.create(title='Keynote', creator=cls.creator)
+        Question.objects.bulk_create([
+            Question(event=cls.event, author=cls.creator, text=f'Question number {i} about the keynote?')
+            for i in range(1000)
+        ])
+
+    @query_audit_exempt
+    def test_render_event_detail_with_1000_questions(self):
+        url = f'/events/{self.event.code}/'
+        self.client.force_login(self.creator)
+
+        def cold():
+            caches['template_fragments'].clear()
+            self.client.get(url)
+
+        cold_render = _timed(cold, repeat=5)
+        warm_render = _timed(lambda: self.client.get(url), repeat=5)
+        services.toggle_question_like(self.creator, self.event.questions.first())
+        after_like = _timed(lambda: self.client.get(url), repeat=1)
+
+        loaders = ['django.template.loaders.app_directories.Loader']
+        uncached = Engine(loaders=loaders, libraries=engines['django'].engine.libraries)
+        parse = _timed(lambda: uncached.get_template('events/event_detail.html'), repeat=50)
+        cached = _timed(lambda: engines['django'].engine.get_template('events/event_detail.html'), repeat=50)
+
+        print(
+            f"\nevent_detail, 1000 questions: cold fragments {cold_render * 1000:.1f} ms, "
+            f"warm fragments {warm_render * 1000:.1f} ms, after one like {after_like * 1000:.1f} ms; "
+            f"template load {parse * 1e6:.0f} us parsed vs {cached * 1e6:.1f} us cached"
+        )
+        self.assertLess(warm_render, cold_render)
+        self.assertLess(cached, parse)
+
+
+@tag('benchmark')
+class EventPageBandwidthBenchmark(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.creator = User.objects.create_user(username='creator', password='testpass123')
+        cls.event = Event.objects.create(title='Keynote', creator=cls.creator)
+        Question.objects.bulk_create([
+            Question(event=cls.event, author=cls.creator, text=f'Question number {i} about the keynote?')
+            for i in range(200)
+        ])
+
+    @query_audit_exempt
+    def test_bytes_per_page_view(self):
+        url = f'/events/{self.event.code}/'
+        self.client.force_login(self.creator)
+        self.client.get(url)  # sets the CSRF cookie
+
+        # The share link carries a timestamped join token: keep it (and its QR code) the same in both renders
+        with mock.patch('django.core.signing.time.time', return_value=time.time()):
+            plain = self.client.get(url)
+            compressed = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip')
+        revalidated = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip', HTTP_IF_NONE_MATCH=compressed['ETag'])
+
+        print(
+            f"\nevent_detail, 200 questions: {len(plain.content)} bytes plain, "
+            f"{len(compressed.content)} bytes gzip ({100 * len(compressed.content) / len(plain.content):.1f}%), "
+            f"{len(revalidated.content)} bytes on 304"
+        )
+        self.assertEqual(len(gzip.decompress(compressed.content)), len(plain.content))
+        self.assertEqual(revalidated.status_code, 304)
+        self.assertLess(len(compressed.content), len(plain.content) / 4)
+
+
+@tag('benchmark')
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.PBKDF2PasswordHasher'])
+class LoginPathBenchmark(TestCase):
+    """Attendee sign-ins per second on one core, with the production password hasher"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.creator = User.objects.create_user(username='creator', password='testpass123')
+        cls.event = Event.objects.create(title='Keynote', creator=cls.creator)
+
+    @query_audit_exempt
+    def test_sign_ins_per_second(self):
+        counter = iter(range(10**6))
+        password = 'Att3ndee-pass-phrase'
+
+        def register(authenticate_again=False):
+            username = f'attendee{next(counter)}'
+            Client().post('/accounts/register/', {
+                'username': username, 'email': '', 'password1': password, 'password2': password,
+            })
+            if authenticate_again:  # what register used to do after create_user
+                authenticate(username=username, password=password)
+
+        join_url = f'/events/join/{self.event.code}/'
+        token = services.make_join_token(self.event.code)
+        before = _timed(lambda: register(authenticate_again=True), repeat=10)
+        after = _timed(register, repeat=10)
+        join = _timed(lambda: Client().post(join_url, {'t': token}), repeat=50)
+
+        print(
+            f"\nsign-ins per core: register+authenticate {1 / before:.1f}/s, "
+            f"register {1 / after:.1f}/s, join token {1 / join:.1f}/s"
+        )
+        self.assertEqual(self.event.participants.count(), 50)
+        self.assertLess(after, before)
+        self.assertLess(join * 5, after)
+
+
+@tag('benchmark')
+class WordCloudBenchmark(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.creator = User.objects.create_user(username='creator', password='testpass123')
+        cls.event = Event.objects.create(title='Keynote', creator=cls.creator)
+        cls.poll = services.create_poll(cls.event, 'One word for this keynote?', [], kind=Poll.Kind.OPEN_TEXT)
+        rng = random.Random(7)
+        vocabulary = [''.join(rng.choices(string.ascii_lowercase, k=rng.randint(4, 9))) for _ in range(400)]
+        cls.users = User.objects.bulk_create([User(username=f'attendee{i}') for i in range(3000)])
+        cls.answers = [' '.join(rng.choices(vocabulary, k=rng.randint(1, 3))) for _ in cls.users]
+
+    @query_audit_exempt
+    def test_cloud_cost_does_not_grow_with_responses(self):
+        start = time.perf_counter()
+        for user, answer in zip(self.users, self.answers):
+            services.submit_poll_response(user, self.poll, answer)
+        submit = (time.perf_counter() - start) / len(self.users)
+
+        cloud = _timed(lambda: services.get_word_cloud(self.poll), repeat=20)
+
+        def retokenize():
+            counts = {}
+            for text in PollTextResponse.objects.filter(poll=self.poll).values_list('text', flat=True):
+                for term in services.normalize_response(text):
+                    counts[term] = counts.get(term, 0) + 1
+            return sorted(counts.items(), key=lambda item: -item[1])[:services.WORD_CLOUD_SIZE]
+
+        naive = _timed(retokenize, repeat=3)
+        print(
+            f"\nword cloud, {len(self.users)} responses: {submit * 1e3:.2f} ms per response, "
+            f"top-k read {cloud * 1e3:.2f} ms vs re-tokenizing {naive * 1e3:.1f} ms"
+        )
+        self.assertEqual(len(services.get_word_cloud(self.poll)), services.WORD_CLOUD_SIZE)
+        self.assertLess(cloud * 10, naive)
+
+
+@tag('benchmark')
+class RankedTallyBenchmark(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.creator = User.objects.create_user(username='creator', password='testpass123')
+        cls.event = Event.objects.create(title='Keynote', creator=cls.creator)
+        cls.poll = services.create_poll(cls.event, 'Rank the next topics', [f'Topic {i}' for i in range(6)],
+                                        kind=Poll.Kind.RANKED)
+        rng = random.Random(11)
+        users = User.objects.bulk_create([User(username=f'attendee{i}') for i in range(10_000)])
+        preferences = [[0, 1, 2, 3, 4, 5], [1, 0, 2], [2, 1], [3, 2, 1, 0], [4], [5, 4, 3]]
+        PollBallot.objects.bulk_create([
+            PollBallot(poll=cls.poll, user=user, ranking=services.pack_ranking(rng.choice(preferences)))
+            for user in users
+        ])
+
+    def test_grouped_instant_runoff(self):
+        grouped = _timed(lambda: services.compute_poll_tally(self.poll), repeat=5)
+
+        def per_ballot():
+            rankings = PollBallot.objects.filter(poll=self.poll).values_list('ranking', flat=True)
+            return services.instant_runoff([(ranking, 1) for ranking in rankings], 6)
+
+        naive = _timed(per_ballot, repeat=3)
+        print(
+            f"\nranked-choice tally, 10000 ballots: grouped {grouped * 1e3:.1f} ms, "
+            f"per-ballot {naive * 1e3:.1f} ms, {len(services.pack_ranking(range(6)))} bytes per full ranking"
+        )
+        tally = services.compute_poll_tally(self.poll)
+        self.assertEqual(tally['ballots'], 10_000)
+        self.assertEqual(tally['winner'], services.get_ballot_options(self.poll)[per_ballot()[1]])
+        self.assertLess(grouped, naive)
@@ -0,0 +1,70 @@
+from unittest import mock
+from django.contrib.auth.models import User
+from django.core.cache import cache, caches
+from django.test import TestCase
+from .models import Event, Poll, PollOption, Question
+from . import services
+
+
+class FragmentCacheTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        caches['template_fragments'].clear()
+        self.creator = User.objects.create_user(username='creator', password='testpass123')
+        self.viewer = User.objects.create_user(username='viewer', password='testpass123')
+        self.event = Event.objects.create(title='Cached', creator=self.creator)
+        self.questions = [
+            Question.objects.create(event=self.event, author=self.creator, text=f'Question {i}')
+            for i in range(20)
+        ]
+        self.poll = Poll.objects.create(event=self.event, question='Pick one')
+        self.option = PollOption.objects.create(poll=self.poll, text='A')
+        self.url = f'/events/{self.event.code}/'
+
+    def rendered_fragments(self, client, url=None):
+        """Render a page and return how many fragments missed the cache"""
+        fragments = caches['template_fragments']
+        with mock.patch.object(fragments, 'set', wraps=fragments.set) as cache_set:
+            response = client.get(url or self.url)
+        self.assertEqual(response.status_code, 200)
+        return sum(1 for call in cache_set.call_args_list if call.args[0].startswith('template.cache.'))
+
+    def test_one_like_rerenders_one_card(self):
+        self.client.force_login(self.viewer)
+        self.assertEqual(self.rendered_fragments(self.client), 21)  # 20 cards + 1 poll block
+        self.assertEqual(self.rendered_fragments(self.client), 0)
+
+        services.toggle_question_like(self.creator, self.questions[5])
+        self.assertEqual(self.rendered_fragments(self.client), 1)
+
+    def test_cards_show_the_viewers_like_state(self):
+        services.toggle_question_like(self.viewer, self.questions[0])
+        self.client.force_login(self.viewer)
+        self.assertContains(self.client.get(self.url), 'Liked', count=1)
+
+        self.client.force_login(self.creator)
+        response = self.client.get(self.url)
+        self.assertNotContains(response, '>Liked<')
+        self.assertContains(response, 'delete/')
+
+    def test_deleting_and_voting_invalidate_fragments(self):
+        self.client.force_login(self.viewer)
+        self.rendered_fragments(self.client)
+
+        services.delete_question(self.questions[0])
+        self.assertEqual(self.rendered_fragments(self.client), 19)
+
+        services.vote_in_poll(self.viewer, self.option)
+        self.assertEqual(self.rendered_fragments(self.client), 1)
+
+    def test_anonymous_cards_are_cached(self):
+        url = f'/events/anonymous/{self.event.code}/'
+        self.assertEqual(self.rendered_fragments(self.client, url), 20)
+        self.assertEqual(self.rendered_fragments(self.client, url), 0)
+
+    def test_versions_never_go_back_after_eviction(self):
+        version = services.get_cache_version('poll_results', self.poll.pk)
+        self.assertEqual(services.bump_cache_version('poll_results', self.poll.pk), version + 1)
+        self.assertEqual(services.get_cache_versions('poll_results', [self.poll.pk]), {self.poll.pk: version + 1})
+        cache.clear()
+        self.assertGreater(services.get_cache_version('poll_results', self.poll.pk), version + 1)
@@ -0,0 +1,74 @@
+import gzip
+import unittest
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+from .middleware.compression_middleware import brotli
+from .models import Event, Question
+from . import services
+
+
+class CompressionAndConditionalGetTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.creator = User.objects.create_user(username='creator', password='testpass123')
+        self.viewer = User.objects.create_user(username='viewer', password='testpass123')
+        self.event = Event.objects.create(title='Compressed', creator=self.creator)
+        self.question = Question.objects.create(event=self.event, author=self.creator, text='Will it compress?')
+        self.url = f'/events/{self.event.code}/'
+        self.client.force_login(self.viewer)
+
+    def test_event_page_is_gzipped(self):
+        response = self.client.get(self.url, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertIn(b'Will it compress?', gzip.decompress(response.content))
+        self.assertTrue(response['ETag'].startswith('W/"'))
+
+        plain = self.client.get(self.url)
+        self.assertNotIn('Content-Encoding', plain)
+        self.assertLess(len(response.content), len(plain.content) / 2)
+
+    def test_small_responses_are_not_compressed(self):
+        response = self.client.get(f'/events/{self.event.code}/question/999/merge/', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertNotIn('Content-Encoding', response)
+
+    def test_streaming_export_is_compressed(self):
+        self.client.force_login(self.creator)
+        response = self.client.get(f'/events/{self.event.code}/export/?format=csv', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn(b'Will it compress?', gzip.decompress(b''.join(response.streaming_content)))
+
+    @unittest.skipIf(brotli is None, "brotli is not installed")
+    def test_brotli_is_preferred_when_accepted(self):
+        response = self.client.get(self.url, HTTP_ACCEPT_ENCODING='gzip, br')
+        self.assertEqual(response['Content-Encoding'], 'br')
+        self.assertIn(b'Will it compress?', brotli.decompress(response.content))
+
+    def test_unchanged_event_page_returns_304(self):
+        first = self.client.get(self.url)
+        etag = first['ETag']
+        self.assertIn('no-cache', first['Cache-Control'])
+
+        unchanged = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(unchanged.status_code, 304)
+        self.assertEqual(unchanged.content, b'')
+
+        services.toggle_question_like(self.creator, self.question)
+        changed = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(changed.status_code, 200)
+        self.assertNotEqual(changed['ETag'], etag)
+
+    def test_etag_depends_on_viewer_and_query(self):
+        etag = self.client.get(self.url)['ETag']
+        self.assertNotEqual(self.client.get(self.url, {'q': 'compress'})['ETag'], etag)
+        self.client.force_login(self.creator)
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_anonymous_page_supports_conditional_get(self):
+        self.client.logout()
+        url = f'/events/anonymous/{self.event.code}/'
+        etag = self.client.get(url)['ETag']
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        services.add_anonymous_question(self.event, 'Guest', 'Another one?')
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
@@ -0,0 +1,94 @@
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connections, transaction
+from django.test import SimpleTestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from core.db_router import ReplicaRouter, begin_routing, end_routing, use_primary
+from .models import Event, Question
+from . import services
+
+
+class ReplicaRouterTestCase(SimpleTestCase):
+    def setUp(self):
+        self.router = ReplicaRouter()
+
+    def test_reads_go_to_a_replica(self):
+        self.assertEqual(self.router.db_for_read(Question), 'replica')
+
+    def test_writes_go_to_the_primary(self):
+        self.assertEqual(self.router.db_for_write(Question), 'default')
+
+    def test_pinned_reads_go_to_the_primary(self):
+        with use_primary():
+            self.assertEqual(self.router.db_for_read(Question), 'default')
+
+    def test_reads_after_a_write_go_to_the_primary(self):
+        state, token = begin_routing()
+        try:
+            self.assertEqual(self.router.db_for_read(Question), 'replica')
+            self.router.db_for_write(Question)
+            self.assertTrue(state.wrote)
+            self.assertEqual(self.router.db_for_read(Question), 'default')
+        finally:
+            end_routing(token)
+
+    @override_settings(DATABASE_REPLICAS=[])
+    def test_no_replicas_leaves_routing_to_django(self):
+        self.assertIsNone(self.router.db_for_read(Question))
+
+    def test_replicas_are_never_migrated(self):
+        self.assertFalse(self.router.allow_migrate('replica', 'events'))
+        self.assertTrue(self.router.allow_migrate('default', 'events'))
+
+
+class ReplicaRoutingTestCase(TransactionTestCase):
+    databases = '__all__'
+
+    def setUp(self):
+        cache.clear()
+        self.creator = User.objects.create_user(username='creator', password='testpass123')
+        self.viewer = User.objects.create_user(username='viewer', password='testpass123')
+        self.event = Event.objects.create(title='Replicated', creator=self.creator)
+        self.question = Question.objects.create(event=self.event, author=self.creator, text='Read me?')
+        self.url = f'/events/{self.event.code}/'
+
+    def test_question_list_is_read_from_the_replica(self):
+        with CaptureQueriesContext(connections['replica']) as replica_queries:
+            questions = list(services.get_event_questions(self.event, self.viewer))
+        self.assertEqual([q.id for q in questions], [self.question.id])
+        self.assertTrue(replica_queries.captured_queries)
+
+    def test_reads_inside_a_transaction_use_the_primary(self):
+        with transaction.atomic(), CaptureQueriesContext(connections['replica']) as replica_queries:
+            list(services.get_event_questions(self.event, self.viewer))
+        self.assertFalse(replica_queries.captured_queries)
+
+    def test_a_write_pins_the_client_to_the_primary(self):
+        self.client.force_login(self.viewer)
+        response = self.client.get(self.url)
+        self.assertNotIn(settings.REPLICA_PIN_COOKIE, response.cookies)
+
+        response = self.client.post(f'/events/question/{self.question.id}/like/')
+        cookie = response.cookies[settings.REPLICA_PIN_COOKIE]
+        self.assertEqual(cookie['max-age'], settings.REPLICA_PIN_SECONDS)
+
+        with CaptureQueriesContext(connections['replica']) as replica_queries:
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(replica_queries.captured_queries)
+
+    def test_event_page_etag_follows_changes_while_replicas_may_lag(self):
+        self.client.force_login(self.viewer)
+        etag = self.client.get(self.url)['ETag']
+        services.toggle_question_like(self.creator, self.question)
+
+        # A replica may still be behind: the page is tagged with what was read
+        # before rendering, so a lagging rendering is never mistaken for a settled one
+        response = self.client.get(self.url)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+        with override_settings(REPLICA_PIN_SECONDS=0):
+            settled = self.client.get(self.url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(settled.status_code, 200)
+        self.assertNotEqual(settled['ETag'], response['ETag'])
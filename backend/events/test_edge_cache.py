@@ -0,0 +1,200 @@
+import threading
+import time
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.contrib.messages.storage.cookie import CookieStorage
+from django.test import Client, TestCase, override_settings
+from django.utils.cache import get_max_age
+from .edge_cache import event_page_changed, purge_edge_caches, purge_queue, surrogate_key
+from .models import Event, Question
+from . import services
+
+
+class CachingProxy:
+    """
+    Stand-in for a reverse proxy/CDN in front of the test client. It keeps
+    GET responses marked public with s-maxage, refuses responses that set a
+    cookie or vary on Cookie, passes requests bringing flash messages to the
+    origin and drops entries by Surrogate-Key when event_page_changed fires.
+    """
+
+    def __init__(self, client):
+        self.client = client
+        self.store = {}
+        self.hits = self.misses = 0
+
+    def get(self, path):
+        flashed = self.client.cookies.get(CookieStorage.cookie_name)
+        if flashed is not None and flashed.value:
+            return self.client.get(path)
+        entry = self.store.get(path)
+        if entry is not None and entry[0] > time.monotonic():
+            self.hits += 1
+            return entry[1]
+        self.misses += 1
+        response = self.client.get(path)
+        if self.is_storable(response):
+            s_maxage = int(dict(
+                part.strip().split('=') for part in response['Cache-Control'].split(',') if '=' in part
+            )['s-maxage'])
+            self.store[path] = (time.monotonic() + s_maxage, response)
+        return response
+
+    @staticmethod
+    def is_storable(response):
+        cache_control = response.get('Cache-Control', '')
+        return (
+            response.status_code in (200, 404)
+            and 'public' in cache_control and 's-maxage' in cache_control
+            and not response.cookies
+            and 'cookie' not in response.get('Vary', '').lower()
+        )
+
+    def purge(self, sender, event_id, **kwargs):
+        key = surrogate_key(event_id)
+        self.store = {path: entry for path, entry in self.store.items() if entry[1].get('Surrogate-Key') != key}
+
+
+@override_settings(REPLICA_PIN_SECONDS=0)
+class EdgeCacheTestCase(TestCase):
+    def setUp(self):
+        self.creator = User.objects.create_user(username='creator', password='testpass123')
+        self.event = Event.objects.create(title='Town hall', creator=self.creator)
+        services.add_anonymous_question(self.event, 'Ana', 'Is the office moving?')
+        self.url = f'/events/anonymous/{self.event.code}/'
+        self.form_url = f'/events/anonymous/{self.event.code}/add_question/'
+        self.client = Client(enforce_csrf_checks=True)
+        self.proxy = CachingProxy(self.client)
+        event_page_changed.connect(self.proxy.purge)
+        self.addCleanup(event_page_changed.disconnect, self.proxy.purge)
+
+    def test_anonymous_page_is_public_and_cookie_free(self):
+        first = self.proxy.get(self.url)
+        second = self.proxy.get(self.url)
+        self.assertContains(first, 'Is the office moving?')
+        self.assertIs(second, first)
+        self.assertEqual((self.proxy.misses, self.proxy.hits), (1, 1))
+
+        self.assertEqual(dict(first.cookies), {})
+        self.assertNotIn('Cookie', first.get('Vary', ''))
+        self.assertIn('public', first['Cache-Control'])
+        self.assertEqual(get_max_age(first), 0)
+        self.assertEqual(first['Surrogate-Key'], surrogate_key(self.event.pk))
+        # Signed-in visitors get the same page
+        self.client.force_login(self.creator)
+        response = self.client.get(self.url)
+        self.assertNotIn('Cookie', response.get('Vary', ''))
+        self.assertNotContains(response, 'Hi, creator')
+
+    def test_changes_purge_the_page(self):
+        self.proxy.get(self.url)
+        other = self.proxy.get(f'{self.url}?sort=hot')
+        with self.captureOnCommitCallbacks(execute=True):
+            services.add_anonymous_question(self.event, 'Bo', 'When is the next all-hands?')
+        self.assertEqual(self.proxy.store, {})
+
+        self.assertContains(self.proxy.get(self.url), 'When is the next all-hands?')
+        self.assertContains(self.proxy.get(f'{self.url}?sort=hot'), 'When is the next all-hands?')
+        self.assertNotContains(other, 'When is the next all-hands?')
+        self.assertEqual(self.proxy.misses, 4)
+
+    @override_settings(REPLICA_PIN_SECONDS=5)
+    def test_page_is_cached_briefly_while_replicas_may_lag(self):
+        services.add_anonymous_question(self.event, 'Bo', 'Parking?')
+        with mock.patch('events.services.cache_services.reads_from_primary', return_value=False):
+            response = self.proxy.get(self.url)
+        self.assertIn('public', response['Cache-Control'])
+        self.assertIn('s-maxage=5', response['Cache-Control'])
+
+    def test_question_form_works_without_csrf_cookie(self):
+        form_page = self.proxy.get(self.form_url)
+        self.assertEqual(dict(form_page.cookies), {})
+        self.assertIs(self.proxy.get(self.form_url), form_page)
+        token = form_page.context['form_token']
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(self.form_url, {'username': '', 'text': 'Is lunch provided?', 'form_token': token})
+        self.assertRedirects(response, self.url, fetch_redirect_response=False)
+        self.assertTrue(Question.objects.filter(text='Is lunch provided?').exists())
+
+    def test_forged_or_foreign_form_tokens_are_refused(self):
+        other = Event.objects.create(title='Other', creator=self.creator)
+        for token in ('', 'forged', services.make_question_form_token(other.code)):
+            response = self.client.post(self.form_url, {'text': 'Sneaky?', 'form_token': token})
+            self.assertContains(response, 'This form has expired')
+            self.assertIn('private', response['Cache-Control'])
+        self.assertFalse(Question.objects.filter(text='Sneaky?').exists())
+
+    def test_flash_messages_bypass_the_shared_cache(self):
+        self.proxy.get(self.url)
+        with mock.patch('events.views.question_views.add_anonymous_question') as add:
+            add.return_value = mock.Mock(status=Question.Status.PENDING, duplicate_of=None)
+            token = services.make_question_form_token(self.event.code)
+            self.client.post(self.form_url, {'text': 'Held back?', 'form_token': token})
+
+        response = self.proxy.get(self.url)
+        self.assertContains(response, 'once a moderator approves it')
+        self.assertIn('private', response['Cache-Control'])
+        self.assertEqual(self.proxy.hits, 0)
+        # The message is shown once; afterwards the shared copy is served again
+        self.assertEqual(self.proxy.get(self.url).status_code, 200)
+        self.assertEqual(self.proxy.hits, 1)
+
+    def test_closed_event_page_is_cached_briefly(self):
+        self.event.is_closed = True
+        self.event.save()
+        for response in (self.proxy.get(self.url), self.proxy.get(self.form_url)):
+            self.assertEqual(response.status_code, 404)
+            self.assertEqual(dict(response.cookies), {})
+            self.assertIn('public', response['Cache-Control'])
+            self.assertIn('s-maxage=10', response['Cache-Control'])
+
+        response = self.client.post(self.form_url, {'text': 'Too late?'})
+        self.assertEqual(response.status_code, 404)
+        self.assertIn('private', response['Cache-Control'])
+
+
+@override_settings(EDGE_CACHE={'PURGE_URLS': ['http://cache-1:6081/', 'http://cache-2:6081/'], 'PURGE_INTERVAL': 0.2})
+class PurgeTestCase(TestCase):
+    def test_purge_requests_carry_the_surrogate_key(self):
+        with mock.patch('events.edge_cache.urllib.request.urlopen', side_effect=[mock.Mock(), OSError('refused')]) as urlopen:
+            with self.assertLogs('events.edge_cache', 'WARNING'):
+                purge_edge_caches(None, event_id=7)
+                self.assertTrue(purge_queue.join(timeout=5))
+        requests = [call.args[0] for call in urlopen.call_args_list]
+        self.assertEqual([request.full_url for request in requests], ['http://cache-1:6081/', 'http://cache-2:6081/'])
+        self.assertEqual({request.get_method() for request in requests}, {'PURGE'})
+        self.assertEqual(requests[0].get_header('Surrogate-key'), surrogate_key(7))
+
+    def test_purges_are_sent_off_the_request_thread_and_coalesced(self):
+        threads = []
+        with mock.patch('events.edge_cache.send_purges', side_effect=lambda event_id, config: threads.append(
+            (event_id, threading.current_thread())
+        )):
+            for _ in range(20):
+                purge_edge_caches(None, event_id=7)
+            purge_edge_caches(None, event_id=8)
+            self.assertTrue(purge_queue.join(timeout=5))
+            self.assertEqual(sorted(event_id for event_id, _ in threads), [7, 8])
+            self.assertNotIn(threading.current_thread(), [thread for _, thread in threads])
+
+            # A change right after a purge is purged again once the interval has passed
+            started = time.monotonic()
+            purge_edge_caches(None, event_id=7)
+            self.assertTrue(purge_queue.join(timeout=5))
+        self.assertEqual(len(threads), 3)
+        self.assertGreater(time.monotonic() - started, 0.1)
+
+    def test_purge_waits_for_commit(self):
+        creator = User.objects.create_user(username='creator', password='testpass123')
+        event = Event.objects.create(title='Town hall', creator=creator)
+        receiver = mock.Mock()
+        event_page_changed.connect(receiver)
+        self.addCleanup(event_page_changed.disconnect, receiver)
+        with self.captureOnCommitCallbacks() as callbacks:
+            services.add_anonymous_question(event, '', 'Question?')
+        receiver.assert_not_called()
+        for callback in callbacks:
+            callback()
+        receiver.assert_called_once_with(signal=event_page_changed, sender=None, event_id=event.pk)
@@ -0,0 +1,59 @@
+import json
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.contrib.auth.models import User
+from .models import Event, Question, Poll, PollOption, PollVote
+from . import services
+
+
+class ExportServicesTestCase(TestCase):
+    def setUp(self):
+        self.creator = User.objects.create_user(username='creator', password='testpass123')
+        self.attendee = User.objects.create_user(username='attendee', password='testpass123')
+        self.event = Event.objects.create(title='Export Event', creator=self.creator)
+        self.question = Question.objects.create(event=self.event, author=self.attendee, text='Why, "really"?')
+        self.question.likes.add(self.creator, self.attendee)
+        self.poll = Poll.objects.create(event=self.event, question='Best option?')
+        self.option = PollOption.objects.create(poll=self.poll, text='A')
+        PollVote.objects.create(user=self.attendee, poll_option=self.option)
+
+    def test_jsonl_export_contains_every_record_type(self):
+        chunks = services.stream_event_export(self.event, 'jsonl', chunk_size=1)
+        records = [json.loads(line) for line in ''.join(chunks).splitlines()]
+
+        by_type = {}
+        for record in records:
+            by_type.setdefault(record['record'], []).append(record)
+        self.assertEqual(by_type['question'][0]['count'], 2)
+        self.assertEqual(len(by_type['like']), 2)
+        self.assertEqual(by_type['poll_option'][0]['count'], 1)
+        self.assertEqual(by_type['poll_vote'][0]['user_id'], self.attendee.id)
+
+    def test_csv_export_has_header_and_quotes_text(self):
+        content = ''.join(services.stream_event_export(self.event, 'csv'))
+        lines = content.splitlines()
+        self.assertEqual(lines[0], ','.join(services.EXPORT_COLUMNS))
+        self.assertIn('"Why, ""really""?"', content)
+
+    def test_unknown_format_is_rejected(self):
+        with self.assertRaises(ValueError):
+            services.stream_event_export(self.event, 'xml')
+
+    def test_export_view_streams_for_creator_only(self):
+        self.client.force_login(self.attendee)
+        response = self.client.get(f'/events/{self.event.code}/export/')
+        self.assertEqual(response.status_code, 403)
+
+        self.client.force_login(self.creator)
+        response = self.client.get(f'/events/{self.event.code}/export/?format=jsonl')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        body = b''.join(response.streaming_content).decode()
+        self.assertIn('"record": "poll_vote"', body)
+
+    def test_export_command_writes_to_stdout(self):
+        out = StringIO()
+        call_command('export_event', self.event.code, '--format', 'csv', stdout=out)
+        self.assertIn('poll_option', out.getvalue())
@@ -0,0 +1,94 @@
+import os
+import tempfile
+
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from .forms import AnonymousQuestionForm
+from .models import Event, Question
+from .services.filter_services import ContentFilter
+from . import services
+
+
+class ContentFilterTestCase(TestCase):
+    def setUp(self):
+        self.filter = ContentFilter(
+            words=['casino', 'Free Bitcoin'],
+            patterns=[r'https?://\S+', r'(.)\1{9,}'],
+        )
+
+    def test_words_and_phrases_match_whole_tokens(self):
+        self.assertEqual(self.filter.check('Best CASINO in town?').reason, 'word: casino')
+        self.assertEqual(self.filter.check('get free bitcoin now').reason, 'phrase: free bitcoin')
+        self.assertFalse(self.filter.check('Is the casinos talk recorded?').flagged)
+        self.assertFalse(self.filter.check('Free as in bitcoin').flagged)
+
+    def test_combined_regex_reports_matching_pattern(self):
+        self.assertEqual(self.filter.check('see http://spam.example').reason, r'pattern: https?://\S+')
+        self.assertTrue(self.filter.check('heyyyyyyyyyyyyy').flagged)
+        self.assertFalse(self.filter.check('What about latency?').flagged)
+
+    def test_inline_flag_patterns_keep_their_own_regex(self):
+        with self.assertLogs('events.services.filter_services', 'ERROR') as logs:
+            content_filter = ContentFilter(words=['casino'], patterns=['(?i)spam', 'bad', '[unclosed'])
+        self.assertEqual(len(logs.records), 1)
+        self.assertEqual(content_filter.check('SPAM here').reason, 'pattern: (?i)spam')
+        self.assertEqual(content_filter.check('too bad').reason, 'pattern: bad')
+        self.assertEqual(content_filter.check('casino night').reason, 'word: casino')
+
+
+class FilterReloadTestCase(TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.words = os.path.join(self.tmpdir.name, 'words.txt')
+        with open(self.words, 'w') as fh:
+            fh.write('# comment\nspamword\n')
+        self.settings_override = override_settings(CONTENT_FILTER={
+            'WORD_LIST': self.words, 'PATTERN_LIST': None, 'RELOAD_INTERVAL': 0,
+        })
+        self.settings_override.enable()
+        services.reset_content_filter()
+
+    def tearDown(self):
+        self.settings_override.disable()
+        services.reset_content_filter()
+        self.tmpdir.cleanup()
+
+    def test_list_changes_are_picked_up(self):
+        self.assertTrue(services.check_question_content('spamword here').flagged)
+        with open(self.words, 'w') as fh:
+            fh.write('otherword\n')
+        os.utime(self.words, ns=(0, 10 ** 18))
+
+        self.assertFalse(services.check_question_content('spamword here').flagged)
+        self.assertTrue(services.check_question_content('otherword here').flagged)
+
+    def test_malformed_pattern_is_skipped(self):
+        patterns = os.path.join(self.tmpdir.name, 'patterns.txt')
+        with open(patterns, 'w') as fh:
+            fh.write('unbalanced(\nfree\\s+money\n')
+        with override_settings(CONTENT_FILTER={
+            'WORD_LIST': self.words, 'PATTERN_LIST': patterns, 'RELOAD_INTERVAL': 0,
+        }):
+            with self.assertLogs('events.services.filter_services', 'ERROR') as logs:
+                self.assertTrue(services.check_question_content('free  money').flagged)
+                self.assertTrue(services.check_question_content('spamword here').flagged)
+            self.assertEqual(len(logs.records), 1)
+            self.assertIn('unbalanced(', logs.output[0])
+
+    def test_flagged_anonymous_question_is_stored_and_held(self):
+        creator = User.objects.create_user(username='creator', password='testpass123')
+        event = Event.objects.create(title='Filtered', creator=creator)
+
+        form = AnonymousQuestionForm(data={
+            'username': '', 'text': 'Buy spamword today',
+            'form_token': services.make_question_form_token(event.code),
+        }, event_code=event.code)
+        self.assertTrue(form.is_valid())
+        question = services.add_anonymous_question(
+            event, '', form.cleaned_data['text'], flag_reason=form.content_flag.reason
+        )
+
+        question = Question.objects.get(id=question.id)
+        self.assertTrue(question.is_flagged)
+        self.assertEqual(question.flag_reason, 'word: spamword')
+        self.assertEqual(question.status, Question.Status.PENDING)
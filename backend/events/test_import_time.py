@@ -0,0 +1,49 @@
+import os
+import re
+import subprocess
+import sys
+
+from django.conf import settings
+from django.test import SimpleTestCase, tag
+
+# What a worker imports before serving its first request
+STARTUP_SCRIPT = (
+    "import django; django.setup(); "
+    "from django.urls import get_resolver; get_resolver().url_patterns"
+)
+# Only loaded on the paths that use them (avatar resizing, QR rendering)
+LAZY_MODULES = ('PIL', 'qrcode')
+# Self time of the project's own modules; generous, as it includes compiling them without .pyc files
+IMPORT_TIME_BUDGET_MS = 250
+
+IMPORTTIME_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$')
+
+
+def profile_startup_imports():
+    """(module, self microseconds) for each module imported at startup, from python -X importtime"""
+    env = dict(os.environ, DJANGO_SETTINGS_MODULE=os.environ.get('DJANGO_SETTINGS_MODULE', 'core.test_settings'))
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', STARTUP_SCRIPT],
+        cwd=settings.BASE_DIR, env=env, capture_output=True, text=True, check=True,
+    )
+    return [
+        (match.group(4), int(match.group(1)))
+        for match in map(IMPORTTIME_LINE.match, result.stderr.splitlines()) if match
+    ]
+
+
+class StartupImportTestCase(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.imports = profile_startup_imports()
+
+    def test_imaging_libraries_load_lazily(self):
+        modules = {module.split('.')[0] for module, _ in self.imports}
+        for module in LAZY_MODULES:
+            self.assertNotIn(module, modules)
+
+    @tag('benchmark')  # wall-clock, so only run with the benchmarks
+    def test_project_import_time_budget(self):
+        own = sum(us for module, us in self.imports if module.split('.')[0] in ('core', 'events'))
+        self.assertLess(own / 1000, IMPORT_TIME_BUDGET_MS)
@@ -0,0 +1,53 @@
+import threading
+
+from django.contrib.auth.models import User
+from django.test import SimpleTestCase, TestCase, override_settings
+from .models import Event
+from . import metrics
+
+
+class MetricsRegistryTestCase(SimpleTestCase):
+    def setUp(self):
+        metrics.reset()
+
+    def test_thread_shards_are_merged_on_render(self):
+        labels = (('view', 'demo'),)
+
+        def work():
+            for _ in range(100):
+                metrics.observe('liteslido_request_duration_seconds', labels, 0.02)
+                metrics.increment('liteslido_requests_total', labels + (('status', 200),))
+
+        threads = [threading.Thread(target=work) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        output = metrics.render_prometheus()
+        self.assertIn('liteslido_requests_total{view="demo",status="200"} 400', output)
+        self.assertIn('liteslido_request_duration_seconds_bucket{view="demo",le="0.01"} 0', output)
+        self.assertIn('liteslido_request_duration_seconds_bucket{view="demo",le="0.025"} 400', output)
+        self.assertIn('liteslido_request_duration_seconds_count{view="demo"} 400', output)
+
+
+class MetricsMiddlewareTestCase(TestCase):
+    def setUp(self):
+        metrics.reset()
+        self.user = User.objects.create_user(username='creator', password='testpass123')
+        self.event = Event.objects.create(title='Metrics', creator=self.user)
+
+    def test_view_metrics_are_exposed(self):
+        self.client.force_login(self.user)
+        self.client.get(f'/events/{self.event.code}/')
+
+        output = self.client.get('/metrics').content.decode()
+        self.assertIn('liteslido_requests_total{view="event_detail",status="200"} 1', output)
+        self.assertIn('liteslido_db_queries_per_request_count{view="event_detail"} 1', output)
+        self.assertIn('liteslido_template_render_seconds_count{view="event_detail"} 1', output)
+        self.assertIn('liteslido_response_size_bytes_sum{view="event_detail"}', output)
+        self.assertNotIn('liteslido_db_queries_per_request_bucket{view="event_detail",le="1"} 1', output)
+
+    @override_settings(METRICS_ALLOWED_IPS=['10.0.0.1'])
+    def test_metrics_endpoint_is_restricted(self):
+        self.assertEqual(self.client.get('/metrics').status_code, 403)
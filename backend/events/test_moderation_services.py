@@ -0,0 +1,57 @@
+from django.contrib.auth.models import User
+from django.test import TestCase
+from .models import Event, Question
+from . import services
+
+
+class ModerationServicesTestCase(TestCase):
+    def setUp(self):
+        self.creator = User.objects.create_user(username='creator', password='testpass123')
+        self.event = Event.objects.create(title='Moderated', creator=self.creator, moderation_enabled=True)
+
+    def test_questions_are_held_when_moderation_is_enabled(self):
+        held = services.add_anonymous_question(self.event, 'Guest', 'Held for review?')
+        self.assertEqual(held.status, Question.Status.PENDING)
+        self.assertNotIn(held, services.get_event_questions(self.event))
+
+        services.toggle_event_moderation(self.event)
+        published = services.add_question_to_event(self.event, 'Published directly?', author=self.creator)
+        self.assertEqual(published.status, Question.Status.APPROVED)
+
+    def test_keyset_pagination_walks_the_whole_queue(self):
+        Question.objects.bulk_create([
+            Question(event=self.event, text=f'Pending {i}', status=Question.Status.PENDING)
+            for i in range(7)
+        ])
+        seen, after_id = [], None
+        while True:
+            page, after_id = services.get_moderation_queue(self.event, after_id=after_id, limit=3)
+            seen.extend(q.text for q in page)
+            if after_id is None:
+                break
+        self.assertEqual(seen, [f'Pending {i}' for i in range(7)])
+
+    def test_bulk_actions_only_touch_the_event(self):
+        other_event = Event.objects.create(title='Other', creator=self.creator)
+        mine = [Question.objects.create(event=self.event, text=f'Q{i}', status=Question.Status.PENDING) for i in range(3)]
+        foreign = Question.objects.create(event=other_event, text='Foreign', status=Question.Status.PENDING)
+        ids = [q.id for q in mine] + [foreign.id]
+
+        self.assertEqual(services.bulk_moderate_questions(self.event, ids[:2], 'approve'), 2)
+        self.assertEqual(services.bulk_moderate_questions(self.event, ids, 'delete'), 3)
+        foreign.refresh_from_db()
+        self.assertEqual(foreign.status, Question.Status.PENDING)
+        with self.assertRaises(ValueError):
+            services.bulk_moderate_questions(self.event, ids, 'publish')
+
+    def test_moderation_view_applies_bulk_action(self):
+        pending = [Question.objects.create(event=self.event, text=f'Q{i}', status=Question.Status.PENDING) for i in range(2)]
+        self.client.force_login(self.creator)
+        response = self.client.get(f'/events/{self.event.code}/moderation/')
+        self.assertContains(response, 'Q1')
+
+        self.client.post(
+            f'/events/{self.event.code}/moderation/',
+            {'action': 'reject', 'question_ids': [q.id for q in pending]},
+        )
+        self.assertEqual(Question.objects.filter(status=Question.Status.REJECTED).count(), 2)
@@ -0,0 +1,228 @@
+"""
+Multi-worker integration harness: several runserver processes sharing one
+database and one cache, behind a round-robin load balancer stand-in.
+Run with: python manage.py test events.test_multiworker --tag=integration
+"""
+import http.client
+import itertools
+import os
+import re
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.cookies import SimpleCookie
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import urlencode
+
+from django.test import SimpleTestCase, tag
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+WORKERS = 3
+HOP_BY_HOP = {'connection', 'keep-alive', 'transfer-encoding', 'content-length'}
+
+FIXTURE = """
+from django.contrib.auth.models import User
+from events.models import Event, Question, Poll, PollOption
+creator = User.objects.create_user('creator', password='pass12345')
+User.objects.create_user('alice', password='pass12345')
+User.objects.create_user('bob', password='pass12345')
+event = Event.objects.create(title='Scale-out', creator=creator)
+question = Question.objects.create(event=event, author=creator, text='Shared question?')
+poll = Poll.objects.create(event=event, question='Shared poll?')
+option = PollOption.objects.create(poll=poll, text='Yes')
+print(event.code, question.id, poll.id, option.id)
+"""
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+class RoundRobinBalancer(ThreadingHTTPServer):
+    """Forward each request to the next worker, without session affinity"""
+
+    daemon_threads = True
+
+    def __init__(self, worker_ports):
+        self.workers = itertools.cycle(worker_ports)
+        self.lock = threading.Lock()
+        super().__init__(('127.0.0.1', 0), BalancerHandler)
+
+    def next_worker(self):
+        with self.lock:
+            return next(self.workers)
+
+
+class BalancerHandler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def forward(self):
+        port = self.server.next_worker()
+        body = self.rfile.read(int(self.headers.get('Content-Length') or 0))
+        connection = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+        headers = {key: value for key, value in self.headers.items() if key.lower() not in HOP_BY_HOP}
+        connection.request(self.command, self.path, body=body or None, headers=headers)
+        response = connection.getresponse()
+        payload = response.read()
+        self.send_response(response.status)
+        for key, value in response.getheaders():
+            if key.lower() not in HOP_BY_HOP:
+                self.send_header(key, value)
+        self.send_header('X-Worker', str(port))
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+        connection.close()
+
+    do_GET = do_POST = forward
+
+
+class Browser:
+    """Minimal cookie-keeping HTTP client that talks to the balancer"""
+
+    def __init__(self, port):
+        self.port = port
+        self.cookies = SimpleCookie()
+
+    def request(self, method, path, data=None, headers=None):
+        headers = dict(headers or {})
+        if self.cookies:
+            headers['Cookie'] = '; '.join(f'{key}={morsel.value}' for key, morsel in self.cookies.items())
+        body = None
+        if data is not None:
+            body = urlencode(data)
+            headers['Content-Type'] = 'application/x-www-form-urlencoded'
+            headers['X-CSRFToken'] = self.cookies['csrftoken'].value
+        connection = http.client.HTTPConnection('127.0.0.1', self.port, timeout=30)
+        connection.request(method, path, body=body, headers=headers)
+        response = connection.getresponse()
+        content = response.read().decode()
+        for value in response.headers.get_all('Set-Cookie') or ():
+            self.cookies.load(value)
+        connection.close()
+        return response, content
+
+    def login(self, username):
+        self.request('GET', '/accounts/login/')
+        response, _ = self.request('POST', '/accounts/login/', {'username': username, 'password': 'pass12345'})
+        assert response.status == 302, response.status
+
+
+@tag('integration')
+class MultiWorkerTestCase(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.tmp = tempfile.TemporaryDirectory()
+        cls.addClassCleanup(cls.tmp.cleanup)
+        cls.env = {
+            **os.environ,
+            'DJANGO_SETTINGS_MODULE': 'core.integration_settings',
+            'LITESLIDO_INTEGRATION_DB': os.path.join(cls.tmp.name, 'db.sqlite3'),
+            'CACHE_DIR': os.path.join(cls.tmp.name, 'cache'),
+            'DJANGO_DEBUG': 'false',
+            'PYTHONPATH': str(BACKEND_DIR),
+        }
+        cls.manage('migrate', '--noinput')
+        fixture = cls.manage('shell', '-c', FIXTURE).split()
+        cls.event_code, cls.question_id, cls.poll_id, cls.option_id = fixture[-4:]
+
+        cls.worker_ports = [free_port() for _ in range(WORKERS)]
+        cls.workers = [
+            subprocess.Popen(
+                [sys.executable, 'manage.py', 'runserver', f'127.0.0.1:{port}', '--noreload'],
+                cwd=BACKEND_DIR, env=cls.env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+            )
+            for port in cls.worker_ports
+        ]
+        cls.addClassCleanup(cls.stop_workers)
+        for port in cls.worker_ports:
+            cls.wait_for(port)
+
+        cls.balancer = RoundRobinBalancer(cls.worker_ports)
+        threading.Thread(target=cls.balancer.serve_forever, daemon=True).start()
+        cls.addClassCleanup(cls.balancer.shutdown)
+
+    @classmethod
+    def manage(cls, *args):
+        result = subprocess.run(
+            [sys.executable, 'manage.py', *args], cwd=BACKEND_DIR, env=cls.env,
+            capture_output=True, text=True, check=True,
+        )
+        return result.stdout
+
+    @classmethod
+    def wait_for(cls, port, timeout=30):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            try:
+                socket.create_connection(('127.0.0.1', port), timeout=1).close()
+                return
+            except OSError:
+                time.sleep(0.1)
+        raise RuntimeError(f"worker on port {port} did not start")
+
+    @classmethod
+    def stop_workers(cls):
+        for worker in cls.workers:
+            worker.terminate()
+            worker.wait(timeout=10)
+
+    def browser(self):
+        return Browser(self.balancer.server_address[1])
+
+    def test_sessions_work_on_every_worker(self):
+        alice = self.browser()
+        alice.login('alice')
+        seen = set()
+        for _ in range(WORKERS):
+            response, _ = alice.request('GET', '/events/')
+            self.assertEqual(response.status, 200)
+            seen.add(response.headers['X-Worker'])
+        self.assertEqual(len(seen), WORKERS)
+
+    def test_like_on_one_worker_invalidates_etags_on_all(self):
+        alice, bob = self.browser(), self.browser()
+        alice.login('alice')
+        bob.login('bob')
+        url = f'/events/{self.event_code}/'
+        alice.request('GET', url)  # receive the CSRF cookie the ETag depends on
+        etags = {}
+        for _ in range(WORKERS):
+            response, _ = alice.request('GET', url)
+            etags[response.headers['X-Worker']] = response.headers['ETag']
+        self.assertEqual(len(set(etags.values())), 1)
+        etag = etags.popitem()[1]
+
+        for _ in range(WORKERS):
+            response, _ = alice.request('GET', url, headers={'If-None-Match': etag})
+            self.assertEqual(response.status, 304)
+
+        response, _ = bob.request('POST', f'/events/question/{self.question_id}/like/', {})
+        self.assertEqual(response.status, 302)
+        for _ in range(WORKERS):
+            response, content = alice.request('GET', url, headers={'If-None-Match': etag})
+            self.assertEqual(response.status, 200, response.headers['X-Worker'])
+            self.assertRegex(content, r'<span class="font-medium">1</span>')
+
+    def test_vote_on_one_worker_updates_cached_charts_on_all(self):
+        alice, bob = self.browser(), self.browser()
+        alice.login('alice')
+        bob.login('bob')
+        url = f'/events/{self.event_code}/poll/{self.poll_id}/'
+        bob.request('POST', url, {'poll_option': self.option_id})
+        for _ in range(WORKERS):  # every worker renders and caches the one-vote chart
+            _, content = bob.request('GET', url)
+            self.assertIn('aria-label="Poll results: 1 vote"', content)
+
+        alice.request('POST', url, {'poll_option': self.option_id})
+        for _ in range(WORKERS):
+            _, content = bob.request('GET', url)
+            self.assertTrue(re.search(r'aria-label="Poll results: 2 votes"', content))
@@ -0,0 +1,150 @@
+import time
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import OperationalError
+from django.test import Client, TestCase, override_settings
+from .models import Event
+from .overload import LoadMonitor, get_config, monitor, parse_request_start
+from . import metrics, services
+
+ENABLED = {**settings.OVERLOAD_PROTECTION, 'ENABLED': True}
+
+
+class LoadMonitorTestCase(TestCase):
+    def test_request_start_header_units(self):
+        self.assertEqual(parse_request_start('t=1700000000.5'), 1700000000.5)
+        self.assertEqual(parse_request_start('1700000000500'), 1700000000.5)
+        self.assertEqual(parse_request_start('t=1700000000500000'), 1700000000.5)
+        self.assertIsNone(parse_request_start('soon'))
+        self.assertIsNone(parse_request_start(None))
+
+    def test_overload_reasons(self):
+        config = get_config()
+        load = LoadMonitor()
+        self.assertIsNone(load.overload_reason(config))
+
+        load.db_in_flight = config['MAX_DB_IN_FLIGHT']
+        self.assertEqual(load.overload_reason(config), 'db_in_flight')
+        load.reset()
+
+        for _ in range(50):
+            load.observe_queue_time(config['MAX_QUEUE_TIME'] * 2)
+        self.assertEqual(load.overload_reason(config), 'queue_time')
+        # Averages without recent samples no longer count
+        self.assertIsNone(load.overload_reason({**config, 'SIGNAL_TTL': -1}))
+
+    def test_query_latency_is_averaged(self):
+        config = get_config()
+        load = LoadMonitor()
+
+        def slow_execute(sql, params, many, context):
+            self.assertEqual(load.db_in_flight, 1)
+            return 'rows'
+
+        with mock.patch('events.overload.time.perf_counter', side_effect=[0.0, 2.0] * 50):
+            for _ in range(50):
+                self.assertEqual(load.db_wrapper(slow_execute, 'SELECT 1', (), False, {}), 'rows')
+        self.assertEqual(load.db_in_flight, 0)
+        self.assertGreater(load.db_latency.value, config['MAX_DB_LATENCY'])
+
+
+@override_settings(OVERLOAD_PROTECTION=ENABLED, REPLICA_PIN_SECONDS=0)
+class OverloadMiddlewareTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        metrics.reset()
+        monitor.reset()
+        self.addCleanup(monitor.reset)
+        self.creator = User.objects.create_user(username='creator', password='testpass123')
+        self.event = Event.objects.create(title='Keynote', creator=self.creator)
+        services.add_question_to_event(self.event, 'Is there a recording?')
+        self.anonymous_url = f'/events/anonymous/{self.event.code}/'
+
+    def overloaded(self, reason='db_latency'):
+        return mock.patch.object(monitor, 'overload_reason', return_value=reason)
+
+    def assertCounted(self, name, view, reason):
+        self.assertIn(f'{name}{{view="{view}",reason="{reason}"}} 1', metrics.render_prometheus())
+
+    def test_low_priority_views_are_shed(self):
+        self.client.force_login(self.creator)
+        with self.overloaded():
+            response = self.client.get('/events/profile/')
+            self.assertEqual(response.status_code, 503)
+            self.assertEqual(response['Retry-After'], str(ENABLED['RETRY_AFTER']))
+            self.assertEqual(self.client.get(f'/events/{self.event.code}/').status_code, 200)
+        self.assertEqual(self.client.get('/events/profile/').status_code, 200)
+        self.assertCounted('liteslido_shed_requests_total', 'profile', 'db_latency')
+
+    def test_overloaded_page_is_served_stale_while_one_request_revalidates(self):
+        self.client.get(self.anonymous_url)
+        services.add_question_to_event(self.event, 'Where are the slides?')
+
+        with self.overloaded():
+            fresh = self.client.get(self.anonymous_url)
+            with self.assertNumQueries(0):
+                stale = self.client.get(self.anonymous_url)
+        self.assertNotIn('Warning', fresh)
+        self.assertContains(fresh, 'Where are the slides?')
+        self.assertIn('110', stale['Warning'])
+        self.assertIn('Age', stale)
+        self.assertIn('no-cache', stale['Cache-Control'])
+        # The stale copy is the revalidated one
+        self.assertContains(stale, 'Where are the slides?')
+        self.assertCounted('liteslido_stale_responses_total', 'anonymous_event_detail', 'db_latency')
+
+    def test_page_without_a_copy_renders_fresh_when_overloaded(self):
+        with self.overloaded():
+            response = self.client.get(self.anonymous_url)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('Warning', response)
+
+    def test_missed_deadline_and_database_errors_serve_the_stale_copy(self):
+        self.client.get(self.anonymous_url)
+        with override_settings(OVERLOAD_PROTECTION={**ENABLED, 'FRESH_DEADLINE': -1}):
+            response = self.client.get(self.anonymous_url)
+        self.assertIn('Warning', response)
+        self.assertContains(response, 'Is there a recording?')
+        self.assertCounted('liteslido_stale_responses_total', 'anonymous_event_detail', 'deadline')
+
+        with mock.patch('events.views.event_views.get_event_polls', side_effect=OperationalError('server closed')):
+            response = self.client.get(self.anonymous_url)
+        self.assertIn('Warning', response)
+        self.assertCounted('liteslido_stale_responses_total', 'anonymous_event_detail', 'db_error')
+
+    def test_poll_pages_are_kept_per_user(self):
+        poll = services.create_poll(self.event, 'Lunch?', ['Pizza', 'Salad'])
+        url = f'/events/{self.event.code}/poll/{poll.pk}/'
+        attendee = User.objects.create_user(username='attendee', password='testpass123')
+        self.client.force_login(self.creator)
+        self.client.get(url)
+
+        with override_settings(OVERLOAD_PROTECTION={**ENABLED, 'FRESH_DEADLINE': -1}):
+            self.assertIn('Warning', self.client.get(url))
+            self.client.force_login(attendee)
+            self.assertNotIn('Warning', self.client.get(url))
+
+    def test_renderings_with_a_csrf_token_or_flash_messages_are_not_shared(self):
+        shared = {**ENABLED, 'STALE_VIEWS': {'event_detail': 'shared', 'anonymous_event_detail': 'shared'}}
+        self.client.force_login(self.creator)
+        with override_settings(OVERLOAD_PROTECTION=shared):
+            self.client.get(f'/events/{self.event.code}/')  # its forms carry the CSRF token
+            self.client.logout()
+            self.client.post(f'/events/anonymous/{self.event.code}/add_question/', {
+                'text': 'Is there a recording?', 'form_token': services.make_question_form_token(self.event.code),
+            })
+            self.assertContains(self.client.get(self.anonymous_url), 'A similar question was already asked')
+
+        with override_settings(OVERLOAD_PROTECTION={**shared, 'FRESH_DEADLINE': -1}):
+            anonymous = Client()
+            self.assertNotIn('Warning', anonymous.get(f'/events/{self.event.code}/'))
+            self.assertNotIn('Warning', anonymous.get(self.anonymous_url))
+
+    def test_queue_time_from_the_proxy_header_counts_as_load(self):
+        queued_since = f't={time.time() - 5:.3f}'
+        for _ in range(20):
+            self.client.get('/events/profile/', HTTP_X_REQUEST_START=queued_since)
+        self.assertEqual(monitor.overload_reason(get_config()), 'queue_time')
@@ -0,0 +1,156 @@
+import time
+from unittest import mock
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from .models import Event, Participant, Question
+from . import services
+
+
+class JoinTokenTestCase(TestCase):
+    def setUp(self):
+        self.creator = User.objects.create_user(username='creator', password='testpass123')
+        self.event = Event.objects.create(title='Keynote', creator=self.creator)
+        self.other = Event.objects.create(title='Workshop', creator=self.creator)
+
+    def test_token_resolves_to_its_event(self):
+        token = services.make_join_token(self.event.code)
+        self.assertEqual(services.get_event_for_join_token(token, self.event.code), self.event)
+
+    def test_token_is_scoped_to_one_event(self):
+        token = services.make_join_token(self.event.code)
+        self.assertIsNone(services.get_event_for_join_token(token, self.other.code))
+
+    def test_tampered_token_is_rejected(self):
+        token = services.make_join_token(self.event.code)
+        self.assertIsNone(services.get_event_for_join_token(token[:-1] + 'x', self.event.code))
+        self.assertIsNone(services.get_event_for_join_token('', self.event.code))
+
+    @override_settings(JOIN_TOKEN_MAX_AGE=-1)
+    def test_expired_token_is_rejected(self):
+        token = services.make_join_token(self.event.code)
+        self.assertIsNone(services.get_event_for_join_token(token, self.event.code))
+
+    def test_closed_event_cannot_be_joined(self):
+        token = services.make_join_token(self.event.code)
+        self.event.is_closed = True
+        self.event.save()
+        self.assertIsNone(services.get_event_for_join_token(token, self.event.code))
+
+    def test_participant_has_no_password(self):
+        with mock.patch('django.contrib.auth.hashers.get_hasher') as get_hasher:
+            user = services.create_participant(self.event)
+        get_hasher.assert_not_called()
+        self.assertFalse(user.has_usable_password())
+        self.assertTrue(services.is_participant(user))
+        self.assertEqual(user.participant.event, self.event)
+
+
+class JoinViewTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.creator = User.objects.create_user(username='creator', password='testpass123')
+        self.event = Event.objects.create(title='Keynote', creator=self.creator)
+        self.question = Question.objects.create(event=self.event, author=self.creator, text='Join us?')
+        self.url = f'/events/join/{self.event.code}/'
+        self.token = services.make_join_token(self.event.code)
+
+    def test_join_link_without_token_goes_to_the_anonymous_view(self):
+        response = self.client.get(self.url)
+        self.assertRedirects(response, f'/events/anonymous/{self.event.code}/')
+
+    def test_join_link_with_token_offers_to_join(self):
+        response = self.client.get(self.url, {'t': self.token})
+        self.assertContains(response, 'Join as Guest')
+        self.assertFalse(Participant.objects.exists())
+
+    def test_joining_logs_in_a_participant_who_can_like(self):
+        response = self.client.post(self.url, {'t': self.token})
+        self.assertRedirects(response, f'/events/{self.event.code}/')
+        participant = Participant.objects.get()
+        self.assertEqual(participant.event, self.event)
+
+        self.client.post(f'/events/question/{self.question.id}/like/')
+        self.assertTrue(self.question.likes.filter(pk=participant.user_id).exists())
+
+    def test_joining_again_from_the_same_device_reuses_the_guest(self):
+        self.client.post(self.url, {'t': self.token})
+        self.client.post('/accounts/logout/')
+        response = self.client.post(self.url, {'t': self.token})
+        self.assertRedirects(response, f'/events/{self.event.code}/')
+        self.assertEqual(Participant.objects.count(), 1)
+        self.assertEqual(int(self.client.session['_auth_user_id']), Participant.objects.get().user_id)
+
+    @override_settings(PARTICIPANT_JOIN_LIMIT=2)
+    def test_guest_creation_is_rate_limited_per_address(self):
+        for _ in range(3):
+            response = Client().post(self.url, {'t': self.token})
+        self.assertRedirects(response, f'/events/anonymous/{self.event.code}/', fetch_redirect_response=False)
+        self.assertEqual(Participant.objects.count(), 2)
+
+    @override_settings(PARTICIPANT_JOIN_LIMIT=1, CLIENT_ADDRESS_HEADER='HTTP_X_FORWARDED_FOR', TRUSTED_PROXY_COUNT=1)
+    def test_guest_creation_is_limited_per_client_behind_a_proxy(self):
+        other = Event.objects.create(title='Workshop', creator=self.creator)
+        other_token = services.make_join_token(other.code)
+        # Every request reaches the app from the proxy's address
+        def join(forwarded_for, url=self.url, token=self.token):
+            return Client(REMOTE_ADDR='10.0.0.1').post(url, {'t': token}, HTTP_X_FORWARDED_FOR=forwarded_for)
+
+        self.assertRedirects(join('203.0.113.7'), f'/events/{self.event.code}/', fetch_redirect_response=False)
+        self.assertRedirects(join('198.51.100.2'), f'/events/{self.event.code}/', fetch_redirect_response=False)
+        # A forged address in front of the proxy's entry does not reset the limit
+        self.assertRedirects(join('1.2.3.4, 203.0.113.7'), f'/events/anonymous/{self.event.code}/',
+                             fetch_redirect_response=False)
+        self.assertRedirects(join('203.0.113.7', f'/events/join/{other.code}/', other_token),
+                             f'/events/{other.code}/', fetch_redirect_response=False)
+        self.assertEqual(Participant.objects.count(), 3)
+
+    def test_guests_are_confined_to_their_event(self):
+        other = Event.objects.create(title='Workshop', creator=self.creator)
+        foreign = Question.objects.create(event=other, author=self.creator, text='Elsewhere?')
+        self.client.post(self.url, {'t': self.token})
+
+        self.assertEqual(self.client.get(f'/events/{self.event.code}/').status_code, 200)
+        self.assertEqual(self.client.get(f'/events/{other.code}/').status_code, 403)
+        self.assertEqual(self.client.post(f'/events/question/{foreign.id}/like/').status_code, 403)
+        self.assertFalse(foreign.likes.exists())
+        self.assertRedirects(self.client.post('/events/create/', {'title': 'Mine'}), f'/events/{self.event.code}/')
+        self.assertFalse(Event.objects.filter(title='Mine').exists())
+
+    def test_forged_token_does_not_create_a_participant(self):
+        response = self.client.post(self.url, {'t': 'forged'})
+        self.assertRedirects(response, f'/events/anonymous/{self.event.code}/')
+        self.assertFalse(Participant.objects.exists())
+
+    def test_qr_link_carries_a_join_token(self):
+        self.client.force_login(self.creator)
+        response = self.client.get(f'/events/{self.event.code}/')
+        self.assertIn(f'/events/join/{self.event.code}/?t=', response.context['event_url'])
+
+    def test_creator_page_etag_rolls_over_with_the_join_token(self):
+        self.client.force_login(self.creator)
+        etag = self.client.get(f'/events/{self.event.code}/')['ETag']
+        self.assertEqual(self.client.get(f'/events/{self.event.code}/', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        later = time.time() + settings.JOIN_TOKEN_MAX_AGE
+        with mock.patch('events.views.event_views.time.time', return_value=later):
+            response = self.client.get(f'/events/{self.event.code}/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+
+class PasswordLoginTestCase(TestCase):
+    def test_register_checks_no_password_after_creating_the_user(self):
+        with mock.patch('django.contrib.auth.base_user.check_password') as check_password:
+            response = self.client.post('/accounts/register/', {
+                'username': 'newcomer', 'email': 'n@example.com',
+                'password1': 'Sup3r-secret-pw', 'password2': 'Sup3r-secret-pw',
+            })
+        self.assertRedirects(response, '/events/')
+        check_password.assert_not_called()
+
+    def test_login_checks_the_password_once(self):
+        User.objects.create_user(username='alice', password='testpass123')
+        with mock.patch('django.contrib.auth.base_user.check_password', return_value=True) as check_password:
+            response = self.client.post('/accounts/login/', {'username': 'alice', 'password': 'testpass123'})
+        self.assertRedirects(response, '/events/')
+        self.assertEqual(check_password.call_count, 1)
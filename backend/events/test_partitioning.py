@@ -0,0 +1,135 @@
+from unittest import mock, skipUnless
+
+from django.apps import apps
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from .models import Event, PollVote, Question, QuestionLike
+from .partitioning import PARTITION_COUNT, PARTITIONED_TABLES, partition_name, partition_tables, partitioned_tables
+from . import services
+
+
+class PartitionKeyTestCase(TestCase):
+    def setUp(self):
+        self.creator = User.objects.create_user(username='creator', password='testpass123')
+        self.event = Event.objects.create(title='Summit', creator=self.creator)
+        self.question = services.add_question_to_event(self.event, 'Will the slides be shared?')
+        self.poll = services.create_poll(self.event, 'Format?', ['Talks', 'Workshops'])
+
+    def test_event_is_filled_in_on_every_write_path(self):
+        self.question.likes.add(self.creator)
+        services.toggle_question_like(User.objects.create_user(username='attendee'), self.question)
+        PollVote.objects.create(user=self.creator, poll_option=self.poll.options.first())
+        self.assertEqual(set(QuestionLike.objects.values_list('event_id', flat=True)), {self.event.pk})
+        self.assertEqual(list(PollVote.objects.values_list('event_id', flat=True)), [self.event.pk])
+
+    def test_partitioning_is_postgresql_only(self):
+        if connection.vendor == 'postgresql':
+            self.skipTest('runs against SQLite')
+        self.assertEqual(partitioned_tables(), [])
+        self.assertEqual(services.get_poll_vote_counts(self.poll)[0][1], 0)
+
+    def test_creating_an_event_runs_no_ddl(self):
+        with CaptureQueriesContext(connection) as queries:
+            Event.objects.create(title='Workshop', creator=self.creator)
+        self.assertFalse([q['sql'] for q in queries.captured_queries if q['sql'].startswith(('CREATE', 'ALTER'))])
+
+    def test_likes_are_deleted_by_event(self):
+        attendee = User.objects.create_user(username='attendee')
+        services.toggle_question_like(attendee, self.question)
+        with CaptureQueriesContext(connection) as unlike:
+            services.toggle_question_like(attendee, self.question)
+        services.toggle_question_like(attendee, self.question)
+        with CaptureQueriesContext(connection) as delete:
+            services.delete_question(self.question)
+
+        for queries in (unlike, delete):
+            deletes = [q['sql'] for q in queries.captured_queries if q['sql'].startswith('DELETE FROM "events_question_likes"')]
+            self.assertTrue(deletes)
+            self.assertTrue(all('"event_id"' in sql for sql in deletes))
+        self.assertFalse(QuestionLike.objects.exists())
+        self.assertFalse(Question.objects.filter(pk=self.question.pk).exists())
+
+    def test_likes_are_deleted_with_their_question_author(self):
+        author = User.objects.create_user(username='author')
+        question = services.add_question_to_event(self.event, 'Is there a recording?', author)
+        services.toggle_question_like(self.creator, question)
+        services.toggle_question_like(self.creator, self.question)
+        with CaptureQueriesContext(connection) as queries:
+            author.delete()
+
+        deletes = [
+            q['sql'] for q in queries.captured_queries
+            if q['sql'].startswith('DELETE FROM "events_question_likes"') and '"question_id"' in q['sql']
+        ]
+        self.assertTrue(deletes)
+        self.assertTrue(all('"event_id"' in sql for sql in deletes))
+        self.assertFalse(Question.objects.filter(pk=question.pk).exists())
+        self.assertEqual(list(QuestionLike.objects.values_list('question_id', flat=True)), [self.question.pk])
+
+    def test_likes_are_deleted_with_a_question_deleted_directly(self):
+        services.toggle_question_like(self.creator, self.question)
+        Question.objects.get(pk=self.question.pk).delete()
+        self.assertFalse(QuestionLike.objects.exists())
+
+    def test_deleting_an_event_deletes_its_likes_once(self):
+        services.toggle_question_like(self.creator, self.question)
+        with CaptureQueriesContext(connection) as queries:
+            self.event.delete()
+        deletes = [q['sql'] for q in queries.captured_queries if q['sql'].startswith('DELETE FROM "events_question_likes"')]
+        self.assertEqual(len(deletes), 1)
+        self.assertFalse(QuestionLike.objects.exists())
+
+
+class PartitionMigrationSQLTestCase(TestCase):
+    def test_tables_are_hash_partitioned_by_event(self):
+        schema_editor = mock.Mock()
+        schema_editor.connection.vendor = 'postgresql'
+        partition_tables(apps, schema_editor)
+        statements = [call.args[0] for call in schema_editor.execute.call_args_list]
+
+        for table, spec in PARTITIONED_TABLES.items():
+            sql = [s for s in statements if f'"{table}' in s]
+            create = sql.index(f'CREATE TABLE "{table}" (LIKE "{table}_old") PARTITION BY HASH (event_id)')
+            partitions = [
+                sql.index(
+                    f'CREATE TABLE "{partition_name(table, remainder)}" PARTITION OF "{table}" '
+                    f'FOR VALUES WITH (MODULUS {PARTITION_COUNT}, REMAINDER {remainder})'
+                )
+                for remainder in range(PARTITION_COUNT)
+            ]
+            copy = sql.index(f'INSERT INTO "{table}" SELECT * FROM "{table}_old"')
+            drop = sql.index(f'DROP TABLE "{table}_old" CASCADE')
+            primary_key = sql.index(f'ALTER TABLE "{table}" ADD CONSTRAINT "{table}_pkey" PRIMARY KEY (id, event_id)')
+            self.assertLess(create, min(partitions))
+            self.assertLess(max(partitions), copy)
+            self.assertLess(copy, drop)
+            self.assertLess(drop, primary_key)
+            self.assertFalse(any('DEFAULT' in s and 'PARTITION OF' in s for s in sql))
+        self.assertIn(
+            'ALTER TABLE "events_question_likes" ADD CONSTRAINT "events_question_likes_event_uniq" '
+            'UNIQUE ("event_id", "question_id", "user_id")',
+            statements,
+        )
+
+
+@skipUnless(connection.vendor == 'postgresql', 'table partitioning needs PostgreSQL')
+class PostgresPartitionTestCase(TestCase):
+    def setUp(self):
+        self.creator = User.objects.create_user(username='creator', password='testpass123')
+        self.event = Event.objects.create(title='Summit', creator=self.creator)
+
+    def test_event_queries_read_one_partition(self):
+        self.assertEqual(sorted(partitioned_tables()), sorted(PARTITIONED_TABLES))
+        question = services.add_question_to_event(self.event, 'Question?')
+        services.toggle_question_like(self.creator, question)
+
+        plan = services.get_event_questions(self.event, sort='hot').explain()
+        scanned = [r for r in range(PARTITION_COUNT) if f'{partition_name("events_question_likes", r)} ' in plan]
+        self.assertEqual(len(scanned), 1)
+
+        self.event.is_closed = True
+        self.event.save()
+        services.archive_event(self.event)
+        self.assertFalse(QuestionLike.objects.filter(event=self.event).exists())
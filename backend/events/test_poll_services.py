@@ -0,0 +1,58 @@
+from unittest import mock
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from .models import Event, Poll, PollOption
+from . import services
+from .services import poll_services
+
+
+class PollChartTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.creator = User.objects.create_user(username='creator', password='testpass123')
+        self.voter = User.objects.create_user(username='voter', password='testpass123')
+        self.event = Event.objects.create(title='Polls', creator=self.creator)
+        self.poll = Poll.objects.create(event=self.event, question='Best talk?')
+        self.first = PollOption.objects.create(poll=self.poll, text='<b>Caching</b> & you')
+        self.second = PollOption.objects.create(poll=self.poll, text='Indexes')
+
+    def test_chart_escapes_labels_and_shows_percentages(self):
+        services.vote_in_poll(self.creator, self.first)
+        services.vote_in_poll(self.voter, self.first)
+        svg = services.render_poll_chart_svg(services.get_poll_vote_counts(self.poll))
+        self.assertTrue(svg.startswith('<svg'))
+        self.assertIn('&lt;b&gt;Caching&lt;/b&gt; &amp; you', svg)
+        self.assertIn('2 (100%)', svg)
+        self.assertIn('0 (0%)', svg)
+        self.assertIn('aria-label="Poll results: 2 votes"', svg)
+
+    def test_chart_is_cached_until_the_next_vote(self):
+        services.vote_in_poll(self.creator, self.first)
+        counts = services.get_poll_vote_counts(self.poll)
+        with mock.patch.object(poll_services, 'render_poll_chart_svg', wraps=poll_services.render_poll_chart_svg) as render:
+            svg = services.get_poll_chart_svg(self.poll, counts)
+            self.assertEqual(services.get_poll_chart_svg(self.poll, counts), svg)
+            self.assertEqual(render.call_count, 1)
+
+            services.vote_in_poll(self.voter, self.second)
+            services.get_poll_chart_svg(self.poll, services.get_poll_vote_counts(self.poll))
+            self.assertEqual(render.call_count, 2)
+
+    def test_poll_detail_embeds_the_svg_chart(self):
+        services.vote_in_poll(self.voter, self.second)
+        self.client.force_login(self.voter)
+        response = self.client.get(f'/events/{self.event.code}/poll/{self.poll.id}/')
+        self.assertContains(response, '<svg xmlns="http://www.w3.org/2000/svg" viewBox')
+        self.assertNotContains(response, 'cdn.jsdelivr.net')
+        self.assertNotContains(response, 'poll_chart.js')
+        self.assertEqual(response.context['total_votes'], 1)
+
+    @override_settings(POLL_CHARTJS='events/vendor/chart.min.js')
+    def test_chartjs_is_an_opt_in_enhancement(self):
+        services.vote_in_poll(self.voter, self.second)
+        self.client.force_login(self.voter)
+        response = self.client.get(f'/events/{self.event.code}/poll/{self.poll.id}/')
+        self.assertContains(response, 'events/js/poll_chart.js')
+        self.assertContains(response, 'data-chartjs="/static/events/vendor/chart.min.js"')
+        self.assertContains(response, '<script id="poll-results" type="application/json">')
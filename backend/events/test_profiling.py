@@ -0,0 +1,83 @@
+import pstats
+import tempfile
+import threading
+import time
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from .models import Event
+from .profiling import StackSampler, check_profiling_token, list_profiles, make_profiling_token, profile_path
+
+
+class ProfilingTestCase(TestCase):
+    def setUp(self):
+        self.storage = tempfile.TemporaryDirectory()
+        self.addCleanup(self.storage.cleanup)
+        settings_override = override_settings(PROFILING={
+            'ENABLED': True,
+            'STORAGE_DIR': self.storage.name,
+            'SAMPLE_INTERVAL': 0.001,
+            'MAX_PROFILES_PER_MINUTE': 2,
+        })
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.staff = User.objects.create_user(username='staff', password='testpass123', is_staff=True)
+        self.user = User.objects.create_user(username='user', password='testpass123')
+        self.event = Event.objects.create(title='Profiled', creator=self.staff)
+        self.url = f'/events/{self.event.code}/'
+
+    def test_token_is_bound_to_a_staff_user(self):
+        token = make_profiling_token(self.staff)
+        self.assertTrue(check_profiling_token(token, self.staff))
+        self.assertFalse(check_profiling_token(token, self.user))
+        self.assertFalse(check_profiling_token(make_profiling_token(self.user), self.user))
+        self.assertFalse(check_profiling_token(token + 'x', self.staff))
+
+    def test_profiled_request_stores_pstats_and_folded_stacks(self):
+        self.client.force_login(self.staff)
+        response = self.client.get(self.url, HTTP_X_LITESLIDO_PROFILE=make_profiling_token(self.staff))
+        self.assertEqual(response.status_code, 200)
+        request_id = response['X-Profile-Id']
+
+        stats = pstats.Stats(str(profile_path(request_id, 'pstats')))
+        self.assertTrue(any(func[2] == 'event_detail' for func in stats.stats))
+        self.assertIsNotNone(profile_path(request_id, 'folded'))
+        [profile] = list_profiles()
+        self.assertEqual(profile['view'], 'event_detail')
+        self.assertEqual(profile['status'], 200)
+
+        download = self.client.get(f'/profiling/{request_id}.pstats')
+        self.assertEqual(download.status_code, 200)
+
+    def test_query_parameter_triggers_profiling(self):
+        self.client.force_login(self.staff)
+        response = self.client.get(self.url, {'_profile': make_profiling_token(self.staff)})
+        self.assertIn('X-Profile-Id', response)
+
+    def test_requests_without_valid_token_are_not_profiled(self):
+        self.client.force_login(self.user)
+        response = self.client.get(self.url, HTTP_X_LITESLIDO_PROFILE=make_profiling_token(self.staff))
+        self.assertNotIn('X-Profile-Id', response)
+        self.assertEqual(self.client.get('/profiling/').status_code, 302)
+        self.assertEqual(list_profiles(), [])
+
+    def test_profiles_are_rate_limited(self):
+        self.client.force_login(self.staff)
+        token = make_profiling_token(self.staff)
+        profiled = [
+            'X-Profile-Id' in self.client.get(self.url, HTTP_X_LITESLIDO_PROFILE=token)
+            for _ in range(3)
+        ]
+        self.assertEqual(profiled, [True, True, False])
+
+    def test_download_rejects_unknown_ids(self):
+        self.client.force_login(self.staff)
+        self.assertEqual(self.client.get('/profiling/../settings.pstats').status_code, 404)
+        self.assertEqual(self.client.get(f'/profiling/{"0" * 32}.folded').status_code, 404)
+
+    def test_sampler_caps_samples(self):
+        sampler = StackSampler(threading.get_ident(), interval=0.0005, max_samples=5)
+        with sampler:
+            time.sleep(0.05)
+        self.assertEqual(sampler.samples, 5)
+        self.assertIn('test_sampler_caps_samples', sampler.folded())
@@ -0,0 +1,75 @@
+import unittest
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from .models import Event, Question, Poll, PollOption, PollVote
+from .query_audit import QueryAudit, normalize_sql, query_audit_exempt
+from . import services
+from core.test_runner import _AuditResultMixin
+
+
+class QueryAuditTestCase(TestCase):
+    def setUp(self):
+        self.creator = User.objects.create_user(username='creator', password='testpass123')
+        self.event = Event.objects.create(title='Audit', creator=self.creator)
+        for i in range(30):
+            question = Question.objects.create(event=self.event, author=self.creator, text=f'Question {i}')
+            question.likes.add(self.creator)
+
+    def test_normalize_sql_groups_literals_and_in_lists(self):
+        self.assertEqual(
+            normalize_sql("SELECT * FROM t WHERE id = 5 AND name = 'it''s' AND x IN (%s, %s, %s)"),
+            "SELECT * FROM t WHERE id = ? AND name = ? AND x IN (...)",
+        )
+
+    @query_audit_exempt
+    def test_repeated_shape_is_reported(self):
+        with QueryAudit(max_repeats=5) as audit:
+            for question in Question.objects.filter(event=self.event):
+                question.likes.count()
+        violations = audit.violations()
+        self.assertEqual(len(violations), 1)
+        self.assertTrue(violations[0].startswith('30x repeated query'))
+
+    def test_event_pages_have_no_per_question_queries(self):
+        self.client.force_login(self.creator)
+        for url in (f'/events/{self.event.code}/', f'/events/anonymous/{self.event.code}/'):
+            with QueryAudit(max_repeats=3) as audit:
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(audit.violations(), [], url)
+
+    def test_vote_counts_use_one_query(self):
+        poll = Poll.objects.create(event=self.event, question='Pick')
+        options = [PollOption.objects.create(poll=poll, text=f'Option {i}') for i in range(20)]
+        PollVote.objects.create(user=self.creator, poll_option=options[3])
+
+        with self.assertNumQueries(1):
+            counts = services.get_poll_vote_counts(poll)
+        self.assertEqual(counts[3], (options[3], 1))
+
+    @query_audit_exempt
+    def test_runner_audits_the_test_method_only(self):
+        violations = []
+
+        class Result(_AuditResultMixin, unittest.TestResult):
+            query_audit_violations = violations
+
+        event = self.event
+
+        class Fixture(unittest.TestCase):
+            def setUp(self):
+                for question in Question.objects.filter(event=event):
+                    question.likes.count()
+
+            def test_clean(self):
+                list(services.get_event_questions(event))
+
+            def test_loop(self):
+                for question in Question.objects.filter(event=event):
+                    question.likes.count()
+
+        Fixture('test_clean').run(Result())
+        self.assertEqual(violations, [])
+        Fixture('test_loop').run(Result())
+        self.assertEqual([test_id for test_id, _ in violations], [Fixture('test_loop').id()])
@@ -0,0 +1,186 @@
+import random
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from .leaderboard import LocalSortedSets, SkipList, get_leaderboard_store, reset_leaderboard_store
+from .models import Event, Poll, PollVote
+from . import services
+
+
+class SkipListTestCase(SimpleTestCase):
+    def test_matches_a_sorted_list_under_random_updates(self):
+        rng = random.Random(5)
+        skiplist, scores = SkipList(seed=1), {}
+        for _ in range(2000):
+            member = f'm{rng.randrange(300)}'
+            if member in scores and rng.random() < 0.3:
+                self.assertTrue(skiplist.delete(scores.pop(member), member))
+                continue
+            if member in scores:
+                skiplist.delete(scores[member], member)
+            scores[member] = rng.randrange(50)
+            skiplist.insert(scores[member], member)
+
+        expected = sorted((score, member) for member, score in scores.items())
+        self.assertEqual(len(skiplist), len(expected))
+        self.assertEqual(skiplist.range(0, len(expected)), [(m, s) for s, m in expected])
+        for rank, (score, member) in enumerate(expected):
+            self.assertEqual(skiplist.rank(score, member), rank)
+        self.assertEqual(skiplist.range(10, 14), [(m, s) for s, m in expected[10:15]])
+
+
+class LocalSortedSetsTestCase(SimpleTestCase):
+    def test_redis_ordering_and_ranks(self):
+        store = LocalSortedSets()
+        store.zadd('board', {'alice': 10, 'bob': 30})
+        store.zincrby('board', 5, 'carol')
+        store.zincrby('board', 25, 'alice')
+        store.zincrby('board', 30, 'carol')
+        # Equal scores are ordered by member, reversed for the rev* calls, as in Redis
+        self.assertEqual(store.zrevrange('board', 0, -1, withscores=True),
+                         [('carol', 35.0), ('alice', 35.0), ('bob', 30.0)])
+        self.assertEqual(store.zrevrank('board', 'bob'), 2)
+        self.assertEqual(store.zscore('board', 'alice'), 35.0)
+        self.assertIsNone(store.zrevrank('board', 'dave'))
+        self.assertEqual(store.zrevrange('board', 0, 0), ['carol'])
+        self.assertEqual(store.zcard('board'), 3)
+
+    def test_set_if_absent_with_expiry_and_rename(self):
+        store = LocalSortedSets()
+        self.assertTrue(store.set('lock', 1, ex=30, nx=True))
+        self.assertIsNone(store.set('lock', 1, ex=30, nx=True))
+        with mock.patch('events.leaderboard.time.monotonic', return_value=float('inf')):
+            self.assertFalse(store.exists('lock'))
+        store.zadd('building', {'a': 1})
+        store.rename('building', 'board')
+        self.assertEqual(store.zscore('board', 'a'), 1)
+        self.assertFalse(store.exists('building'))
+
+
+class QuizTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        reset_leaderboard_store()
+        self.addCleanup(reset_leaderboard_store)
+        self.creator = User.objects.create_user(username='creator', password='testpass123')
+        self.event = Event.objects.create(title='Pub quiz', creator=self.creator)
+        self.players = [User.objects.create_user(username=f'player{i}', password='testpass123') for i in range(3)]
+        self.poll = services.create_poll(self.event, 'Capital of France?', ['Paris', 'Lyon'],
+                                         time_limit=30, correct_options=['Paris'])
+        self.paris, self.lyon = self.poll.options.order_by('id')
+
+    def answer_after(self, user, option, seconds):
+        with mock.patch('django.utils.timezone.now', return_value=self.poll.created_at + timedelta(seconds=seconds)):
+            return services.vote_in_poll(user, option)
+
+    def test_answer_key_and_scoring(self):
+        self.assertTrue(self.paris.is_correct)
+        self.assertFalse(self.lyon.is_correct)
+        self.assertEqual(self.answer_after(self.players[0], self.paris, 0).score, 1000)
+        self.assertEqual(self.answer_after(self.players[1], self.paris, 15).score, 750)
+        self.assertEqual(self.answer_after(self.players[2], self.lyon, 1).score, 0)
+        self.assertEqual(services.get_quiz_answer(self.players[2], self.poll).poll_option, self.lyon)
+        self.assertIsNone(services.get_quiz_answer(self.creator, self.poll))
+
+    def test_leaderboard_updates_on_each_answer(self):
+        self.answer_after(self.players[0], self.paris, 15)
+        self.answer_after(self.players[1], self.paris, 3)
+        self.answer_after(self.players[2], self.lyon, 1)
+
+        leaders = services.get_leaderboard(self.event)
+        self.assertEqual([(row['user'], row['score']) for row in leaders],
+                         [(self.players[1], 950), (self.players[0], 750), (self.players[2], 0)])
+        with CaptureQueriesContext(connection) as queries:
+            position = services.get_leaderboard_position(self.event, self.players[0])
+        self.assertEqual(len(queries), 0)
+        self.assertEqual(position, {'rank': 2, 'score': 750, 'players': 3})
+        self.assertIsNone(services.get_leaderboard_position(self.event, self.creator))
+
+    def test_lost_leaderboard_is_rebuilt_from_votes(self):
+        self.answer_after(self.players[0], self.paris, 15)
+        reset_leaderboard_store()  # e.g. a restarted worker
+        second = services.create_poll(self.event, '2 + 2?', ['4', '5'], time_limit=10, correct_options=['4'])
+        with mock.patch('django.utils.timezone.now', return_value=second.created_at):
+            services.vote_in_poll(self.players[0], second.options.get(text='4'))
+        self.assertEqual(services.get_leaderboard_position(self.event, self.players[0])['score'], 1750)
+
+    def test_answer_during_another_workers_rebuild_is_counted(self):
+        self.answer_after(self.players[0], self.paris, 15)
+        reset_leaderboard_store()
+        store = get_leaderboard_store()
+        store.set(f'liteslido:leaderboard:{self.event.pk}:rebuilding', 1)
+
+        def other_worker_finishes(seconds):
+            # Its totals were read before the answer below was saved
+            store.zadd(f'liteslido:leaderboard:{self.event.pk}', {str(self.players[0].pk): 750})
+            store.set(f'liteslido:leaderboard:{self.event.pk}:loaded', 1)
+            store.delete(f'liteslido:leaderboard:{self.event.pk}:rebuilding')
+
+        second = services.create_poll(self.event, '2 + 2?', ['4', '5'], time_limit=10, correct_options=['4'])
+        with mock.patch('events.services.quiz_services.time.sleep', side_effect=other_worker_finishes), \
+                mock.patch('django.utils.timezone.now', return_value=second.created_at):
+            services.vote_in_poll(self.players[0], second.options.get(text='4'))
+        self.assertEqual(services.get_leaderboard_position(self.event, self.players[0])['score'], 1750)
+
+    def test_rebuild_replaces_the_leaderboard_in_one_step(self):
+        self.answer_after(self.players[0], self.paris, 15)
+        store = get_leaderboard_store()
+        store.zadd(f'liteslido:leaderboard:{self.event.pk}', {'stale': 1})
+        with mock.patch.object(store, 'delete', wraps=store.delete) as delete:
+            self.assertTrue(services.rebuild_leaderboard(self.event.pk))
+        self.assertNotIn(f'liteslido:leaderboard:{self.event.pk}', [name for call in delete.call_args_list for name in call.args])
+        self.assertIsNone(store.zscore(f'liteslido:leaderboard:{self.event.pk}', 'stale'))
+        self.assertFalse(store.exists(f'liteslido:leaderboard:{self.event.pk}:rebuilding'))
+
+    def test_regular_polls_do_not_score(self):
+        poll = services.create_poll(self.event, 'Fun?', ['Yes', 'No'])
+        services.vote_in_poll(self.players[0], poll.options.first())
+        self.assertEqual(PollVote.objects.get(poll_option__poll=poll).score, 0)
+        self.assertEqual(services.get_leaderboard(self.event), [])
+
+    def test_late_answers_are_refused(self):
+        url = f'/events/{self.event.code}/poll/{self.poll.id}/'
+        Poll.objects.filter(pk=self.poll.pk).update(created_at=timezone.now() - timedelta(seconds=60))
+        self.client.force_login(self.players[0])
+        response = self.client.post(url, {'poll_option': self.paris.id})
+        self.assertContains(response, 'Time is up')
+        self.assertContains(response, 'Correct answer')
+        self.assertFalse(PollVote.objects.exists())
+
+    def test_quiz_page_and_leaderboard_view(self):
+        url = f'/events/{self.event.code}/poll/{self.poll.id}/'
+        self.client.force_login(self.players[0])
+        self.assertContains(self.client.get(url), 'id="quiz-countdown"')
+        self.client.post(url, {'poll_option': self.paris.id})
+        response = self.client.get(url)
+        self.assertContains(response, 'Correct!')
+        self.assertContains(response, 'You are #1 of 1')
+
+        response = self.client.get(f'/events/{self.event.code}/leaderboard/')
+        self.assertContains(response, 'player0')
+        self.assertEqual(response.context['position']['rank'], 1)
+
+    def test_add_quiz_question(self):
+        self.client.force_login(self.creator)
+        response = self.client.post(f'/events/{self.event.code}/add_poll/', {
+            'question': 'Largest planet?', 'kind': 'choice', 'time_limit': 20, 'num_options': 1,
+            'option_0-text': 'Mars', 'option_1-text': 'Jupiter', 'option_1-correct': '1',
+        })
+        self.assertRedirects(response, f'/events/{self.event.code}/')
+        poll = Poll.objects.get(question='Largest planet?')
+        self.assertEqual(poll.time_limit, 20)
+        self.assertEqual(list(poll.options.filter(is_correct=True).values_list('text', flat=True)), ['Jupiter'])
+
+    def test_quiz_needs_a_correct_option(self):
+        self.client.force_login(self.creator)
+        response = self.client.post(f'/events/{self.event.code}/add_poll/', {
+            'question': 'Trick?', 'kind': 'choice', 'time_limit': 20, 'num_options': 1,
+            'option_0-text': 'A', 'option_1-text': 'B',
+        })
+        self.assertContains(response, 'Mark at least one correct option')
@@ -0,0 +1,140 @@
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from .models import Event, Question, QuestionLike
+from . import services
+
+
+class HotRankingTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.creator = User.objects.create_user(username='creator', password='testpass123')
+        self.event = Event.objects.create(title='All-hands', creator=self.creator)
+        self.users = [User.objects.create_user(username=f'user{i}', password='testpass123') for i in range(3)]
+        self.start = self.event.hot_epoch
+
+    def at(self, minutes):
+        return mock.patch('django.utils.timezone.now', return_value=self.start + timedelta(minutes=minutes))
+
+    def ask(self, text, minutes):
+        with self.at(minutes):
+            return services.add_question_to_event(self.event, text)
+
+    def like(self, user, question, minutes):
+        with self.at(minutes):
+            return services.toggle_question_like(user, question)
+
+    def texts(self, sort):
+        return [q.text for q in services.get_event_questions(self.event, sort=sort)]
+
+    def test_recent_likes_outrank_old_ones_when_hot(self):
+        early = self.ask('Early question', 0)
+        self.like(self.users[0], early, 1)
+        self.like(self.users[1], early, 2)
+        late = self.ask('Late question', 120)
+        self.like(self.users[2], late, 121)
+
+        self.assertEqual(self.texts('top'), ['Early question', 'Late question'])
+        self.assertEqual(self.texts('hot'), ['Late question', 'Early question'])
+        self.assertEqual(services.get_event_questions(self.event, sort='hot')[0].num_likes, 1)
+
+    def test_unlike_takes_back_the_like_weight(self):
+        question = self.ask('Question', 0)
+        created = Question.objects.get(pk=question.pk).hot_score
+        self.like(self.users[0], question, 10)
+        self.assertAlmostEqual(Question.objects.get(pk=question.pk).hot_score, created + 2 ** (10 / 30))
+        self.like(self.users[0], question, 50)
+        self.assertAlmostEqual(Question.objects.get(pk=question.pk).hot_score, created)
+        self.assertFalse(QuestionLike.objects.exists())
+
+    def test_rescale_keeps_the_order(self):
+        for minutes, text in enumerate(['First', 'Second', 'Third']):
+            question = self.ask(text, minutes * 60)
+            for user in self.users[:3 - minutes]:
+                self.like(user, question, minutes * 60 + 1)
+        before = self.texts('hot')
+        scores = dict(Question.objects.values_list('text', 'hot_score'))
+
+        with self.at(600):
+            services.rescale_hot_scores(self.event.pk)
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.hot_epoch, self.start + timedelta(minutes=600))
+        self.assertEqual(self.texts('hot'), before)
+        for text, score in Question.objects.values_list('text', 'hot_score'):
+            self.assertAlmostEqual(score, scores[text] / 2 ** 20)
+
+    def test_writes_racing_a_rescale_are_scaled_with_it(self):
+        question = self.ask('Question', 0)
+        with self.at(600):
+            services.rescale_hot_scores(self.event.pk)
+        # The like read the epoch just before the rescale moved it
+        epochs = [self.start, self.start + timedelta(minutes=600)]
+        with mock.patch('events.services.ranking_services.get_hot_epoch', side_effect=epochs):
+            self.like(self.users[0], question, 630)
+        self.assertAlmostEqual(Question.objects.get(pk=question.pk).hot_score, 2 ** -20 + 2)
+
+    def test_writes_read_the_epoch_once(self):
+        question = self.ask('Question', 0)
+        with CaptureQueriesContext(connection) as queries:
+            self.like(self.users[0], question, 1)
+        self.assertEqual(sum('"hot_epoch"' in query['sql'] for query in queries.captured_queries), 2)
+        self.assertEqual(sum(query['sql'].startswith('SELECT "events_event"."hot_epoch"') for query in queries.captured_queries), 1)
+
+    def test_writes_rescale_an_epoch_too_old_for_a_float(self):
+        question = self.ask('Question', 0)
+        self.like(self.users[0], question, 1)
+        with self.at(30 * 24 * 60):
+            reopened = services.add_question_to_event(self.event, 'A month later')
+        self.like(self.users[1], question, 30 * 24 * 60 + 30)
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.hot_epoch, self.start + timedelta(days=30))
+        self.assertAlmostEqual(Question.objects.get(pk=reopened.pk).hot_score, 1)
+        self.assertAlmostEqual(Question.objects.get(pk=question.pk).hot_score, 2)
+        self.assertEqual(self.texts('hot'), ['Question', 'A month later'])
+
+    def test_writes_do_not_lock_the_event(self):
+        question = self.ask('Question', 0)
+        with CaptureQueriesContext(connection) as queries:
+            self.like(self.users[0], question, 1)
+        self.assertFalse(any('FOR UPDATE' in query['sql'] for query in queries.captured_queries))
+
+    def test_merge_keeps_like_times(self):
+        target = self.ask('How do we deploy?', 0)
+        duplicate = self.ask('How do we deploy this?', 0)
+        self.like(self.users[0], target, 30)
+        self.like(self.users[0], duplicate, 60)
+        self.like(self.users[1], duplicate, 60)
+        with self.at(90):
+            services.merge_questions(duplicate, target)
+        self.assertEqual(target.likes.count(), 2)
+        self.assertAlmostEqual(Question.objects.get(pk=target.pk).hot_score, 1 + 2 + 4)
+
+    def test_rescale_command_moves_stale_epochs(self):
+        Event.objects.filter(pk=self.event.pk).update(hot_epoch=timezone.now() - timedelta(days=1))
+        fresh = Event.objects.create(title='Fresh', creator=self.creator)
+        closed = Event.objects.create(title='Closed', creator=self.creator, is_closed=True)
+        Event.objects.filter(pk=closed.pk).update(hot_epoch=timezone.now() - timedelta(days=1))
+        out = StringIO()
+        call_command('rescale_hot_scores', stdout=out)
+        self.assertIn('Rescaled hot scores of 2 event(s).', out.getvalue())
+        self.event.refresh_from_db()
+        self.assertGreater(self.event.hot_epoch, fresh.hot_epoch)
+
+    def test_event_page_sort_toggle(self):
+        self.ask('Only question', 0)
+        self.client.force_login(self.users[0])
+        response = self.client.get(f'/events/{self.event.code}/?sort=hot')
+        self.assertEqual(response.context['question_sort'], 'hot')
+        self.assertContains(response, 'Only question')
+        response = self.client.get(f'/events/{self.event.code}/?sort=bogus')
+        self.assertEqual(response.context['question_sort'], 'top')
+        response = self.client.get(f'/events/anonymous/{self.event.code}/?sort=hot')
+        self.assertEqual(response.context['question_sort'], 'hot')
@@ -0,0 +1,83 @@
+from django.contrib.auth.models import User
+from django.test import TestCase
+from .models import Event, Question, QuestionFingerprint
+from . import services
+
+
+class SearchServicesTestCase(TestCase):
+    def setUp(self):
+        self.creator = User.objects.create_user(username='creator', password='testpass123')
+        self.event = Event.objects.create(title='Search Event', creator=self.creator)
+        self.other_event = Event.objects.create(title='Other Event', creator=self.creator)
+
+    def test_search_matches_terms_within_event_only(self):
+        match = services.add_question_to_event(self.event, 'How does the caching layer work?', author=self.creator)
+        services.add_question_to_event(self.event, 'When is lunch?', author=self.creator)
+        services.add_question_to_event(self.other_event, 'Is caching enabled here?', author=self.creator)
+
+        results = list(services.search_event_questions(self.event, 'caching'))
+        self.assertEqual(results, [match])
+
+    def test_search_keeps_callers_annotations(self):
+        services.add_question_to_event(self.event, 'Deployment strategy?', author=self.creator)
+        results = services.search_event_questions(
+            self.event, 'deployment', questions=services.get_event_questions(self.event)
+        )
+        self.assertEqual(results[0].num_likes, 0)
+
+    def test_search_index_follows_updates_and_deletes(self):
+        question = services.add_question_to_event(self.event, 'Original wording', author=self.creator)
+        question.text = 'Rephrased wording'
+        question.save()
+        self.assertFalse(services.search_event_questions(self.event, 'original'))
+        self.assertTrue(services.search_event_questions(self.event, 'rephrased'))
+
+        question.delete()
+        self.assertFalse(services.search_event_questions(self.event, 'rephrased'))
+
+    def test_near_duplicate_is_flagged_on_creation(self):
+        original = services.add_question_to_event(
+            self.event, 'Will the slides from this talk be shared afterwards?', author=self.creator
+        )
+        duplicate = services.add_anonymous_question(
+            self.event, 'Guest', 'will the slides from this talk be shared afterwards'
+        )
+        unrelated = services.add_anonymous_question(self.event, 'Guest', 'What database do you use in production?')
+
+        self.assertEqual(duplicate.duplicate_of, original)
+        self.assertIsNone(unrelated.duplicate_of)
+        self.assertEqual(
+            QuestionFingerprint.objects.filter(question=original).count(), services.MINHASH_BANDS
+        )
+
+    def test_duplicates_are_not_matched_across_events(self):
+        services.add_question_to_event(self.other_event, 'Can we get the recording link?', author=self.creator)
+        question = services.add_question_to_event(self.event, 'Can we get the recording link?', author=self.creator)
+        self.assertIsNone(question.duplicate_of)
+
+    def test_merge_moves_likes_and_removes_duplicate(self):
+        attendee = User.objects.create_user(username='attendee', password='testpass123')
+        original = services.add_question_to_event(self.event, 'Is there a recording of the keynote?', author=self.creator)
+        duplicate = services.add_question_to_event(self.event, 'is there a recording of the keynote', author=attendee)
+        duplicate.likes.add(attendee, self.creator)
+        original.likes.add(self.creator)
+
+        self.client.force_login(self.creator)
+        self.client.post(f'/events/{self.event.code}/question/{duplicate.id}/merge/')
+
+        self.assertFalse(Question.objects.filter(id=duplicate.id).exists())
+        self.assertEqual(original.likes.count(), 2)
+
+    def test_only_approved_questions_are_suggested_or_merged_into(self):
+        rejected = services.add_question_to_event(self.event, 'Is the keynote recorded for later viewing?')
+        Question.objects.filter(id=rejected.id).update(status=Question.Status.REJECTED)
+        question = services.add_anonymous_question(self.event, 'Guest', 'is the keynote recorded for later viewing')
+        self.assertIsNone(question.duplicate_of)
+
+        Question.objects.filter(id=question.id).update(duplicate_of=rejected)
+        self.client.force_login(self.creator)
+        self.client.post(f'/events/{self.event.code}/question/{question.id}/merge/')
+        self.assertTrue(Question.objects.filter(id=question.id).exists())
+        rejected.refresh_from_db()
+        with self.assertRaises(ValueError):
+            services.merge_questions(question, rejected)
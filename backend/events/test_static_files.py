@@ -0,0 +1,64 @@
+import gzip
+import tempfile
+from pathlib import Path
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.management import call_command
+from django.test import SimpleTestCase, override_settings
+from .context_processors import _built_stylesheet
+
+
+class StaticPipelineTestCase(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.static_root = tempfile.TemporaryDirectory()
+        cls.addClassCleanup(cls.static_root.cleanup)
+        cls.settings_override = override_settings(
+            STATIC_ROOT=cls.static_root.name,
+            SERVE_STATIC=True,
+            STORAGES={
+                'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+                'staticfiles': {'BACKEND': 'core.static_storage.CompressedManifestStaticFilesStorage'},
+            },
+        )
+        cls.settings_override.enable()
+        cls.addClassCleanup(cls.settings_override.disable)
+        call_command('collectstatic', interactive=False, verbosity=0)
+        cls.hashed_name = staticfiles_storage.stored_name('events/js/poll_chart.js')
+
+    def test_collectstatic_writes_hashed_and_gzipped_files(self):
+        self.assertRegex(self.hashed_name, r'^events/js/poll_chart\.[0-9a-f]{12}\.js$')
+        original = (Path(self.static_root.name) / self.hashed_name).read_bytes()
+        compressed = (Path(self.static_root.name) / (self.hashed_name + '.gz')).read_bytes()
+        self.assertEqual(gzip.decompress(compressed), original)
+        self.assertLess(len(compressed), len(original))
+
+    def test_hashed_files_are_immutable_and_precompressed(self):
+        url = f'/static/{self.hashed_name}'
+        response = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip, deflate')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Cache-Control'], 'public, max-age=31536000, immutable')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertIn(response['Content-Type'], ('text/javascript', 'application/javascript'))
+
+        revalidated = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(revalidated.status_code, 304)
+
+    def test_unhashed_and_missing_files(self):
+        response = self.client.get('/static/events/js/poll_chart.js')
+        self.assertEqual(response['Cache-Control'], 'public, max-age=300')
+        self.assertNotIn('Content-Encoding', response)
+        self.assertNotEqual(self.client.get('/static/../manage.py').status_code, 200)
+        self.assertEqual(self.client.get('/static/events/missing.js').status_code, 404)
+
+    def test_base_template_uses_the_built_stylesheet_when_present(self):
+        self.addCleanup(_built_stylesheet.cache_clear)
+        with self.settings(TAILWIND_STYLESHEET='events/css/missing.css'):
+            _built_stylesheet.cache_clear()
+            self.assertContains(self.client.get('/accounts/login/'), 'cdn.tailwindcss.com')
+        with self.settings(TAILWIND_STYLESHEET='events/js/poll_chart.js'):
+            _built_stylesheet.cache_clear()
+            response = self.client.get('/accounts/login/')
+            self.assertNotContains(response, 'cdn.tailwindcss.com')
+            self.assertContains(response, f'href="/static/{self.hashed_name}"')
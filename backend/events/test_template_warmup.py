@@ -0,0 +1,22 @@
+from io import StringIO
+from django.core.management import call_command
+from django.template import engines
+from django.test import SimpleTestCase
+from .template_warmup import iter_template_names, warm_templates
+
+
+class TemplateWarmupTestCase(SimpleTestCase):
+    def test_warmup_fills_the_cached_loader(self):
+        engine = engines['django'].engine
+        cached_loader = engine.template_loaders[0]
+        cached_loader.reset()
+
+        _, _, errors = warm_templates()
+        self.assertEqual(errors, {})
+        self.assertIn('events/event_detail.html', set(iter_template_names(engine)))
+        self.assertIn('events/event_detail.html', cached_loader.get_template_cache)
+
+    def test_command_reports_compiled_templates(self):
+        out = StringIO()
+        call_command('warm_templates', stdout=out)
+        self.assertIn('Compiled', out.getvalue())
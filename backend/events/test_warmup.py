@@ -0,0 +1,105 @@
+import asyncio
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.template import engines
+from django.test import TestCase, TransactionTestCase, override_settings
+from .models import Event
+from .services import poll_services
+from . import services, warmup
+
+
+@override_settings(WORKER_WARMUP=True)
+class ReadinessTestCase(TestCase):
+    databases = '__all__'
+
+    def setUp(self):
+        warmup.reset_worker_readiness()
+        self.addCleanup(warmup.reset_worker_readiness)
+
+    def test_ready_only_after_a_successful_warm_up(self):
+        database_down = tuple(
+            (name, mock.Mock(side_effect=ConnectionError('database is down')) if name == 'database' else step)
+            for name, step in warmup.WARMUP_STEPS
+        )
+        with mock.patch.object(warmup, 'WARMUP_STEPS', database_down):
+            with self.assertLogs('events.warmup', 'ERROR'):
+                timings = warmup.warm_up_worker()
+        self.assertEqual(list(timings), [name for name, _ in warmup.WARMUP_STEPS])
+        self.assertFalse(warmup.is_worker_ready())
+        with mock.patch('events.views.health_views.warm_up_worker'):
+            self.assertEqual(self.client.get('/ready').status_code, 503)
+
+        # The probe retries the warm-up
+        response = self.client.get('/ready')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('no-cache', response['Cache-Control'])
+        self.assertTrue(warmup.is_worker_ready())
+
+    def test_concurrent_warm_up_is_skipped(self):
+        with warmup._running:
+            self.assertIsNone(warmup.warm_up_worker())
+        self.assertFalse(warmup.is_worker_ready())
+
+    @override_settings(WORKER_WARMUP=False)
+    def test_ready_without_warm_up(self):
+        self.assertEqual(self.client.get('/ready').status_code, 200)
+
+
+class WarmupStepsTestCase(TestCase):
+    def test_templates_are_compiled(self):
+        cached_loader = engines['django'].engine.template_loaders[0]
+        cached_loader.reset()
+        warmup.warm_templates()
+        for name in ('events/event_detail.html', 'events/anonymous_event_detail.html', 'events/poll_detail.html'):
+            self.assertIn(name, cached_loader.get_template_cache)
+
+    def test_open_event_caches_are_primed(self):
+        creator = User.objects.create_user(username='creator', password='testpass123')
+        event = Event.objects.create(title='Open', creator=creator)
+        closed = Event.objects.create(title='Closed', creator=creator, is_closed=True)
+        poll = services.create_poll(event, 'Lunch?', ['Pizza', 'Salad'])
+        services.create_poll(closed, 'Old?', ['Yes', 'No'])
+        services.vote_in_poll(creator, poll.options.first())
+        cache.clear()
+
+        with mock.patch.object(poll_services, 'render_poll_chart_svg', wraps=poll_services.render_poll_chart_svg) as render:
+            warmup.warm_caches()
+            self.assertEqual(render.call_count, 1)
+            services.get_poll_chart_svg(poll, services.get_poll_vote_counts(poll))
+            self.assertEqual(render.call_count, 1)
+
+
+@override_settings(WORKER_WARMUP=True)
+class LifespanTestCase(TransactionTestCase):
+    databases = '__all__'
+
+    def setUp(self):
+        warmup.reset_worker_readiness()
+        self.addCleanup(warmup.reset_worker_readiness)
+
+    def run_lifespan(self, app):
+        messages = [{'type': 'lifespan.startup'}, {'type': 'lifespan.shutdown'}]
+        sent = []
+
+        async def receive():
+            return messages.pop(0)
+
+        async def send(message):
+            sent.append((message['type'], warmup.is_worker_ready()))
+
+        asyncio.run(app({'type': 'lifespan'}, receive, send))
+        return sent
+
+    def test_startup_completes_after_warm_up(self):
+        django_app = mock.AsyncMock()
+        sent = self.run_lifespan(warmup.WarmupLifespan(django_app))
+        self.assertEqual(sent, [('lifespan.startup.complete', True), ('lifespan.shutdown.complete', True)])
+        django_app.assert_not_called()
+
+    def test_other_scopes_reach_django(self):
+        django_app = mock.AsyncMock()
+        scope = {'type': 'http'}
+        asyncio.run(warmup.WarmupLifespan(django_app)(scope, None, None))
+        django_app.assert_awaited_once_with(scope, None, None)
@@ -0,0 +1,82 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
+from .models import Event, Poll, PollTerm, PollTextResponse
+from . import services
+
+
+class NormalizeResponseTestCase(TestCase):
+    def test_case_stop_words_and_stems(self):
+        terms = services.normalize_response("The Teams were GREAT, great team work!")
+        self.assertEqual(terms, {'team': 'teams', 'great': 'great', 'work': 'work'})
+
+    def test_inflections_share_a_term(self):
+        for word in ('learning', 'learned', 'learns', 'learn'):
+            self.assertEqual(services.stem_term(word), 'learn')
+        self.assertEqual(services.stem_term('running'), 'run')
+        self.assertEqual(services.stem_term('libraries'), 'library')
+        self.assertEqual(services.stem_term('focus'), 'focus')
+
+    def test_response_of_only_stop_words_has_no_terms(self):
+        self.assertEqual(services.normalize_response("It is what it is"), {})
+
+
+class OpenTextPollTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.creator = User.objects.create_user(username='creator', password='testpass123')
+        self.event = Event.objects.create(title='Retro', creator=self.creator)
+        self.poll = services.create_poll(self.event, 'One word to describe the talk?', ['ignored'],
+                                         kind=Poll.Kind.OPEN_TEXT)
+        self.users = [User.objects.create_user(username=f'user{i}', password='testpass123') for i in range(4)]
+
+    def test_open_text_poll_has_no_options(self):
+        self.assertTrue(self.poll.is_open_text)
+        self.assertFalse(self.poll.options.exists())
+
+    def test_terms_are_counted_as_responses_arrive(self):
+        services.submit_poll_response(self.users[0], self.poll, 'Inspiring')
+        services.submit_poll_response(self.users[1], self.poll, 'inspiring, inspired!')
+        services.submit_poll_response(self.users[2], self.poll, 'Long')
+        self.assertEqual(services.get_top_terms(self.poll), [('inspiring', 2), ('long', 1)])
+
+    def test_word_cloud_reads_only_the_term_table(self):
+        for user, text in zip(self.users, ['fast', 'fast', 'fun', 'deep']):
+            services.submit_poll_response(user, self.poll, text)
+        with CaptureQueriesContext(connection) as queries:
+            cloud = services.get_word_cloud(self.poll, limit=2)
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn('polltextresponse', queries[0]['sql'].lower())
+        self.assertEqual([word['text'] for word in cloud], ['deep', 'fast'])
+        self.assertGreater(cloud[1]['size'], cloud[0]['size'])
+
+    def test_double_submit_counts_once(self):
+        services.submit_poll_response(self.users[0], self.poll, 'fast')
+        services.submit_poll_response(self.users[0], self.poll, 'fast')
+        self.assertEqual(PollTextResponse.objects.count(), 1)
+        self.assertEqual(PollTerm.objects.get().count, 1)
+
+    def test_poll_detail_collects_answers_then_shows_the_cloud(self):
+        url = f'/events/{self.event.code}/poll/{self.poll.id}/'
+        self.client.force_login(self.users[0])
+        response = self.client.get(url)
+        self.assertContains(response, 'Your Answer')
+        self.assertNotContains(response, 'id="wordCloud"')
+
+        response = self.client.post(url, {'text': '<b>Bold</b> ideas'})
+        self.assertRedirects(response, url)
+        response = self.client.get(url)
+        self.assertContains(response, 'id="wordCloud"')
+        self.assertContains(response, '>ideas</span>')
+        self.assertNotContains(response, '<b>')
+
+    def test_archive_keeps_the_top_terms(self):
+        services.submit_poll_response(self.users[0], self.poll, 'fast')
+        self.event.is_closed = True
+        self.event.save()
+        services.archive_event(self.event)
+        archive = services.get_event_archive_data(self.event)
+        self.assertEqual(archive['polls'][0]['terms'], [{'text': 'fast', 'count': 1}])
+        self.assertFalse(PollTerm.objects.exists())
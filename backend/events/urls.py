@@ -2,7 +2,7 @@
 from django.urls import path
 from .views import (
     event_views, question_views, poll_views, 
-    auth_views, profile_views
+    auth_views, profile_views, moderation_views
 )
 
 urlpatterns = [
@@ -25,15 +25,23 @@ urlpatterns = [
     # Generic event_code patterns (must come last)
     path('<str:event_code>/', event_views.event_detail, name='event_detail'),
     path('<str:event_code>/toggle_close/', event_views.toggle_close, name='toggle_close'),
+    path('<str:event_code>/export/', event_views.export_event, name='export_event'),
     
     # Question views
     path('<str:event_code>/add_question/', question_views.add_question, name='add_question'),
     path('question/<int:question_id>/like/', question_views.toggle_like, name='toggle_like'),
     path('<str:event_code>/question/<int:question_id>/delete/', 
          question_views.delete_question, name='delete_question'),
+    path('<str:event_code>/question/<int:question_id>/merge/',
+         question_views.merge_question, name='merge_question'),
+    
+    # Moderation views
+    path('<str:event_code>/moderation/', moderation_views.moderation_queue, name='moderation_queue'),
+    path('<str:event_code>/moderation/toggle/', moderation_views.toggle_moderation, name='toggle_moderation'),
     
     # Poll views
     path('<str:event_code>/add_poll/', poll_views.add_poll, name='add_poll'),
     path('<str:event_code>/poll/<int:poll_id>/', poll_views.poll_detail, name='poll_detail'),
     path('<str:event_code>/poll/<int:poll_id>/vote/', poll_views.vote_poll, name='vote_poll'),
+    path('<str:event_code>/leaderboard/', poll_views.leaderboard, name='leaderboard'),
 ]
\ No newline at end of file
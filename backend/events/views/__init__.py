@@ -4,3 +4,7 @@ from .question_views import *
 from .poll_views import *
 from .auth_views import *
 from .profile_views import *
+from .moderation_views import *
+from .metrics_views import *
+from .profiling_views import *
+from .health_views import *
@@ -2,7 +2,7 @@
 Authentication-related views
 """
 from django.shortcuts import render, redirect
-from django.contrib.auth import login, authenticate
+from django.contrib.auth import login
 from ..forms import StyledAuthenticationForm, StyledUserCreationForm
 from ..services import create_user
 
@@ -15,12 +15,10 @@ def custom_login(request):
     if request.method == 'POST':
         form = StyledAuthenticationForm(request, data=request.POST)
         if form.is_valid():
-            username = form.cleaned_data.get('username')
-            password = form.cleaned_data.get('password')
-            user = authenticate(username=username, password=password)
-            if user is not None:
-                login(request, user)
-                return redirect('event_list')
+            # The form already authenticated the user; checking the password
+            # again would cost a second PBKDF2 run
+            login(request, form.get_user())
+            return redirect('event_list')
     else:
         form = StyledAuthenticationForm()
     
@@ -38,11 +36,9 @@ def register(request):
                 email=form.cleaned_data.get('email', ''),
                 password=form.cleaned_data['password1']
             )
-            # Authenticate and log in the new user
-            user = authenticate(username=user.username, password=form.cleaned_data['password1'])
-            if user:
-                login(request, user)
-                return redirect('event_list')
+            # Log the new user straight in; authenticate() would hash the password again
+            login(request, user)
+            return redirect('event_list')
     else:
         form = StyledUserCreationForm()
 
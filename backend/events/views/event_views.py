@@ -1,15 +1,31 @@
 """
 Event-related views
 """
+import hashlib
+import time
+
+from django.conf import settings
 from django.shortcuts import render, redirect, get_object_or_404
+from django.contrib import messages
+from django.contrib.auth import login
 from django.contrib.auth.decorators import login_required
-from django.http import HttpResponseForbidden
+from django.contrib.messages import get_messages
+from django.middleware.csrf import get_token
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition
+from django.http import HttpResponseForbidden, HttpResponseBadRequest, StreamingHttpResponse
+from ..edge_cache import carries_flash_messages, patch_private_cache_headers, patch_public_cache_headers
 from ..models import Event
 from ..forms import EventForm
 from ..services import (
     get_user_events, find_event_by_code, create_event,
     can_user_view_event, get_event_questions, get_event_polls,
-    can_anonymous_view_event
+    can_anonymous_view_event, can_user_close_event, can_user_export_event,
+    stream_event_export, EXPORT_FORMATS, get_event_archive_data, is_event_archived,
+    search_event_questions, get_question_cards_version, with_poll_results_versions,
+    get_event_page_version, replica_lag_seconds, get_event_for_join_token, create_participant,
+    get_event_participant, claim_participant_join, PARTICIPANT_COOKIE_SALT,
+    make_join_token, event_has_quiz, QUESTION_SORTS, DEFAULT_QUESTION_SORT
 )
 from ..services.qr_services import generate_qr_code
 
@@ -53,7 +69,41 @@ def event_create(request):
     return render(request, 'events/event_create.html', {'form': form})
 
 
+def get_question_sort(request):
+    """The question order picked with ?sort=, falling back to the default"""
+    sort = request.GET.get('sort')
+    return sort if sort in QUESTION_SORTS else DEFAULT_QUESTION_SORT
+
+
+def event_page_etag(request, event_code):
+    """
+    ETag of an event page, computed without rendering it: the event's
+    content version plus everything else the page depends on (viewer,
+    their CSRF secret since forms embed the token, query string, release).
+    Like the anonymous page's, it rolls over twice per JOIN_TOKEN_MAX_AGE
+    since the creator's QR code carries a join token.
+    """
+    if get_messages(request):  # flash messages must reach the page
+        return None
+    event_id = Event.objects.filter(code=event_code).values_list('pk', flat=True).first()
+    if event_id is None:
+        return None
+    version = get_event_page_version(event_id)
+    get_token(request)  # the CSRF secret the page's forms will be rendered with
+    parts = (
+        version,
+        request.user.pk,
+        request.META.get('CSRF_COOKIE', ''),
+        request.GET.urlencode(),
+        getattr(settings, 'RELEASE_VERSION', ''),
+        int(time.time() // (settings.JOIN_TOKEN_MAX_AGE // 2)),
+    )
+    return hashlib.blake2b(repr(parts).encode(), digest_size=12).hexdigest()
+
+
 @login_required
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=event_page_etag)
 def event_detail(request, event_code):
     """Display event details for authenticated users"""
     event = get_object_or_404(Event, code=event_code)
@@ -64,17 +114,34 @@ def event_detail(request, event_code):
             'event': event
         }, status=404)
 
+    # Archived events are rendered read-only from their snapshot
+    archive_data = get_event_archive_data(event) if event.is_closed else None
+    if archive_data is not None:
+        return render(request, 'events/event_archived.html', {
+            'event': event,
+            'archive': archive_data,
+        })
+
     # Use services to get data
-    questions = get_event_questions(event)
-    polls = get_event_polls(event)
+    question_sort = get_question_sort(request)
+    questions = get_event_questions(event, viewer=request.user, sort=question_sort)
+    search_query = request.GET.get('q', '').strip()
+    if search_query:
+        questions = search_event_questions(event, search_query, questions=questions)
+    polls = with_poll_results_versions(get_event_polls(event))
     
     # Generate QR code for the event
     qr_code_data, event_url = generate_qr_code(event.code)
 
     return render(request, 'events/event_detail.html', {
         'event': event,
+        'is_creator': request.user == event.creator,
         'questions': questions,
+        'questions_version': get_question_cards_version(event.pk),
+        'question_sort': question_sort,
+        'search_query': search_query,
         'polls': polls,
+        'has_quiz': event_has_quiz(polls),
         'qr_code_data': qr_code_data,
         'event_url': event_url,
     })
@@ -86,6 +153,8 @@ def toggle_close(request, event_code):
     event = get_object_or_404(Event, code=event_code)
     if not can_user_close_event(request.user, event):
         return HttpResponseForbidden("Only the creator can close or open this event.")
+    if is_event_archived(event):
+        return HttpResponseForbidden("Archived events cannot be reopened.")
     
     # Use service to toggle close status
     from ..services import toggle_event_close_status
@@ -93,12 +162,32 @@ def toggle_close(request, event_code):
     return redirect('event_detail', event_code=event.code)
 
 
+@login_required
+def export_event(request, event_code):
+    """Stream an export of the event's questions, likes and poll results"""
+    event = get_object_or_404(Event, code=event_code)
+    if not can_user_export_event(request.user, event):
+        return HttpResponseForbidden("Only the creator can export this event.")
+
+    export_format = request.GET.get('format', 'csv')
+    if export_format not in EXPORT_FORMATS:
+        return HttpResponseBadRequest("Unsupported export format.")
+
+    response = StreamingHttpResponse(
+        stream_event_export(event, export_format),
+        content_type=EXPORT_FORMATS[export_format],
+    )
+    response['Content-Disposition'] = f'attachment; filename="event-{event.code}.{export_format}"'
+    return response
+
+
 def smart_event_redirect(request, event_code):
     """
     Smart redirect view that automatically redirects users to the appropriate view
     based on their authentication status.
     - Logged-in users -> event_detail (authenticated view)
-    - Anonymous users -> anonymous_event_detail (anonymous view)
+    - Anonymous users with a valid join token -> offered to join as a guest
+    - Other anonymous users -> anonymous_event_detail (anonymous view)
     """
     event = get_object_or_404(Event, code=event_code)
     
@@ -106,32 +195,121 @@ def smart_event_redirect(request, event_code):
     if request.user.is_authenticated:
         # Redirect to authenticated event detail view
         return redirect('event_detail', event_code=event_code)
-    else:
-        # Redirect to anonymous event detail view
-        return redirect('anonymous_event_detail', event_code=event_code)
 
+    token = request.POST.get('t') if request.method == 'POST' else request.GET.get('t')
+    if token and get_event_for_join_token(token, event.code) is not None:
+        if request.method == 'POST':
+            return _join_as_participant(request, event)
+        return render(request, 'events/join_event.html', {
+            'event': event,
+            'join_token': token,
+        })
+
+    # Redirect to anonymous event detail view
+    return redirect('anonymous_event_detail', event_code=event_code)
 
+
+def _client_address(request):
+    """
+    The client's address: from CLIENT_ADDRESS_HEADER behind a proxy, where
+    each of the TRUSTED_PROXY_COUNT proxies appended the address it saw
+    (anything before those was sent by the client and could be forged)
+    """
+    header = settings.CLIENT_ADDRESS_HEADER
+    if header and request.META.get(header):
+        addresses = [address.strip() for address in request.META[header].split(',')]
+        return addresses[-min(settings.TRUSTED_PROXY_COUNT, len(addresses))]
+    return request.META.get('REMOTE_ADDR', '')
+
+
+def _join_as_participant(request, event):
+    """Log in the guest this device joined the event as before, or a new one"""
+    user = get_event_participant(request.get_signed_cookie(
+        settings.PARTICIPANT_COOKIE, default=None, salt=PARTICIPANT_COOKIE_SALT,
+        max_age=settings.JOIN_TOKEN_MAX_AGE,
+    ), event)
+    if user is None:
+        if not claim_participant_join(event, _client_address(request)):
+            messages.error(request, "Too many guests joined from your network. Please try again in a few minutes.")
+            return redirect('anonymous_event_detail', event_code=event.code)
+        user = create_participant(event)
+    login(request, user)
+    response = redirect('event_detail', event_code=event.code)
+    response.set_signed_cookie(
+        settings.PARTICIPANT_COOKIE, str(user.pk), salt=PARTICIPANT_COOKIE_SALT,
+        max_age=settings.JOIN_TOKEN_MAX_AGE, httponly=True, samesite='Lax',
+    )
+    return response
+
+
+def anonymous_page_etag(request, event_code):
+    """
+    ETag of the anonymous event page, which is the same for every visitor:
+    the event's content version, the query string and the release. It also
+    rolls over twice per JOIN_TOKEN_MAX_AGE so revalidated copies never
+    carry an expired join token.
+    """
+    if carries_flash_messages(request):
+        return None
+    event_id = Event.objects.filter(code=event_code).values_list('pk', flat=True).first()
+    if event_id is None:
+        return None
+    version = get_event_page_version(event_id)
+    parts = (
+        version,
+        request.GET.urlencode(),
+        getattr(settings, 'RELEASE_VERSION', ''),
+        int(time.time() // (settings.JOIN_TOKEN_MAX_AGE // 2)),
+    )
+    return hashlib.blake2b(repr(parts).encode(), digest_size=12).hexdigest()
+
+
+@condition(etag_func=anonymous_page_etag)
 def anonymous_event_detail(request, event_code):
-    """View for anonymous users to view events and ask questions"""
+    """
+    View for anonymous users to view events and ask questions. The page
+    leaves the session and CSRF cookie alone so shared caches can keep it
+    (see events/edge_cache.py); only a visit bringing flash messages is
+    rendered privately, with the usual page chrome.
+    """
     event = get_object_or_404(Event, code=event_code)
+    public_page = not carries_flash_messages(request)
+    _, settled = get_event_page_version(event.pk)
     
     if not can_anonymous_view_event(event):
-        return render(request, 'events/event_closed.html', {
-            'event': event
+        response = render(request, 'events/event_closed.html', {
+            'event': event,
+            'public_page': public_page,
         }, status=404)
+        return _patch_anonymous_cache_headers(response, event, public_page, settled)
     
     # Use services to get data
-    questions = get_event_questions(event)
+    question_sort = get_question_sort(request)
+    questions = get_event_questions(event, sort=question_sort)
     polls = get_event_polls(event)
     
     # Generate QR code for the event
     qr_code_data, event_url = generate_qr_code(event.code)
     
-    return render(request, 'events/anonymous_event_detail.html', {
+    response = render(request, 'events/anonymous_event_detail.html', {
         'event': event,
         'questions': questions,
+        'questions_version': get_question_cards_version(event.pk),
+        'question_sort': question_sort,
         'polls': polls,
         'is_anonymous': True,
+        'public_page': public_page,
+        'join_token': make_join_token(event.code),
         'qr_code_data': qr_code_data,
         'event_url': event_url,
     })
+    return _patch_anonymous_cache_headers(response, event, public_page, settled)
+
+
+def _patch_anonymous_cache_headers(response, event, public_page, settled):
+    if not public_page:
+        return patch_private_cache_headers(response)
+    # Right after a change the page may come from a replica that lags behind;
+    # shared caches keep such a rendering only until the replicas have caught up
+    s_maxage = None if settled else replica_lag_seconds()
+    return patch_public_cache_headers(response, event.pk, s_maxage=s_maxage)
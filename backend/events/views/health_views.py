@@ -0,0 +1,16 @@
+"""
+Health views
+"""
+from django.http import HttpResponse
+from django.views.decorators.cache import never_cache
+from ..warmup import is_worker_ready, warm_up_worker
+
+
+@never_cache
+def ready(request):
+    """Readiness probe: 200 once this worker has warmed up, 503 until then"""
+    if not is_worker_ready():
+        warm_up_worker()  # retries a failed warm-up; returns at once if one is running
+    if is_worker_ready():
+        return HttpResponse("ready\n", content_type='text/plain')
+    return HttpResponse("warming up\n", content_type='text/plain', status=503)
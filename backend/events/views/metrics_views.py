@@ -0,0 +1,17 @@
+"""
+Metrics views
+"""
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+from .. import metrics as request_metrics
+
+
+def metrics(request):
+    """Expose request metrics of this worker in the Prometheus text format"""
+    allowed = getattr(settings, 'METRICS_ALLOWED_IPS', ())
+    if '*' not in allowed and request.META.get('REMOTE_ADDR') not in allowed:
+        return HttpResponseForbidden("Metrics are not available from this address.")
+    return HttpResponse(
+        request_metrics.render_prometheus(),
+        content_type='text/plain; version=0.0.4; charset=utf-8',
+    )
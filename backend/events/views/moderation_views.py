@@ -0,0 +1,67 @@
+"""
+Question moderation views
+"""
+from django.shortcuts import render, redirect, get_object_or_404
+from django.contrib.auth.decorators import login_required
+from django.contrib import messages
+from django.http import HttpResponseForbidden
+from django.urls import reverse
+from ..models import Event, Question
+from ..services import (
+    can_user_moderate_event, get_moderation_queue, bulk_moderate_questions,
+    toggle_event_moderation, count_pending_questions, MODERATION_ACTIONS
+)
+
+
+def _parse_cursor(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+@login_required
+def moderation_queue(request, event_code):
+    """Page through questions by status and approve/reject/delete them in bulk"""
+    event = get_object_or_404(Event, code=event_code)
+    if not can_user_moderate_event(request.user, event):
+        return HttpResponseForbidden("Only the creator can moderate questions.")
+
+    status = request.GET.get('status', Question.Status.PENDING)
+    if status not in Question.Status.values:
+        status = Question.Status.PENDING
+    after_id = _parse_cursor(request.GET.get('after'))
+
+    if request.method == 'POST':
+        action = request.POST.get('action')
+        question_ids = [pk for pk in map(_parse_cursor, request.POST.getlist('question_ids')) if pk is not None]
+        if action in MODERATION_ACTIONS and question_ids:
+            count = bulk_moderate_questions(event, question_ids, action)
+            messages.success(request, f"{action.capitalize()}d {count} question{'s' if count != 1 else ''}.")
+        url = reverse('moderation_queue', kwargs={'event_code': event.code}) + f'?status={status}'
+        if after_id is not None:
+            url += f'&after={after_id}'
+        return redirect(url)
+
+    questions, next_after_id = get_moderation_queue(event, status=status, after_id=after_id)
+
+    return render(request, 'events/moderation_queue.html', {
+        'event': event,
+        'questions': questions,
+        'status': status,
+        'statuses': Question.Status.choices,
+        'after_id': after_id,
+        'next_after_id': next_after_id,
+        'pending_count': count_pending_questions(event),
+    })
+
+
+@login_required
+def toggle_moderation(request, event_code):
+    """Turn pre-moderation of new questions on or off"""
+    event = get_object_or_404(Event, code=event_code)
+    if not can_user_moderate_event(request.user, event):
+        return HttpResponseForbidden("Only the creator can moderate questions.")
+    if request.method == 'POST':
+        toggle_event_moderation(event)
+    return redirect('moderation_queue', event_code=event.code)
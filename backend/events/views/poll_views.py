@@ -1,14 +1,20 @@
 """
 Poll-related views
 """
+from django.conf import settings
 from django.shortcuts import render, redirect, get_object_or_404
+from django.utils import timezone
+from django.utils.safestring import mark_safe
 from django.contrib.auth.decorators import login_required
 from django.http import HttpResponseForbidden
 from ..models import Event, Poll, PollOption
-from ..forms import PollForm, PollOptionForm
+from ..forms import PollForm, PollOptionForm, PollResponseForm
 from ..services import (
     can_user_add_poll, create_poll, get_poll_options,
-    has_user_voted_in_poll, vote_in_poll, get_poll_vote_counts
+    has_user_voted_in_poll, vote_in_poll, get_poll_vote_counts, get_poll_chart_svg,
+    has_user_responded_to_poll, submit_poll_response, get_word_cloud,
+    has_user_cast_ballot, cast_ballot, get_poll_tally, get_ballot_options, MAX_BALLOT_OPTIONS,
+    is_quiz_open, get_quiz_deadline, get_quiz_answer, get_leaderboard, get_leaderboard_position
 )
 
 
@@ -25,19 +31,33 @@ def add_poll(request, event_code):
         poll_form = PollForm(request.POST)
         num_options = int(request.POST.get('num_options', 0))
 
-        if poll_form.is_valid():
-            # Collect option texts
-            options_text = []
-            for i in range(0, num_options + 1):
-                option_text = request.POST.get(f'option_{i}-text')
-                if option_text:
-                    options_text.append(option_text)
+        # Collect option texts and the quiz answer key
+        options_text = []
+        correct_options = []
+        for i in range(0, num_options + 1):
+            option_text = request.POST.get(f'option_{i}-text')
+            if option_text:
+                options_text.append(option_text)
+                if request.POST.get(f'option_{i}-correct'):
+                    correct_options.append(option_text)
+        option_forms = [PollOptionForm(prefix=f"option_{i}") for i in range(max(num_options, 2))]
+
+        if poll_form.is_valid() and poll_form.cleaned_data['kind'] in (Poll.Kind.MULTI_SELECT, Poll.Kind.RANKED):
+            if len(options_text) > MAX_BALLOT_OPTIONS:
+                poll_form.add_error(None, f"Multi-select and ranked polls can have at most {MAX_BALLOT_OPTIONS} options.")
+
+        if poll_form.is_valid() and poll_form.cleaned_data['time_limit'] is not None and not correct_options:
+            poll_form.add_error(None, "Mark at least one correct option for a quiz question.")
 
+        if poll_form.is_valid():
             # Use service to create poll
             create_poll(
                 event=event,
                 question=poll_form.cleaned_data['question'],
-                options_text=options_text
+                options_text=options_text,
+                kind=poll_form.cleaned_data['kind'],
+                time_limit=poll_form.cleaned_data['time_limit'],
+                correct_options=correct_options
             )
 
             return redirect('event_detail', event_code=event.code)
@@ -58,6 +78,8 @@ def add_poll(request, event_code):
 def vote_poll(request, event_code, poll_id):
     """Vote in a poll"""
     poll = get_object_or_404(Poll, id=poll_id, event__code=event_code)
+    if poll.is_open_text or poll.uses_ballots or poll.is_quiz:
+        return redirect('poll_detail', event_code=event_code, poll_id=poll_id)
     options = get_poll_options(poll)
     
     if request.method == 'POST':
@@ -81,9 +103,14 @@ def poll_detail(request, event_code, poll_id):
     """Display poll results"""
     event = get_object_or_404(Event, code=event_code)
     poll = get_object_or_404(Poll, id=poll_id, event=event)
+    if poll.is_open_text:
+        return _open_text_poll_detail(request, event, poll)
+    if poll.uses_ballots:
+        return _ballot_poll_detail(request, event, poll)
     user_has_voted = has_user_voted_in_poll(request.user, poll)
+    quiz_open = is_quiz_open(poll) if poll.is_quiz else True
 
-    if request.method == 'POST' and not user_has_voted:
+    if request.method == 'POST' and not user_has_voted and quiz_open:
         selected_option_id = request.POST.get('poll_option')
         selected_option = get_object_or_404(PollOption, id=selected_option_id, poll=poll)
         vote_in_poll(request.user, selected_option)
@@ -91,10 +118,117 @@ def poll_detail(request, event_code, poll_id):
 
     # Use service to get vote counts
     option_votes_list = get_poll_vote_counts(poll)
+    results_chart = chart_data = None
+    poll_chartjs = getattr(settings, 'POLL_CHARTJS', None)
+    if user_has_voted or not quiz_open:
+        # Labels are escaped by the chart renderer
+        results_chart = mark_safe(get_poll_chart_svg(poll, option_votes_list))
+        if poll_chartjs:
+            chart_data = {
+                'labels': [option.text for option, _ in option_votes_list],
+                'votes': [votes for _, votes in option_votes_list],
+            }
 
     return render(request, 'events/poll_detail.html', {
         'event': event,
         'poll': poll,
         'user_has_voted': user_has_voted,
         'option_votes_list': option_votes_list,
+        'total_votes': sum(votes for _, votes in option_votes_list),
+        'results_chart': results_chart,
+        'chart_data': chart_data,
+        'poll_chartjs': poll_chartjs,
+        'quiz': _quiz_context(request, event, poll, quiz_open, user_has_voted) if poll.is_quiz else None,
+    })
+
+
+def _quiz_context(request, event, poll, quiz_open, user_has_voted):
+    """Countdown, the viewer's answer and leaderboard standing for a quiz question"""
+    deadline = get_quiz_deadline(poll)
+    return {
+        'open': quiz_open,
+        'closed': not quiz_open,
+        'deadline': deadline,
+        'seconds_left': max(0, int((deadline - timezone.now()).total_seconds())),
+        'answer': get_quiz_answer(request.user, poll) if user_has_voted else None,
+        'position': get_leaderboard_position(event, request.user) if user_has_voted else None,
+    }
+
+
+@login_required
+def leaderboard(request, event_code):
+    """Live quiz leaderboard of an event"""
+    event = get_object_or_404(Event, code=event_code)
+    return render(request, 'events/leaderboard.html', {
+        'event': event,
+        'leaders': get_leaderboard(event),
+        'position': get_leaderboard_position(event, request.user),
+    })
+
+
+def _open_text_poll_detail(request, event, poll):
+    """Collect free-text answers and show the word cloud once answered"""
+    user_has_voted = has_user_responded_to_poll(request.user, poll)
+    form = PollResponseForm()
+
+    if request.method == 'POST' and not user_has_voted:
+        form = PollResponseForm(request.POST)
+        if form.is_valid():
+            submit_poll_response(request.user, poll, form.cleaned_data['text'])
+            return redirect('poll_detail', event_code=event.code, poll_id=poll.id)
+
+    return render(request, 'events/poll_detail.html', {
+        'event': event,
+        'poll': poll,
+        'user_has_voted': user_has_voted,
+        'response_form': form,
+        'word_cloud': get_word_cloud(poll) if user_has_voted else None,
+    })
+
+
+def _ranked_option_ids(post, options):
+    """Option ids ordered by the rank given to each; unranked options are left out"""
+    ranks = []
+    for option in options:
+        rank = post.get(f'rank_{option.id}', '').strip()
+        if rank:
+            try:
+                ranks.append((int(rank), option.id))
+            except ValueError:
+                raise ValueError("Ranks must be numbers.")
+    if len({rank for rank, _ in ranks}) != len(ranks):
+        raise ValueError("Give each option a different rank.")
+    return [option_id for _, option_id in sorted(ranks)]
+
+
+def _ballot_poll_detail(request, event, poll):
+    """Collect multi-select or ranked-choice ballots and show the tally once voted"""
+    user_has_voted = has_user_cast_ballot(request.user, poll)
+    options = get_ballot_options(poll)
+    ballot_error = None
+
+    if request.method == 'POST' and not user_has_voted:
+        try:
+            if poll.kind == Poll.Kind.RANKED:
+                option_ids = _ranked_option_ids(request.POST, options)
+            else:
+                option_ids = request.POST.getlist('poll_option')
+            cast_ballot(request.user, poll, option_ids)
+        except ValueError as error:
+            ballot_error = str(error)
+        else:
+            return redirect('poll_detail', event_code=event.code, poll_id=poll.id)
+
+    tally = get_poll_tally(poll) if user_has_voted else None
+    return render(request, 'events/poll_detail.html', {
+        'event': event,
+        'poll': poll,
+        'user_has_voted': user_has_voted,
+        'options': options,
+        'ballot_error': ballot_error,
+        'tally': tally,
+        'option_votes_list': tally['option_votes'] if tally else [],
+        'total_votes': tally['ballots'] if tally else 0,
+        # Labels are escaped by the chart renderer
+        'results_chart': mark_safe(tally['chart']) if tally else None,
     })
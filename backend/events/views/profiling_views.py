@@ -0,0 +1,31 @@
+"""
+Profiling views (staff only)
+"""
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import FileResponse, Http404
+from django.shortcuts import render
+from ..profiling import PROFILE_KINDS, list_profiles, make_profiling_token, profile_path, profiling_config
+
+
+@staff_member_required
+def profile_list(request):
+    """List stored request profiles and hand out a profiling token"""
+    return render(request, 'events/profile_list.html', {
+        'profiles': list_profiles(),
+        'token': make_profiling_token(request.user),
+        'enabled': profiling_config()['ENABLED'],
+    })
+
+
+@staff_member_required
+def download_profile(request, request_id, kind):
+    """Download the pstats or folded-stack file of a profiled request"""
+    path = profile_path(request_id, kind)
+    if path is None:
+        raise Http404("Profile not found")
+    return FileResponse(
+        open(path, 'rb'),
+        as_attachment=True,
+        filename=path.name,
+        content_type=PROFILE_KINDS[kind],
+    )
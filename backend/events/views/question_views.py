@@ -5,14 +5,29 @@ from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.http import HttpResponseForbidden, HttpResponseRedirect
 from django.contrib import messages
+from django.views.decorators.csrf import csrf_exempt
+from ..edge_cache import patch_private_cache_headers, patch_public_cache_headers
 from ..models import Event, Question
 from ..forms import QuestionForm, AnonymousQuestionForm
 from ..services import (
     add_question_to_event, toggle_question_like, can_user_delete_question,
-    delete_question, add_anonymous_question, can_anonymous_view_event
+    delete_question, add_anonymous_question, can_anonymous_view_event,
+    merge_questions, make_question_form_token
 )
 
 
+def _notify_question_submitted(request, question):
+    """Tell the asker about review holds and existing near-duplicates"""
+    if question.status == Question.Status.PENDING:
+        messages.info(request, "Your question will appear once a moderator approves it.")
+    if question.duplicate_of is not None:
+        messages.info(
+            request,
+            f'A similar question was already asked: "{question.duplicate_of.text[:120]}". '
+            'Consider liking it instead.'
+        )
+
+
 @login_required
 def add_question(request, event_code):
     """Add a question to an event (authenticated users)"""
@@ -22,11 +37,13 @@ def add_question(request, event_code):
         form = QuestionForm(request.POST)
         if form.is_valid():
             # Use service to add question
-            add_question_to_event(
+            question = add_question_to_event(
                 event=event,
                 text=form.cleaned_data['text'],
-                author=request.user
+                author=request.user,
+                flag_reason=form.content_flag.reason
             )
+            _notify_question_submitted(request, question)
             return redirect('event_detail', event_code=event.code)
     else:
         form = QuestionForm()
@@ -65,30 +82,60 @@ def delete_question(request, event_code, question_id):
     return redirect('event_detail', event_code=event_code)
 
 
+@login_required
+def merge_question(request, event_code, question_id):
+    """Merge a question into its suggested duplicate (event creator only)"""
+    event = get_object_or_404(Event, code=event_code)
+    if not can_user_delete_question(request.user, event):
+        return HttpResponseForbidden("Only the creator can merge questions.")
+
+    question = get_object_or_404(Question, id=question_id, event=event, duplicate_of__isnull=False)
+    if request.method == 'POST':
+        try:
+            merge_questions(question, question.duplicate_of)
+        except ValueError as error:
+            messages.error(request, str(error))
+        else:
+            messages.success(request, "Questions merged.")
+    return redirect('event_detail', event_code=event_code)
+
+
+@csrf_exempt  # the form carries a signed form token instead, see AnonymousQuestionForm.clean()
 def anonymous_add_question(request, event_code):
     """View for anonymous users to add questions to events"""
     event = get_object_or_404(Event, code=event_code)
     
     if not can_anonymous_view_event(event):
-        return render(request, 'events/event_closed.html', {
-            'event': event
+        response = render(request, 'events/event_closed.html', {
+            'event': event,
+            'public_page': request.method == 'GET',
         }, status=404)
+        if request.method != 'GET':
+            return patch_private_cache_headers(response)
+        return patch_public_cache_headers(response, event.pk)
     
     if request.method == 'POST':
-        form = AnonymousQuestionForm(request.POST)
+        form = AnonymousQuestionForm(request.POST, event_code=event.code)
         if form.is_valid():
             # Use service to add anonymous question
-            add_anonymous_question(
+            question = add_anonymous_question(
                 event=event,
                 author_name=form.cleaned_data['username'],
-                text=form.cleaned_data['text']
+                text=form.cleaned_data['text'],
+                flag_reason=form.content_flag.reason
             )
+            _notify_question_submitted(request, question)
             return redirect('anonymous_event_detail', event_code=event.code)
     else:
-        form = AnonymousQuestionForm()
+        form = AnonymousQuestionForm(event_code=event.code)
     
-    return render(request, 'events/anonymous_add_question.html', {
+    response = render(request, 'events/anonymous_add_question.html', {
         'form': form,
+        'form_token': make_question_form_token(event.code),
         'event': event,
         'is_anonymous': True,
+        'public_page': True,
     })
+    if request.method == 'POST':
+        return patch_private_cache_headers(response)
+    return patch_public_cache_headers(response, event.pk)
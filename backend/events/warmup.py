@@ -0,0 +1,148 @@
+"""
+Worker warm-up: do the work a fresh worker would otherwise do on its first
+requests (URLconf compilation, compiling the templates, loading the
+imaging libraries, connecting to the databases, filling the local caches
+for open events) before it reports itself ready.
+
+core/wsgi.py runs it when the worker loads the application and core/asgi.py
+on the ASGI lifespan startup event; the /ready endpoint answers 503 until
+it has completed.
+"""
+import logging
+import threading
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connections
+from django.urls import get_resolver
+from .template_warmup import warm_templates as compile_templates
+
+logger = logging.getLogger(__name__)
+
+WARMUP_EVENT_LIMIT = 50  # most recent open events whose caches are primed
+
+_ready = threading.Event()
+_running = threading.Lock()
+
+
+def warm_urlconf():
+    resolver = get_resolver()
+    resolver.url_patterns
+    resolver.reverse_dict  # compiles every pattern and fills the reverse lookup tables
+
+
+def warm_templates():
+    _, _, errors = compile_templates()
+    for name, error in errors.items():
+        logger.warning("Template %s does not compile: %s", name, error)
+
+
+def warm_imports():
+    import PIL.Image  # noqa: F401 -- avatar resizing
+    import qrcode  # noqa: F401 -- event page QR codes
+
+
+def warm_database():
+    """Connect to every database (filling its pool, if pooled) and check it answers"""
+    for connection in connections.all():
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT 1')
+
+
+def warm_caches(limit=WARMUP_EVENT_LIMIT):
+    """Prime version counters, poll charts and tallies of the most recent open events"""
+    from .models import Event, Poll
+    from .services import (
+        get_cache_versions, get_poll_chart_svg, get_poll_tally, get_poll_vote_counts,
+        with_poll_results_versions,
+    )
+    event_ids = list(
+        Event.objects.filter(is_closed=False).order_by('-created_at').values_list('pk', flat=True)[:limit]
+    )
+    get_cache_versions('event_page', event_ids)
+    get_cache_versions('question_cards', event_ids)
+    for poll in with_poll_results_versions(Poll.objects.filter(event_id__in=event_ids)):
+        if poll.uses_ballots:
+            get_poll_tally(poll)
+        elif not poll.is_open_text:
+            get_poll_chart_svg(poll, get_poll_vote_counts(poll))
+
+
+WARMUP_STEPS = (
+    ('urlconf', warm_urlconf),
+    ('templates', warm_templates),
+    ('imports', warm_imports),
+    ('database', warm_database),
+    ('caches', warm_caches),
+)
+
+
+def warm_up_worker():
+    """
+    Run every warm-up step and mark the worker ready if they all succeed.
+    Returns {step: seconds}; a failed step is logged and leaves the worker
+    unready, so the next readiness probe tries again. Concurrent calls
+    return None without waiting.
+    """
+    if not _running.acquire(blocking=False):
+        return None
+    try:
+        timings, failed = {}, False
+        for name, step in WARMUP_STEPS:
+            start = time.perf_counter()
+            try:
+                step()
+            except Exception:
+                logger.exception("Worker warm-up step %r failed", name)
+                failed = True
+            timings[name] = time.perf_counter() - start
+        if not failed:
+            _ready.set()
+        logger.info(
+            "Worker warm-up %s in %.0f ms (%s)", 'failed' if failed else 'done',
+            sum(timings.values()) * 1000,
+            ', '.join(f'{name} {seconds * 1000:.0f} ms' for name, seconds in timings.items()),
+        )
+        return timings
+    finally:
+        _running.release()
+
+
+def _warm_up_in_thread():
+    warm_up_worker()
+    # This thread serves no requests: hand pooled connections back, close the others
+    connections.close_all()
+
+
+class WarmupLifespan:
+    """
+    ASGI wrapper answering lifespan events, which Django's handler rejects:
+    warms the worker up on startup and passes every other scope to `app`.
+    Startup completes even if warm-up failed; /ready keeps reporting 503.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'lifespan':
+            return await self.app(scope, receive, send)
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                if getattr(settings, 'WORKER_WARMUP', False):
+                    await sync_to_async(_warm_up_in_thread, thread_sensitive=False)()
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+
+def is_worker_ready():
+    return _ready.is_set() or not getattr(settings, 'WORKER_WARMUP', False)
+
+
+def reset_worker_readiness():
+    """Mark the worker as not warmed up (used by tests)"""
+    _ready.clear()
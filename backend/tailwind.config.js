@@ -0,0 +1,22 @@
+// Builds events/static/events/css/app.css with only the classes the templates use:
+//   npx tailwindcss@3 -c tailwind.config.js -i events/static_src/tailwind.css \
+//     -o events/static/events/css/app.css --minify
+module.exports = {
+  content: [
+    "./events/templates/**/*.html",
+    "./events/static/events/js/**/*.js",
+  ],
+  theme: {
+    extend: {
+      colors: {
+        primary: {
+          50: "#eff6ff",
+          500: "#3b82f6",
+          600: "#2563eb",
+          700: "#1d4ed8",
+          900: "#1e3a8a",
+        },
+      },
+    },
+  },
+};